@@ -0,0 +1,30 @@
+"""baseline schema
+
+Stands for the schema created by create_tables.py (Base.metadata.create_all plus
+the NDIS column additions). Mark an existing database with
+``alembic stamp 0001_baseline`` before running ``alembic upgrade head``.
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    pass
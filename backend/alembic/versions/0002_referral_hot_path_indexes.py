@@ -0,0 +1,64 @@
+"""referral hot path indexes
+
+Composite and partial indexes for the filters used by the referral listings and
+the provider/admin dashboards (assigned_provider_id, status, created_at,
+accepted_at, referred_for). Mirrors Referral.__table_args__.
+
+On PostgreSQL the indexes are built CONCURRENTLY so the referrals table stays
+writable; IF NOT EXISTS skips indexes already created by create_tables.py.
+
+Revision ID: 0002_referral_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_referral_hot_path_indexes'
+down_revision: Union[str, None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, columns, partial index predicate)
+INDEXES = [
+    ("ix_referrals_created_at_id", "created_at, id", None),
+    ("ix_referrals_status_created_at_id", "status, created_at, id", None),
+    ("ix_referrals_provider_created_at_id", "assigned_provider_id, created_at, id", None),
+    (
+        "ix_referrals_unassigned_created_at_id", "created_at, id",
+        "assigned_provider_id IS NULL OR status = 'declined'"
+    ),
+    ("ix_referrals_referred_for_created_at_id", "referred_for, created_at, id", None),
+    ("ix_referrals_provider_status_accepted_at", "assigned_provider_id, status, accepted_at", None),
+    ("ix_referrals_provider_updated_at", "assigned_provider_id, updated_at", None),
+    ("ix_referrals_in_progress_accepted_at", "accepted_at", "status = 'in_progress'"),
+]
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    concurrently = "CONCURRENTLY " if _is_postgresql() else ""
+    # CREATE INDEX CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            sql = f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON referrals ({columns})"
+            if where:
+                sql += f" WHERE {where}"
+            op.execute(sql)
+        op.execute("ANALYZE referrals")
+
+
+def downgrade() -> None:
+    concurrently = "CONCURRENTLY " if _is_postgresql() else ""
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX {concurrently}IF EXISTS {name}")
@@ -0,0 +1,57 @@
+"""email outbox
+
+Adds email_logs.next_attempt_at and the partial index the email dispatcher
+polls. Pending email_logs rows with next_attempt_at set are the outbox: they
+are written in the same transaction as their referral and sent by
+dispatch_emails.py. A column or index already created by create_tables.py
+is left alone. Mirrors EmailLog.__table_args__.
+
+Revision ID: 0003_email_outbox
+Revises: 0002_referral_hot_path_indexes
+Create Date: 2026-10-17 14:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_email_outbox'
+down_revision: Union[str, None] = '0002_referral_hot_path_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+OUTBOX_DUE = "status IN ('pending', 'retry') AND next_attempt_at IS NOT NULL"
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("email_logs")}
+    indexes = {index["name"] for index in inspector.get_indexes("email_logs")}
+
+    if "next_attempt_at" not in columns:
+        op.add_column("email_logs", sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True))
+
+    if "ix_email_logs_outbox_due" in indexes:
+        return
+    concurrently = "CONCURRENTLY " if _is_postgresql() else ""
+    # CREATE INDEX CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.execute(
+            f"CREATE INDEX {concurrently}IF NOT EXISTS ix_email_logs_outbox_due "
+            f"ON email_logs (next_attempt_at, id) WHERE {OUTBOX_DUE}"
+        )
+
+
+def downgrade() -> None:
+    concurrently = "CONCURRENTLY " if _is_postgresql() else ""
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX {concurrently}IF EXISTS ix_email_logs_outbox_due")
+    op.drop_column("email_logs", "next_attempt_at")
@@ -0,0 +1,72 @@
+"""email log rollups
+
+Adds the hourly email_log_rollups table read by the admin email statistics,
+its refresh state row, and the email_logs indexes the incremental refresh
+scans by. Tables already created by create_tables.py are left alone.
+Mirrors EmailLogRollup, EmailLogRollupState and EmailLog.__table_args__.
+
+Revision ID: 0004_email_log_rollups
+Revises: 0003_email_outbox
+Create Date: 2026-10-17 16:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_email_log_rollups'
+down_revision: Union[str, None] = '0003_email_outbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_email_logs_updated_at", "updated_at"),
+    ("ix_email_logs_created_at", "created_at"),
+]
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "email_log_rollups" not in existing:
+        op.create_table(
+            "email_log_rollups",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("email_type", sa.String(length=50), nullable=False),
+            sa.Column("status", sa.String(length=20), nullable=False),
+            sa.Column("email_count", sa.Integer(), nullable=False),
+            sa.UniqueConstraint("bucket_start", "email_type", "status", name="uq_email_log_rollups_bucket"),
+        )
+        op.create_index("ix_email_log_rollups_id", "email_log_rollups", ["id"])
+
+    if "email_log_rollup_state" not in existing:
+        op.create_table(
+            "email_log_rollup_state",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+    concurrently = "CONCURRENTLY " if _is_postgresql() else ""
+    # CREATE INDEX CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES:
+            op.execute(f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON email_logs ({column})")
+
+
+def downgrade() -> None:
+    concurrently = "CONCURRENTLY " if _is_postgresql() else ""
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.execute(f"DROP INDEX {concurrently}IF EXISTS {name}")
+    op.drop_table("email_log_rollup_state")
+    op.drop_index("ix_email_log_rollups_id", table_name="email_log_rollups")
+    op.drop_table("email_log_rollups")
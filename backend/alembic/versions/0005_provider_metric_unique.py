@@ -0,0 +1,84 @@
+"""provider metric period unique
+
+Adds uix_provider_metric_period (one provider_performance_metrics row per
+provider, period type and period start), which ProviderMetricsService relies
+on to settle concurrent creation of a period row. Duplicate rows already in
+the table are merged first: their counters are summed into the oldest row
+and the rest deleted. Tables that already have the constraint (created by
+create_tables.py from the current model) are left alone. Mirrors
+ProviderPerformanceMetric.__table_args__.
+
+Revision ID: 0005_provider_metric_unique
+Revises: 0004_email_log_rollups
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_provider_metric_unique'
+down_revision: Union[str, None] = '0004_email_log_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLE = "provider_performance_metrics"
+CONSTRAINT = "uix_provider_metric_period"
+PERIOD_COLUMNS = ["provider_id", "period_type", "metric_date"]
+COUNTERS = ["total_referrals_received", "referrals_accepted", "referrals_completed", "referrals_declined"]
+
+SAME_PERIOD = " AND ".join(f"d.{column} = {TABLE}.{column}" for column in PERIOD_COLUMNS)
+FIRST_OF_DUPLICATES = (
+    f"SELECT MIN(id) FROM {TABLE} GROUP BY {', '.join(PERIOD_COLUMNS)} HAVING COUNT(*) > 1"
+)
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _has_constraint() -> bool:
+    inspector = sa.inspect(op.get_bind())
+    if TABLE not in inspector.get_table_names():
+        return True
+    return any(constraint["name"] == CONSTRAINT for constraint in inspector.get_unique_constraints(TABLE))
+
+
+def upgrade() -> None:
+    if _has_constraint():
+        return
+
+    # Merge duplicate period rows into the oldest one, then drop the others
+    sums = ", ".join(
+        f"{counter} = (SELECT SUM(COALESCE(d.{counter}, 0)) FROM {TABLE} d WHERE {SAME_PERIOD})"
+        for counter in COUNTERS
+    )
+    op.execute(f"UPDATE {TABLE} SET {sums} WHERE id IN ({FIRST_OF_DUPLICATES})")
+    op.execute(
+        f"DELETE FROM {TABLE} WHERE id NOT IN "
+        f"(SELECT MIN(id) FROM {TABLE} GROUP BY {', '.join(PERIOD_COLUMNS)})"
+    )
+
+    if _is_postgresql():
+        # Build the index without blocking writes, then attach it as the constraint
+        with op.get_context().autocommit_block():
+            op.execute(
+                f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {CONSTRAINT} "
+                f"ON {TABLE} ({', '.join(PERIOD_COLUMNS)})"
+            )
+            op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {CONSTRAINT} UNIQUE USING INDEX {CONSTRAINT}")
+    else:
+        with op.batch_alter_table(TABLE) as batch:
+            batch.create_unique_constraint(CONSTRAINT, PERIOD_COLUMNS)
+
+
+def downgrade() -> None:
+    if _is_postgresql():
+        op.drop_constraint(CONSTRAINT, TABLE, type_="unique")
+    else:
+        with op.batch_alter_table(TABLE) as batch:
+            batch.drop_constraint(CONSTRAINT, type_="unique")
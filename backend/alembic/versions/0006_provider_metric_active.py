@@ -0,0 +1,60 @@
+"""provider metric active count
+
+Adds provider_performance_metrics.referrals_active. The "current" snapshot
+rows used referrals_accepted for the active caseload (accepted or in
+progress); that count moves to referrals_active and referrals_accepted goes
+back to meaning referrals in the accepted status. Both are recomputed from
+the referrals table for the current rows. Mirrors ProviderPerformanceMetric.
+
+Revision ID: 0006_provider_metric_active
+Revises: 0005_provider_metric_unique
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_provider_metric_active'
+down_revision: Union[str, None] = '0005_provider_metric_unique'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLE = "provider_performance_metrics"
+ACCEPTED_STATUSES = "'accepted'"
+ACTIVE_STATUSES = "'accepted', 'in_progress'"
+
+
+def _count_current(statuses: str) -> str:
+    """Correlated count of the provider's assigned referrals in the given statuses"""
+    return (
+        f"(SELECT COUNT(*) FROM referrals r WHERE r.assigned_provider_id = {TABLE}.provider_id "
+        f"AND r.status IN ({statuses}))"
+    )
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if TABLE not in inspector.get_table_names():
+        return
+
+    if "referrals_active" not in {column["name"] for column in inspector.get_columns(TABLE)}:
+        op.add_column(TABLE, sa.Column("referrals_active", sa.Integer(), nullable=True))
+
+    op.execute(
+        f"UPDATE {TABLE} SET "
+        f"referrals_active = {_count_current(ACTIVE_STATUSES)}, "
+        f"referrals_accepted = {_count_current(ACCEPTED_STATUSES)} "
+        f"WHERE period_type = 'current'"
+    )
+    op.execute(f"UPDATE {TABLE} SET referrals_active = 0 WHERE referrals_active IS NULL")
+
+
+def downgrade() -> None:
+    op.execute(f"UPDATE {TABLE} SET referrals_accepted = referrals_active WHERE period_type = 'current'")
+    with op.batch_alter_table(TABLE) as batch:
+        batch.drop_column("referrals_active")
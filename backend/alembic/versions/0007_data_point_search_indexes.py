@@ -0,0 +1,64 @@
+"""data point search indexes
+
+GIN trigram indexes on data_points.name and data_points.description, which
+make the ILIKE '%q%' data point search index-backed on PostgreSQL. The two
+columns are indexed separately, as the search matches them separately.
+
+The pg_trgm extension is created if the server ships it; without it (or on
+other databases) nothing is done and search runs unindexed, ranked without
+similarity(). Indexes are built CONCURRENTLY so data_points stays writable.
+
+Revision ID: 0007_data_point_search_indexes
+Revises: 0006_provider_metric_active
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_data_point_search_indexes'
+down_revision: Union[str, None] = '0006_provider_metric_active'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_data_points_name_trgm", "name"),
+    ("ix_data_points_description_trgm", "description"),
+]
+
+
+def _has_trigram_extension() -> bool:
+    """Whether the server can provide pg_trgm (installed or available to install)"""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or "data_points" not in sa.inspect(bind).get_table_names():
+        return False
+    return bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).first() is not None
+
+
+def upgrade() -> None:
+    if not _has_trigram_extension():
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CREATE INDEX CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON data_points USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # The extension is left installed; other objects may use it
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -1,7 +1,7 @@
 # backend/app/api/v1/api_simple.py - Updated with Dynamic Data
 from fastapi import APIRouter
 
-from app.api.v1 import participants, documents, sil_homes, referrals_simple
+from app.api.v1 import participants, documents, sil_homes, referrals_simple, database_status
 # Import dynamic data router
 from app.api.v1 import dynamic_data_complete
 
@@ -15,6 +15,9 @@ api_router.include_router(participants.router, prefix="/participants", tags=["pa
 api_router.include_router(documents.router, prefix="/documents", tags=["documents"])
 api_router.include_router(sil_homes.router, prefix="/sil-homes", tags=["sil-homes"])
 
+# Admin status - database connection pool
+api_router.include_router(database_status.router, prefix="/admin", tags=["admin"])
+
 # Dynamic data - the main router for all dynamic data operations
 # This provides comprehensive CRUD operations for data types and points
 api_router.include_router(
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.schemas.user import UserCreate, UserLogin, UserLoginResponse, UserResponse, ProviderList
 from app.services.auth_service import AuthService, get_auth_service
 from app.models.user import User, UserRole
@@ -29,13 +31,16 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(
+def register_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
     auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     Register a new user
+
+    A plain def, so FastAPI runs it in its threadpool: password hashing and
+    the sync session would otherwise hold up the event loop.
     """
     try:
         user = auth_service.create_user(db, user_data)
@@ -50,13 +55,13 @@ async def register_user(
 
 
 @router.post("/login", response_model=UserLoginResponse)
-async def login(
+def login(
     login_data: UserLogin,
     db: Session = Depends(get_db),
     auth_service: AuthService = Depends(get_auth_service)
 ):
     """
-    Login user and return access token
+    Login user and return access token (threadpool, as register_user)
     """
     return auth_service.login_user(db, login_data)
 
@@ -72,7 +77,7 @@ async def get_current_user_info(current_user: User = Depends(get_current_active_
 @router.get("/providers", response_model=List[ProviderList])
 async def get_all_providers(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get list of all providers (admin only)
@@ -84,7 +89,7 @@ async def get_all_providers(
             detail="Only admins can view provider list"
         )
     
-    providers = db.query(User).filter(User.role == UserRole.PROVIDER).all()
+    providers = (await db.scalars(select(User).where(User.role == UserRole.PROVIDER))).all()
     return providers
 
 
@@ -97,14 +102,14 @@ async def logout():
 
 
 @router.post("/create-provider", response_model=UserResponse)
-async def create_provider(
+def create_provider(
     user_data: UserCreate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
     auth_service: AuthService = Depends(get_auth_service)
 ):
     """
-    Create a new provider account (admin only)
+    Create a new provider account (admin only, threadpool as register_user)
     """
     # Check if current user is admin
     if current_user.role != UserRole.ADMIN:
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, Any
+
+from app.core.config import settings
+from app.core.database import async_engine, engine, pool_stats, replica_router
+from app.models.user import User, UserRole
+from app.api.v1.auth import get_current_active_user
+
+router = APIRouter()
+
+
+@router.get("/database/pool")
+async def get_database_pool_status(
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    Get connection pool occupancy, checkout metrics and read replica state (admin only)
+
+    Figures are for the process serving the request, since the last restart.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view database pool status"
+        )
+    
+    engines = [engine, async_engine]
+    for replica in replica_router.replicas:
+        engines += [replica.engine, replica.async_engine]
+    
+    return {
+        "pgbouncer": settings.DB_PGBOUNCER,
+        "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS,
+        "pools": [pool_stats(e) for e in engines if e is not None],
+        "replicas": replica_router.stats()
+    }
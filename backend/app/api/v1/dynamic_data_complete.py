@@ -1,10 +1,12 @@
 # backend/app/api/v1/dynamic_data_complete.py
 from __future__ import annotations
 
+import hashlib
+import io
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
@@ -12,9 +14,10 @@ from app.core.database import get_db
 from app.schemas.dynamic_data import (
     DataTypeCreate, DataTypeUpdate, DataTypeResponse, DataTypeWithPointsResponse,
     DataPointCreate, DataPointUpdate, DataPointResponse,
-    BulkDataPointCreate, BulkDataPointResponse
+    BulkDataPointCreate, BulkDataPointResponse, DataPointImportResponse
 )
 from app.services.dynamic_data_service import DynamicDataService
+from app.services.dynamic_data_import_service import DynamicDataImportService
 from app.models.dynamic_data import DataType, DataPoint
 
 router = APIRouter()
@@ -342,6 +345,64 @@ def bulk_create_data_points(
             detail=f"Bulk data point creation failed: {str(e)}"
         )
 
+@router.post(
+    "/data-types/{data_type_name}/import",
+    response_model=DataPointImportResponse,
+    name="import_data_points",
+    summary="Import data points from a file",
+    description="Stream a CSV or NDJSON file into a data type in batches. Extra columns are stored in extra_data; "
+                "pass committed_records from an interrupted import as resume_from to continue it"
+)
+def import_data_points(
+    data_type_name: str,
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    name_column: str = Query("name"),
+    description_column: str = Query("description"),
+    on_conflict: str = Query("update", pattern="^(fail|skip|update)$"),
+    resume_from: int = Query(0, ge=0),
+    batch_size: int = Query(1000, ge=1, le=5000),
+    db: Session = Depends(get_db)
+) -> DataPointImportResponse:
+    """Import data points from an uploaded CSV/NDJSON file"""
+    data_type = DynamicDataService.get_data_type_by_name(db, data_type_name)
+    if not data_type:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Data type not found"
+        )
+    
+    try:
+        # Read the spooled upload as text one record at a time
+        stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        records = DynamicDataImportService.iter_records(
+            stream,
+            file_format or DynamicDataImportService.detect_format(file.filename),
+            name_column=name_column,
+            description_column=description_column
+        )
+        return DynamicDataImportService.import_records(
+            db, data_type, records,
+            on_conflict=on_conflict,
+            batch_size=batch_size,
+            resume_from=resume_from,
+            progress=lambda result: log.info(
+                "Import into %s: %s records committed", data_type.name, result.committed_records
+            )
+        )
+    except UnicodeDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File is not valid UTF-8: {str(e)}"
+        )
+    except Exception as e:
+        db.rollback()
+        log.exception("Data point import failed")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Data point import failed: {str(e)}"
+        )
+
 # ========== SEARCH AND UTILITY ENDPOINTS ==========
 
 @router.get(
@@ -349,16 +410,21 @@ def bulk_create_data_points(
     response_model=List[DataPointResponse],
     name="search_data_points",
     summary="Search data points",
-    description="Search data points by name or description across all or specific data types"
+    description="Search data points by name or description across all or specific data types, best matches first"
 )
 def search_data_points(
     q: str = Query(..., description="Search query"),
     data_type: Optional[str] = Query(None, description="Limit search to specific data type"),
+    active_only: bool = Query(False),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db)
 ) -> List[DataPointResponse]:
     """Search data points by name or description"""
     try:
-        data_points = DynamicDataService.search_data_points(db, q, data_type)
+        data_points = DynamicDataService.search_data_points(
+            db, q, data_type, limit=limit, offset=offset, active_only=active_only
+        )
         return [orm_to_data_point_response(dp) for dp in data_points]
     except Exception as e:
         log.exception("Search data points failed")
@@ -367,6 +433,30 @@ def search_data_points(
             detail=f"Search failed: {str(e)}"
         )
 
+@router.get(
+    "/typeahead",
+    response_model=List[DataPointResponse],
+    name="typeahead_data_points",
+    summary="Complete a data point name",
+    description="Active data points whose name or words start with the typed text, for autocomplete fields"
+)
+def typeahead_data_points(
+    q: str = Query(..., min_length=1, description="Text typed so far"),
+    data_type: Optional[str] = Query(None, description="Limit suggestions to specific data type"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+) -> List[DataPointResponse]:
+    """Suggest data points for the typed prefix"""
+    try:
+        data_points = DynamicDataService.typeahead_data_points(db, q, data_type, limit=limit)
+        return [orm_to_data_point_response(dp) for dp in data_points]
+    except Exception as e:
+        log.exception("Typeahead failed")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Typeahead failed: {str(e)}"
+        )
+
 @router.post(
     "/initialize",
     name="initialize_default_data",
@@ -429,8 +519,78 @@ def get_dynamic_data_status(
             "error": str(e)
         }
 
+@router.get(
+    "/cache/stats",
+    name="dynamic_data_cache_stats",
+    summary="Get cache statistics",
+    description="Hit/miss counters for the in-process dynamic data cache of this worker"
+)
+def get_dynamic_data_cache_stats() -> Dict[str, Any]:
+    """Get dynamic data cache statistics"""
+    return DynamicDataService.get_cache_stats()
+
+@router.get(
+    "/snapshot",
+    name="get_dynamic_data_snapshot",
+    summary="Get all reference data",
+    description="All active data types with their active points in one compact, versioned response"
+)
+def get_dynamic_data_snapshot(
+    request: Request,
+    db: Session = Depends(get_db)
+) -> Response:
+    """Get every active data type and its points, answering If-None-Match with 304"""
+    body, version = DynamicDataService.get_snapshot(db)
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 # ========== CONVENIENCE ENDPOINTS FOR COMMON DATA TYPES ==========
 
+def make_etag(type_name: str, version: str, active_only: bool) -> str:
+    """Build a strong ETag for a data type's points response"""
+    digest = hashlib.sha1(f"{type_name}:{active_only}:{version}".encode()).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [
+        tag[2:] if tag.startswith("W/") else tag for tag in candidates
+    ]
+
+def conditional_data_points(
+    type_name: str,
+    active_only: bool,
+    request: Request,
+    response: Response,
+    db: Session
+) -> Union[Response, List[DataPointResponse]]:
+    """
+    Serve a type's points with an ETag, answering If-None-Match with 304.
+
+    The version stamp is cached and invalidated on writes, so a revalidation
+    hit does not query the database.
+    """
+    version = DynamicDataService.get_data_type_version(db, type_name)
+    if version is None:
+        return []
+    
+    etag = make_etag(type_name, version, active_only)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    data_points = DynamicDataService.get_data_points_by_type_name(
+        db, type_name, active_only=active_only
+    )
+    return [orm_to_data_point_response(dp) for dp in data_points]
+
 @router.get(
     "/disability-types",
     response_model=List[DataPointResponse],
@@ -439,14 +599,13 @@ def get_dynamic_data_status(
     description="Convenience endpoint to get all disability types"
 )
 def get_disability_types(
+    request: Request,
+    response: Response,
     active_only: bool = Query(True),
     db: Session = Depends(get_db)
-) -> List[DataPointResponse]:
+) -> Union[Response, List[DataPointResponse]]:
     """Get all disability types"""
-    data_points = DynamicDataService.get_data_points_by_type_name(
-        db, "disability_types", active_only=active_only
-    )
-    return [orm_to_data_point_response(dp) for dp in data_points]
+    return conditional_data_points("disability_types", active_only, request, response, db)
 
 @router.get(
     "/service-types",
@@ -456,14 +615,13 @@ def get_disability_types(
     description="Convenience endpoint to get all service types"
 )
 def get_service_types(
+    request: Request,
+    response: Response,
     active_only: bool = Query(True),
     db: Session = Depends(get_db)
-) -> List[DataPointResponse]:
+) -> Union[Response, List[DataPointResponse]]:
     """Get all service types"""
-    data_points = DynamicDataService.get_data_points_by_type_name(
-        db, "service_types", active_only=active_only
-    )
-    return [orm_to_data_point_response(dp) for dp in data_points]
+    return conditional_data_points("service_types", active_only, request, response, db)
 
 @router.get(
     "/plan-types",
@@ -473,14 +631,13 @@ def get_service_types(
     description="Convenience endpoint to get all NDIS plan types"
 )
 def get_plan_types(
+    request: Request,
+    response: Response,
     active_only: bool = Query(True),
     db: Session = Depends(get_db)
-) -> List[DataPointResponse]:
+) -> Union[Response, List[DataPointResponse]]:
     """Get all plan types"""
-    data_points = DynamicDataService.get_data_points_by_type_name(
-        db, "plan_types", active_only=active_only
-    )
-    return [orm_to_data_point_response(dp) for dp in data_points]
+    return conditional_data_points("plan_types", active_only, request, response, db)
 
 @router.get(
     "/contact-methods",
@@ -490,14 +647,13 @@ def get_plan_types(
     description="Convenience endpoint to get all contact methods"
 )
 def get_contact_methods(
+    request: Request,
+    response: Response,
     active_only: bool = Query(True),
     db: Session = Depends(get_db)
-) -> List[DataPointResponse]:
+) -> Union[Response, List[DataPointResponse]]:
     """Get all contact methods"""
-    data_points = DynamicDataService.get_data_points_by_type_name(
-        db, "contact_methods", active_only=active_only
-    )
-    return [orm_to_data_point_response(dp) for dp in data_points]
+    return conditional_data_points("contact_methods", active_only, request, response, db)
 
 @router.get(
     "/support-categories",
@@ -507,14 +663,13 @@ def get_contact_methods(
     description="Convenience endpoint to get all support categories"
 )
 def get_support_categories(
+    request: Request,
+    response: Response,
     active_only: bool = Query(True),
     db: Session = Depends(get_db)
-) -> List[DataPointResponse]:
+) -> Union[Response, List[DataPointResponse]]:
     """Get all support categories"""
-    data_points = DynamicDataService.get_data_points_by_type_name(
-        db, "support_categories", active_only=active_only
-    )
-    return [orm_to_data_point_response(dp) for dp in data_points]
+    return conditional_data_points("support_categories", active_only, request, response, db)
 
 @router.get(
     "/urgency-levels",
@@ -524,14 +679,13 @@ def get_support_categories(
     description="Convenience endpoint to get all urgency levels"
 )
 def get_urgency_levels(
+    request: Request,
+    response: Response,
     active_only: bool = Query(True),
     db: Session = Depends(get_db)
-) -> List[DataPointResponse]:
+) -> Union[Response, List[DataPointResponse]]:
     """Get all urgency levels"""
-    data_points = DynamicDataService.get_data_points_by_type_name(
-        db, "urgency_levels", active_only=active_only
-    )
-    return [orm_to_data_point_response(dp) for dp in data_points]
+    return conditional_data_points("urgency_levels", active_only, request, response, db)
 
 # ========== ADMIN ONLY ENDPOINTS ==========
 
@@ -562,6 +716,7 @@ def delete_data_type(
         # Delete the data type
         db.delete(data_type)
         db.commit()
+        DynamicDataService.invalidate_cache([data_type.name])
         
         return {
             "ok": True, 
@@ -601,6 +756,7 @@ def reset_dynamic_data(
         # Delete all data types
         db.query(DataType).delete()
         db.commit()
+        DynamicDataService.invalidate_cache()
         
         # Reinitialize with defaults
         DynamicDataService.initialize_default_data_types(db)
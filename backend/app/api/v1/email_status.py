@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional
+from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.email_log import EmailLog, get_email_stats_for_referral
 from app.models.user import User, UserRole
 from app.api.v1.auth import get_current_active_user
+from app.services.email_outbox import EmailOutbox
+from app.services.email_retry import mailgun_breaker
+from app.services.email_statistics_service import EmailStatisticsService
+from app.services.email_service import get_email_service
 
 router = APIRouter()
 
@@ -14,7 +20,7 @@ router = APIRouter()
 async def get_referral_email_status(
     referral_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Get email status for a specific referral
@@ -27,12 +33,14 @@ async def get_referral_email_status(
         )
     
     # Get email statistics
-    stats = get_email_stats_for_referral(db, referral_id)
+    stats = await db.run_sync(get_email_stats_for_referral, referral_id)
     
     # Get detailed email logs
-    email_logs = db.query(EmailLog).filter(
-        EmailLog.referral_id == referral_id
-    ).order_by(EmailLog.created_at.desc()).all()
+    email_logs = (await db.scalars(
+        select(EmailLog).where(
+            EmailLog.referral_id == referral_id
+        ).order_by(EmailLog.created_at.desc())
+    )).all()
     
     logs_data = []
     for log in email_logs:
@@ -58,7 +66,7 @@ async def get_referral_email_status(
 @router.get("/emails/failed")
 async def get_failed_emails(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[Dict[str, Any]]:
     """
     Get all failed emails (admin only)
@@ -70,9 +78,11 @@ async def get_failed_emails(
             detail="Only admins can view failed emails"
         )
     
-    failed_emails = db.query(EmailLog).filter(
-        EmailLog.status == "failed"
-    ).order_by(EmailLog.created_at.desc()).limit(50).all()
+    failed_emails = (await db.scalars(
+        select(EmailLog).where(
+            EmailLog.status == "failed"
+        ).order_by(EmailLog.created_at.desc()).limit(50)
+    )).all()
     
     result = []
     for log in failed_emails:
@@ -92,11 +102,15 @@ async def get_failed_emails(
 
 @router.get("/emails/statistics")
 async def get_email_statistics(
+    live: bool = False,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Get overall email statistics (admin only)
+
+    Counts come from the hourly rollup, refreshed when older than
+    EMAIL_STATS_ROLLUP_MAX_AGE_SECONDS; live=true counts email_logs directly.
     """
     # Check if user is admin
     if current_user.role != UserRole.ADMIN:
@@ -105,34 +119,63 @@ async def get_email_statistics(
             detail="Only admins can view email statistics"
         )
     
-    # Get overall statistics
-    total_emails = db.query(EmailLog).count()
-    sent_emails = db.query(EmailLog).filter(EmailLog.status == "sent").count()
-    failed_emails = db.query(EmailLog).filter(EmailLog.status == "failed").count()
-    pending_emails = db.query(EmailLog).filter(EmailLog.status == "pending").count()
+    overview = await db.run_sync(EmailStatisticsService.get_overview, live=live)
+    return {
+        "overall": overview["overall"],
+        "by_type": overview["by_type"],
+        "by_type_status": overview["by_type_status"],
+        "source": overview["source"]
+    }
+
+
+@router.get("/emails/statistics/timeline")
+async def get_email_statistics_timeline(
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    email_type: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> Dict[str, Any]:
+    """
+    Get email counts and success rate per hour or day, with the trend (admin only)
+
+    Defaults to the last 24 hours by hour, or the last 30 days by day.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view email statistics"
+        )
     
-    # Get statistics by email type
-    provider_notifications = db.query(EmailLog).filter(
-        EmailLog.email_type == "provider_notification"
-    ).count()
-    participant_confirmations = db.query(EmailLog).filter(
-        EmailLog.email_type == "participant_confirmation"
-    ).count()
-    referrer_notifications = db.query(EmailLog).filter(
-        EmailLog.email_type == "referrer_notification"
-    ).count()
+    if start and end and start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    
+    return await db.run_sync(EmailStatisticsService.get_timeline, granularity, start, end, email_type)
+
+@router.get("/emails/delivery")
+async def get_email_delivery_status(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> Dict[str, Any]:
+    """
+    Get send throttling, circuit breaker and outbox state (admin only)
+
+    The rate limiter and breaker figures are for the process serving the
+    request; the outbox backlog is read from the database.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view email delivery status"
+        )
     
+    email_service = get_email_service()
     return {
-        "overall": {
-            "total_emails": total_emails,
-            "sent": sent_emails,
-            "failed": failed_emails,
-            "pending": pending_emails,
-            "success_rate": round((sent_emails / total_emails * 100) if total_emails > 0 else 0, 2)
-        },
-        "by_type": {
-            "provider_notifications": provider_notifications,
-            "participant_confirmations": participant_confirmations,
-            "referrer_notifications": referrer_notifications
-        }
-    }
\ No newline at end of file
+        "rate_limit": email_service.rate_limiter.stats() if email_service.rate_limiter else None,
+        "circuit_breaker": mailgun_breaker.stats(),
+        "outbox_pending": await db.run_sync(EmailOutbox.pending_count)
+    }
@@ -1,15 +1,17 @@
 # backend/app/api/v1/provider_admin.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_async_read_db
 from app.models.user import User, UserRole, ServiceType
 from app.models.referral import Referral
 from app.api.v1.auth import get_current_active_user
 from app.schemas.provider import ProviderReferralResponse
-from app.services.provider_admin_service import ProviderAdminService
+from app.services.provider_admin_service import AsyncProviderAdminService
+from app.utils.pagination import NEXT_CURSOR_HEADER, next_cursor
 
 router = APIRouter()
 
@@ -26,23 +28,23 @@ async def get_all_providers(
     active_only: bool = Query(True),
     service_type: Optional[str] = Query(None),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all providers with their statistics (Admin only)"""
     require_admin_or_coordinator(current_user)
     
-    return ProviderAdminService.get_all_providers(db, active_only, service_type)
+    return await AsyncProviderAdminService.get_all_providers(db, active_only, service_type)
 
 @router.get("/providers/{provider_id}/dashboard", response_model=Dict[str, Any])
 async def get_provider_dashboard_admin(
     provider_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get provider dashboard data for admin oversight"""
     require_admin_or_coordinator(current_user)
     
-    dashboard_data = ProviderAdminService.get_provider_dashboard_admin(db, provider_id)
+    dashboard_data = await AsyncProviderAdminService.get_provider_dashboard_admin(db, provider_id)
     
     if not dashboard_data:
         raise HTTPException(
@@ -54,19 +56,29 @@ async def get_provider_dashboard_admin(
 
 @router.get("/referrals/unassigned", response_model=List[ProviderReferralResponse])
 async def get_unassigned_referrals(
+    response: Response,
     service_type: Optional[str] = Query(None),
     priority: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all unassigned referrals for assignment"""
     require_admin_or_coordinator(current_user)
     
-    return ProviderAdminService.get_unassigned_referrals(
-        db, service_type, priority, skip, limit
-    )
+    try:
+        referrals = await AsyncProviderAdminService.get_unassigned_referrals(
+            db, service_type, priority, skip, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    following = next_cursor(referrals, limit)
+    if following:
+        response.headers[NEXT_CURSOR_HEADER] = following
+    return referrals
 
 @router.post("/referrals/{referral_id}/assign")
 async def assign_referral_to_provider(
@@ -75,12 +87,12 @@ async def assign_referral_to_provider(
     priority: Optional[str] = "medium",
     notes: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Assign a referral to a specific provider"""
     require_admin_or_coordinator(current_user)
     
-    success = ProviderAdminService.assign_referral_to_provider(
+    success = await AsyncProviderAdminService.assign_referral_to_provider(
         db, referral_id, provider_id, priority, notes, current_user.id
     )
     
@@ -98,12 +110,12 @@ async def reassign_referral(
     new_provider_id: int,
     reason: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Reassign a referral from one provider to another"""
     require_admin_or_coordinator(current_user)
     
-    success = ProviderAdminService.reassign_referral(
+    success = await AsyncProviderAdminService.reassign_referral(
         db, referral_id, new_provider_id, reason, current_user.id
     )
     
@@ -120,12 +132,12 @@ async def get_overdue_referrals(
     days_overdue: int = Query(7, ge=1),
     provider_id: Optional[int] = Query(None),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get referrals that are overdue for response or completion"""
     require_admin_or_coordinator(current_user)
     
-    return ProviderAdminService.get_overdue_referrals(db, days_overdue, provider_id)
+    return await AsyncProviderAdminService.get_overdue_referrals(db, days_overdue, provider_id)
 
 @router.get("/providers/{provider_id}/performance", response_model=Dict[str, Any])
 async def get_provider_performance_admin(
@@ -133,12 +145,12 @@ async def get_provider_performance_admin(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed provider performance metrics for admin review"""
     require_admin_or_coordinator(current_user)
     
-    performance = ProviderAdminService.get_provider_performance_detailed(
+    performance = await AsyncProviderAdminService.get_provider_performance_detailed(
         db, provider_id, start_date, end_date
     )
     
@@ -153,29 +165,29 @@ async def get_provider_performance_admin(
 @router.get("/analytics/workload", response_model=Dict[str, Any])
 async def get_provider_workload_analytics(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get workload distribution analytics across all providers"""
     require_admin_or_coordinator(current_user)
     
-    return ProviderAdminService.get_workload_analytics(db)
+    return await AsyncProviderAdminService.get_workload_analytics(db)
 
 @router.get("/analytics/performance-summary", response_model=Dict[str, Any])
 async def get_performance_summary(
     period_days: int = Query(30, ge=1, le=365),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get overall performance summary for all providers"""
     require_admin_or_coordinator(current_user)
     
-    return ProviderAdminService.get_performance_summary(db, period_days)
+    return await AsyncProviderAdminService.get_performance_summary(db, period_days)
 
 @router.post("/providers/{provider_id}/activate")
 async def activate_provider(
     provider_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Activate a provider account"""
     if current_user.role != UserRole.ADMIN:
@@ -184,7 +196,7 @@ async def activate_provider(
             detail="Admin access required"
         )
     
-    success = ProviderAdminService.update_provider_status(db, provider_id, True)
+    success = await AsyncProviderAdminService.update_provider_status(db, provider_id, True)
     
     if not success:
         raise HTTPException(
@@ -200,7 +212,7 @@ async def deactivate_provider(
     reason: str,
     reassign_referrals: bool = True,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Deactivate a provider account"""
     if current_user.role != UserRole.ADMIN:
@@ -209,7 +221,7 @@ async def deactivate_provider(
             detail="Admin access required"
         )
     
-    result = ProviderAdminService.deactivate_provider(
+    result = await AsyncProviderAdminService.deactivate_provider(
         db, provider_id, reason, reassign_referrals, current_user.id
     )
     
@@ -224,20 +236,30 @@ async def deactivate_provider(
 @router.get("/providers/{provider_id}/referrals", response_model=List[ProviderReferralResponse])
 async def get_provider_referrals_admin(
     provider_id: int,
+    response: Response,
     status_filter: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all referrals for a specific provider (admin view)"""
     require_admin_or_coordinator(current_user)
     
-    return ProviderAdminService.get_provider_referrals_admin(
-        db, provider_id, status_filter, start_date, end_date, skip, limit
-    )
+    try:
+        referrals = await AsyncProviderAdminService.get_provider_referrals_admin(
+            db, provider_id, status_filter, start_date, end_date, skip, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    following = next_cursor(referrals, limit)
+    if following:
+        response.headers[NEXT_CURSOR_HEADER] = following
+    return referrals
 
 @router.post("/referrals/bulk-assign")
 async def bulk_assign_referrals(
@@ -246,12 +268,12 @@ async def bulk_assign_referrals(
     priority: Optional[str] = "medium",
     notes: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Bulk assign multiple referrals to a provider"""
     require_admin_or_coordinator(current_user)
     
-    result = ProviderAdminService.bulk_assign_referrals(
+    result = await AsyncProviderAdminService.bulk_assign_referrals(
         db, referral_ids, provider_id, priority, notes, current_user.id
     )
     
@@ -261,12 +283,12 @@ async def bulk_assign_referrals(
 async def get_provider_capacity(
     provider_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get provider's current capacity and availability"""
     require_admin_or_coordinator(current_user)
     
-    capacity = ProviderAdminService.get_provider_capacity(db, provider_id)
+    capacity = await AsyncProviderAdminService.get_provider_capacity(db, provider_id)
     
     if not capacity:
         raise HTTPException(
@@ -280,12 +302,12 @@ async def get_provider_capacity(
 async def get_assignment_suggestions(
     referral_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get suggested providers for a referral based on service type, location, and capacity"""
     require_admin_or_coordinator(current_user)
     
-    suggestions = ProviderAdminService.get_assignment_suggestions(db, referral_id)
+    suggestions = await AsyncProviderAdminService.get_assignment_suggestions(db, referral_id)
     
     if not suggestions:
         raise HTTPException(
@@ -299,12 +321,12 @@ async def get_assignment_suggestions(
 async def get_provider_alerts(
     severity: Optional[str] = Query(None),  # low, medium, high, critical
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get alerts about provider issues (overdue responses, high cancellation rates, etc.)"""
     require_admin_or_coordinator(current_user)
     
-    return ProviderAdminService.get_provider_alerts(db, severity)
+    return await AsyncProviderAdminService.get_provider_alerts(db, severity)
 
 @router.post("/providers/{provider_id}/send-notification")
 async def send_notification_to_provider(
@@ -315,12 +337,12 @@ async def send_notification_to_provider(
     priority: Optional[str] = "medium",
     action_required: bool = False,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a notification to a specific provider"""
     require_admin_or_coordinator(current_user)
     
-    success = ProviderAdminService.send_notification_to_provider(
+    success = await AsyncProviderAdminService.send_notification_to_provider(
         db, provider_id, notification_type, title, message, 
         priority, action_required, current_user.id
     )
@@ -339,20 +361,21 @@ async def generate_provider_summary_report(
     end_date: date,
     provider_ids: Optional[List[int]] = Query(None),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Generate comprehensive provider performance report"""
     require_admin_or_coordinator(current_user)
     
     if not provider_ids:
         # Get all active providers if none specified
-        providers = db.query(User).filter(
-            User.role == UserRole.PROVIDER,
-            User.is_active == True
-        ).all()
-        provider_ids = [p.id for p in providers]
-    
-    report = ProviderAdminService.generate_provider_summary_report(
+        provider_ids = (await db.scalars(
+            select(User.id).where(
+                User.role == UserRole.PROVIDER,
+                User.is_active == True
+            )
+        )).all()
+    
+    report = await AsyncProviderAdminService.generate_provider_summary_report(
         db, start_date, end_date, provider_ids
     )
     
@@ -365,12 +388,12 @@ async def get_provider_activity_timeline(
     end_date: Optional[date] = Query(None),
     limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get provider activity timeline for admin review"""
     require_admin_or_coordinator(current_user)
     
-    timeline = ProviderAdminService.get_provider_timeline(
+    timeline = await AsyncProviderAdminService.get_provider_timeline(
         db, provider_id, start_date, end_date, limit
     )
     
@@ -381,7 +404,7 @@ async def create_performance_review(
     provider_id: int,
     review_data: Dict[str, Any],
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a performance review for a provider"""
     if current_user.role != UserRole.ADMIN:
@@ -390,7 +413,7 @@ async def create_performance_review(
             detail="Admin access required"
         )
     
-    success = ProviderAdminService.create_performance_review(
+    success = await AsyncProviderAdminService.create_performance_review(
         db, provider_id, review_data, current_user.id
     )
     
@@ -405,9 +428,9 @@ async def create_performance_review(
 @router.get("/dashboard/summary", response_model=Dict[str, Any])
 async def get_admin_dashboard_summary(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get summary data for admin dashboard"""
     require_admin_or_coordinator(current_user)
     
-    return ProviderAdminService.get_admin_dashboard_summary(db)
\ No newline at end of file
+    return await AsyncProviderAdminService.get_admin_dashboard_summary(db)
\ No newline at end of file
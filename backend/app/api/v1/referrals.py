@@ -11,7 +11,7 @@ from typing import List
 from app.core.database import get_db
 from app.schemas.referral import ReferralCreate, ReferralResponse, ReferralUpdate
 from app.services.referral_service import ReferralService
-from app.services.email_service import EmailService
+from app.services.email_service import get_email_service
 from app.models.user import User, UserRole, get_providers_for_service, get_admins
 from app.models.referral import Referral
 
@@ -137,7 +137,7 @@ async def submit_referral(
             provider_emails = get_provider_emails_for_referral(referral, db)
             
             # Initialize email service
-            email_service = EmailService()
+            email_service = get_email_service()
             
             if email_service.is_configured():
                 # Send participant confirmation email
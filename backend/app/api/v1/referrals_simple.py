@@ -1,22 +1,32 @@
 # backend/app/api/v1/referrals_simple.py - COMPLETE VERSION
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import asyncio
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import SessionLocal, get_async_db
 from app.schemas.referral import ReferralCreate, ReferralResponse, ReferralUpdate
-from app.services.referral_service import ReferralService
+from app.services.referral_service import AsyncReferralService
+from app.utils.pagination import NEXT_CURSOR_HEADER, next_cursor
 
 # Import with error handling for optional dependencies
 try:
-    from app.services.email_service import EmailService
+    from app.services.email_service import get_email_service
     EMAIL_SERVICE_AVAILABLE = True
 except ImportError:
-    EmailService = None
+    get_email_service = None
     EMAIL_SERVICE_AVAILABLE = False
     print("Warning: Email service not available")
 
+try:
+    from app.services.email_outbox import EmailOutbox
+    EMAIL_OUTBOX_AVAILABLE = True
+except ImportError:
+    EmailOutbox = None
+    EMAIL_OUTBOX_AVAILABLE = False
+
 try:
     from app.models.user import User, UserRole, get_providers_for_service, get_admins
     USER_SERVICE_AVAILABLE = True
@@ -76,33 +86,54 @@ def get_provider_emails_for_referral(referral, db: Session) -> List[str]:
 @router.post("/referral-simple", response_model=ReferralResponse, status_code=status.HTTP_201_CREATED)
 async def submit_referral_simple(
     referral_data: ReferralCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Submit a new referral form with DIRECT email sending (no background queue)
-    Use this for testing when Celery/Redis is not available
+    Submit a new referral form
+
+    With EMAIL_DELIVERY=direct (the default) the notification emails are
+    sent before returning (no background queue needed); their email_logs rows
+    are written through a short-lived sync session. With EMAIL_DELIVERY=outbox
+    they are written to the email_logs outbox in the same transaction as the
+    referral and sent by dispatch_emails.py, so the response doesn't wait for
+    Mailgun.
     """
     try:
         print(f"Received referral data for: {referral_data.firstName} {referral_data.lastName}")
         
+        if settings.EMAIL_DELIVERY == "outbox" and EMAIL_OUTBOX_AVAILABLE:
+            try:
+                # Create the referral and queue its emails in one transaction
+                referral = await AsyncReferralService.create_referral(db, referral_data, commit=False)
+                provider_emails = await db.run_sync(lambda session: get_provider_emails_for_referral(referral, session))
+                queued = await db.run_sync(EmailOutbox.enqueue_referral_notifications, referral, provider_emails)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            await db.refresh(referral)
+            print(f"Created referral with ID: {referral.id}, queued {len(queued)} emails")
+            return referral
+        
         # Create the referral
-        referral = ReferralService.create_referral(db, referral_data)
+        referral = await AsyncReferralService.create_referral(db, referral_data)
         print(f"Created referral with ID: {referral.id}")
         
         # Send emails DIRECTLY (not via background queue) if email service is available
         if EMAIL_SERVICE_AVAILABLE:
             try:
                 # Get provider emails from database
-                provider_emails = get_provider_emails_for_referral(referral, db)
+                provider_emails = await db.run_sync(lambda session: get_provider_emails_for_referral(referral, session))
                 
                 # Initialize email service
-                email_service = EmailService()
+                email_service = get_email_service()
                 
                 if email_service.is_configured():
                     print(f"Sending emails directly for referral #{referral.id}")
                     
                     # Send all notifications directly
-                    results = await email_service.send_all_notifications(referral, provider_emails, db)
+                    with SessionLocal() as log_db:
+                        results = await email_service.send_all_notifications(referral, provider_emails, log_db)
                     
                     print(f"Email results for referral #{referral.id}: {results}")
                 else:
@@ -131,19 +162,34 @@ async def submit_referral_simple(
 
 @router.get("/referrals", response_model=List[ReferralResponse])
 async def get_referrals(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all referrals - This is the endpoint the frontend needs
+
+    Pass the X-Next-Cursor header of a page as cursor to get the next page;
+    skip still works for existing callers.
     """
     try:
-        print(f"Fetching referrals with skip={skip}, limit={limit}, status={status_filter}")
-        referrals = ReferralService.get_referrals(db, skip=skip, limit=limit, status=status_filter)
+        print(f"Fetching referrals with skip={skip}, limit={limit}, status={status_filter}, cursor={cursor}")
+        referrals = await AsyncReferralService.get_referrals(
+            db, skip=skip, limit=limit, status=status_filter, cursor=cursor
+        )
         print(f"Found {len(referrals)} referrals")
+        following = next_cursor(referrals, limit)
+        if following:
+            response.headers[NEXT_CURSOR_HEADER] = following
         return referrals
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         print(f"Error getting referrals: {str(e)}")
         import traceback
@@ -157,13 +203,13 @@ async def get_referrals(
 @router.get("/referrals/{referral_id}", response_model=ReferralResponse)
 async def get_referral(
     referral_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific referral by ID
     """
     try:
-        referral = ReferralService.get_referral(db, referral_id)
+        referral = await AsyncReferralService.get_referral(db, referral_id)
         if not referral:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -184,13 +230,13 @@ async def get_referral(
 async def update_referral(
     referral_id: int,
     referral_update: ReferralUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a referral (Admin endpoint - for status updates, notes)
     """
     try:
-        referral = ReferralService.update_referral(db, referral_id, referral_update)
+        referral = await AsyncReferralService.update_referral(db, referral_id, referral_update)
         if not referral:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -210,13 +256,13 @@ async def update_referral(
 @router.delete("/referrals/{referral_id}")
 async def delete_referral(
     referral_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a referral (Admin endpoint)
     """
     try:
-        success = ReferralService.delete_referral(db, referral_id)
+        success = await AsyncReferralService.delete_referral(db, referral_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,262 @@
+# backend/app/core/cache.py
+import json
+import logging
+import threading
+import time
+import uuid
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "ndis:cache:invalidate"
+
+
+class InvalidationBus(ABC):
+    """Broadcasts cache invalidations to every process sharing the data"""
+
+    @abstractmethod
+    def publish(self, cache_name: str, tags: Optional[List[str]], origin: str):
+        """Publish an invalidation (tags=None clears the whole cache)"""
+
+    @abstractmethod
+    def subscribe(self, callback: Callable[[str, Optional[List[str]], str], None]):
+        """Register a callback(cache_name, tags, origin) for published invalidations"""
+
+
+class InMemoryInvalidationBus(InvalidationBus):
+    """Single-process bus; delivers to local subscribers (used for tests and dev)"""
+
+    def __init__(self):
+        self._subscribers: List[Callable[[str, Optional[List[str]], str], None]] = []
+
+    def publish(self, cache_name: str, tags: Optional[List[str]], origin: str):
+        for callback in list(self._subscribers):
+            callback(cache_name, tags, origin)
+
+    def subscribe(self, callback: Callable[[str, Optional[List[str]], str], None]):
+        self._subscribers.append(callback)
+
+
+class RedisInvalidationBus(InvalidationBus):
+    """Redis pub/sub bus so every uvicorn/Celery worker drops stale entries"""
+
+    def __init__(self, redis_url: str, channel: str = INVALIDATION_CHANNEL):
+        import redis
+
+        self._client = redis.Redis.from_url(redis_url)
+        self._channel = channel
+        self._subscribers: List[Callable[[str, Optional[List[str]], str], None]] = []
+        self._listener: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def publish(self, cache_name: str, tags: Optional[List[str]], origin: str):
+        message = json.dumps({"origin": origin, "cache": cache_name, "tags": tags})
+        try:
+            self._client.publish(self._channel, message)
+        except Exception as e:
+            # Other workers fall back to TTL expiry
+            log.warning("Failed to publish cache invalidation for %s: %s", cache_name, e)
+
+    def subscribe(self, callback: Callable[[str, Optional[List[str]], str], None]):
+        self._subscribers.append(callback)
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name="cache-invalidation-listener", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                for message in pubsub.listen():
+                    self._dispatch(message.get("data"))
+            except Exception as e:
+                log.warning("Cache invalidation listener error, reconnecting: %s", e)
+                time.sleep(1)
+
+    def _dispatch(self, data: Any):
+        try:
+            payload = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        for callback in list(self._subscribers):
+            callback(payload.get("cache"), payload.get("tags"), payload.get("origin"))
+
+
+def create_invalidation_bus(redis_url: Optional[str] = None) -> InvalidationBus:
+    """Redis bus when a URL is configured, otherwise an in-process bus"""
+    if redis_url:
+        try:
+            return RedisInvalidationBus(redis_url)
+        except ImportError:
+            log.warning("redis package not installed - cache invalidations stay in-process")
+    return InMemoryInvalidationBus()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with TTL expiry and LRU eviction.
+
+    Entries carry tags; invalidating a tag drops every entry carrying it, locally
+    and (through the bus) in every other process.
+
+    Invalidations also bump a generation counter per tag. A reader takes
+    generation(tags) before loading a value and passes it to set(), which
+    then skips storing it if an invalidation landed in between - otherwise
+    the value loaded before the write would be cached for the full TTL:
+
+        generation = cache.generation([tag])
+        value = load()
+        cache.set(key, value, tags=[tag], generation=generation)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 256,
+        ttl_seconds: float = 300,
+        bus: Optional[InvalidationBus] = None
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._stale_sets = 0
+        # Bumped by clear() / per tag by invalidate_tags(); one int per tag ever invalidated
+        self._generation = 0
+        self._tag_generations: Dict[str, int] = {}
+        self._origin = uuid.uuid4().hex
+        self._bus = bus
+        if bus is not None:
+            bus.subscribe(self._on_remote_invalidation)
+        _caches.add(self)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value); expired entries count as misses"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return True, value
+                del self._entries[key]
+            self._misses += 1
+            return False, None
+
+    def generation(self, tags: Iterable[str] = ()) -> Tuple[int, ...]:
+        """Invalidation counters of the tags (and of clear()), to pass to set()"""
+        with self._lock:
+            return self._current_generation(tuple(tags))
+
+    def _current_generation(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        return (self._generation, *(self._tag_generations.get(tag, 0) for tag in tags))
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        tags: Iterable[str] = (),
+        generation: Optional[Tuple[int, ...]] = None
+    ) -> bool:
+        """
+        Store a value, evicting the least recently used entry when full
+
+        With a generation from generation(tags), the value is only stored if
+        none of its tags was invalidated since; returns whether it was stored.
+        """
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and generation != self._current_generation(tags):
+                self._stale_sets += 1
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, tags)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            return True
+
+    def invalidate_tags(self, tags: Iterable[str], publish: bool = True):
+        """Drop every entry carrying one of the tags"""
+        tags = [tag for tag in tags if tag]
+        if not tags:
+            return
+        self._drop(set(tags))
+        if publish and self._bus is not None:
+            self._bus.publish(self.name, tags, self._origin)
+
+    def clear(self, publish: bool = True):
+        """Drop every entry"""
+        self._drop(None)
+        if publish and self._bus is not None:
+            self._bus.publish(self.name, None, self._origin)
+
+    def _drop(self, tags: Optional[set]):
+        with self._lock:
+            if tags is None:
+                self._entries.clear()
+                self._generation += 1
+            else:
+                for tag in tags:
+                    self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+                for key in [k for k, (_, _, entry_tags) in self._entries.items() if tags.intersection(entry_tags)]:
+                    del self._entries[key]
+            self._invalidations += 1
+
+    def _on_remote_invalidation(self, cache_name: str, tags: Optional[List[str]], origin: str):
+        if cache_name != self.name or origin == self._origin:
+            return
+        self._drop(set(tags) if tags is not None else None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "stale_sets": self._stale_sets,
+                "bus": type(self._bus).__name__ if self._bus is not None else None
+            }
+
+
+# Every live TTLCache, for metrics
+_caches: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+
+
+def all_caches() -> List[TTLCache]:
+    """Live caches in this process, by name"""
+    return sorted(_caches, key=lambda cache: cache.name)
+
+
+# Shared bus for all caches in this process
+invalidation_bus: Optional[InvalidationBus] = None
+
+
+def get_invalidation_bus() -> InvalidationBus:
+    """Get the process-wide invalidation bus, creating it from settings on first use"""
+    global invalidation_bus
+    if invalidation_bus is None:
+        from app.core.config import settings
+        invalidation_bus = create_invalidation_bus(settings.CACHE_REDIS_URL)
+    return invalidation_bus
@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -37,5 +38,20 @@ celery_app.conf.update(
 # Auto-discover tasks
 celery_app.autodiscover_tasks(["app.tasks"])
 
+
+# One event loop per worker process for the async email code, so pooled
+# Mailgun connections survive between tasks (see app.core.worker_loop)
+@worker_process_init.connect
+def start_worker_event_loop(**kwargs):
+    from app.core.worker_loop import get_worker_loop
+    get_worker_loop()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_worker_event_loop(**kwargs):
+    from app.core.worker_loop import stop_worker_loop
+    stop_worker_loop()
+
 if __name__ == "__main__":
     celery_app.start()
\ No newline at end of file
@@ -10,6 +10,44 @@ class Settings(BaseSettings):
     DB_NAME: str = "NDIS"
     DB_USER: str = "postgres"
     DB_PASSWORD: str
+    # Async routes use DATABASE_URL with its async driver (asyncpg / aiosqlite) unless set
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool - per engine per process; the sync and async engines each get one
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    # Replace connections older than this (below server / load balancer idle timeouts)
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # PostgreSQL statement_timeout on every engine from build_engine: the app's sync,
+    # async and replica engines and the scripts using SessionLocal (0 disables).
+    # Alembic makes its own engine without it; the rebuild_* scripts opt out
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    # DATABASE_URL points at PgBouncer in transaction mode: no app-side pool or
+    # prepared statements, statement_timeout set per transaction
+    DB_PGBOUNCER: bool = False
+
+    # Read replicas (comma-separated URLs) for analytics and reports. A replica more
+    # than DB_REPLICA_MAX_LAG_SECONDS behind, or down, is skipped until its next
+    # check; with none usable, reads go to the primary
+    DATABASE_REPLICA_URLS: Optional[str] = None
+    DB_REPLICA_MAX_LAG_SECONDS: float = 30.0
+    DB_REPLICA_CHECK_SECONDS: float = 10.0
+
+    # Per-request SQL counting: Server-Timing header on every response, and a warning
+    # for requests running more than SQL_QUERY_BUDGET statements (0 disables) or one
+    # statement SQL_REPEAT_THRESHOLD times (an N+1 loop)
+    SQL_STATS_ENABLED: bool = True
+    SQL_QUERY_BUDGET: int = 30
+    SQL_REPEAT_THRESHOLD: int = 10
+
+    # Prometheus metrics at /metrics: request latency, pools, caches, email queue
+    METRICS_ENABLED: bool = True
+    # The email queue depth is a database count: re-read at most this often, and
+    # given up after METRICS_OUTBOX_TIMEOUT_MS (PostgreSQL) so scrapes stay cheap
+    METRICS_OUTBOX_CACHE_SECONDS: float = 15.0
+    METRICS_OUTBOX_TIMEOUT_MS: int = 1000
     
     # Supabase (for visualization only - same database)
     SUPABASE_URL: Optional[str] = None
@@ -30,11 +68,64 @@ class Settings(BaseSettings):
     MAILGUN_DOMAIN: Optional[str] = None
     MAILGUN_APP_NAME: str = "NDIS Management System"
     MAILGUN_SENDER_EMAIL: Optional[str] = None
+
+    # Outbound HTTP (Mailgun) - one pooled keep-alive client per event loop
+    HTTP_CLIENT_HTTP2: bool = True
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 20
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = 15.0
+
+    # Referral notification fan-out (provider, participant, referrer emails)
+    EMAIL_FANOUT_CONCURRENCY: int = 3
+    EMAIL_SEND_TIMEOUT_SECONDS: float = 10.0
+
+    # "direct": referral emails are sent inline before the submission returns;
+    # "outbox": queued in email_logs with the referral and sent by dispatch_emails.py,
+    # which must then be running (see README_EMAIL_SETUP.md) or nothing is sent
+    EMAIL_DELIVERY: str = "direct"
+    EMAIL_OUTBOX_BATCH_SIZE: int = 100
+    EMAIL_OUTBOX_CONCURRENCY: int = 10
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2.0
+    # Outbox emails due this long without being sent mean no dispatcher is running
+    EMAIL_OUTBOX_STALE_SECONDS: float = 300.0
+
+    # Failed sends: exponential backoff with jitter, and a circuit breaker on Mailgun
+    EMAIL_RETRY_BASE_DELAY_SECONDS: float = 30.0
+    EMAIL_RETRY_MAX_DELAY_SECONDS: float = 3600.0
+    EMAIL_RETRY_MAX_ATTEMPTS: int = 8
+    EMAIL_BREAKER_FAILURE_THRESHOLD: int = 5
+    EMAIL_BREAKER_RESET_SECONDS: float = 60.0
+    # Batch size the dispatcher restarts with after the breaker closes (doubles per clean batch)
+    EMAIL_DRAIN_START_BATCH_SIZE: int = 5
+
+    # Sending rate per Mailgun domain (token bucket; 0 disables). Shared through Redis
+    # when EMAIL_RATE_LIMIT_REDIS_URL (or CACHE_REDIS_URL) is set, otherwise per process
+    EMAIL_RATE_LIMIT_PER_MINUTE: float = 300.0
+    EMAIL_RATE_LIMIT_BURST: int = 50
+    EMAIL_RATE_LIMIT_MAX_WAIT_SECONDS: float = 5.0
+    EMAIL_RATE_LIMIT_REDIS_URL: Optional[str] = None
+
+    # Email templates - compiled bytecode is kept on disk (default: <tmp>/ndis-email-templates)
+    EMAIL_TEMPLATE_CACHE_DIR: Optional[str] = None
+    EMAIL_RENDER_CACHE_TTL_SECONDS: int = 600
+    EMAIL_RENDER_CACHE_MAX_ENTRIES: int = 512
+
+    # Email statistics rollup - refreshed on read when older than the max age; logs
+    # changed this long before the previous refresh are recounted to catch late commits
+    EMAIL_STATS_ROLLUP_MAX_AGE_SECONDS: float = 60.0
+    EMAIL_STATS_ROLLUP_OVERLAP_SECONDS: float = 300.0
     
     # Celery Configuration
     CELERY_BROKER_URL: Optional[str] = None
     CELERY_RESULT_BACKEND: Optional[str] = None
-    
+
+    # Caching - Redis is used to broadcast invalidations between workers when set
+    CACHE_REDIS_URL: Optional[str] = None
+    DYNAMIC_DATA_CACHE_TTL_SECONDS: int = 300
+    DYNAMIC_DATA_CACHE_MAX_ENTRIES: int = 256
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,11 +1,115 @@
-from sqlalchemy import create_engine
+from functools import wraps
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
+from app.core.db_pool import PoolMetrics, TimedAsyncAdaptedQueuePool, TimedQueuePool
+from app.core.db_replicas import ReadOnlySession, Replica, ReplicaRouter
+from app.core.query_stats import instrument_engine
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+def engine_options(
+    url: str,
+    is_async: bool = False,
+    statement_timeout_ms: Optional[int] = settings.DB_STATEMENT_TIMEOUT_MS
+) -> Dict[str, Any]:
+    """
+    create_engine arguments for url from the DB_* settings
+
+    Pool sizing applies to server databases only; SQLite keeps its own pools.
+    With DB_PGBOUNCER the app doesn't pool at all (PgBouncer in transaction
+    mode does), and nothing is left on the server session between
+    transactions: no prepared statements, and the statement timeout is set
+    per transaction instead of per connection.
+
+    statement_timeout_ms defaults to DB_STATEMENT_TIMEOUT_MS; None or 0
+    leaves the server default (no limit) for long-running jobs.
+    """
+    backend = make_url(url).get_backend_name()
+    options: Dict[str, Any] = {}
+    connect_args: Dict[str, Any] = {}
+
+    if backend != "sqlite":
+        if settings.DB_PGBOUNCER:
+            options["poolclass"] = NullPool
+        else:
+            options.update(
+                poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+                pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+                pool_pre_ping=settings.DB_POOL_PRE_PING
+            )
+
+    if backend == "postgresql":
+        if settings.DB_PGBOUNCER:
+            if is_async:
+                # asyncpg's and SQLAlchemy's prepared statement caches don't survive
+                # connections being handed between clients
+                connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0)
+        elif statement_timeout_ms:
+            if is_async:
+                connect_args["server_settings"] = {"statement_timeout": str(statement_timeout_ms)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def _set_local_statement_timeout(engine, timeout_ms: int):
+    """Behind PgBouncer: SET LOCAL statement_timeout at the start of every transaction"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "begin")
+    def on_begin(connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+def build_engine(
+    url: str = SQLALCHEMY_DATABASE_URL,
+    name: str = "primary",
+    is_async: bool = False,
+    statement_timeout_ms: Optional[int] = settings.DB_STATEMENT_TIMEOUT_MS
+):
+    """
+    The one place engines are made: options from the settings, pool
+    metrics attached (engine.pool_metrics) and statements counted for
+    query_stats
+
+    Every engine gets the DB_STATEMENT_TIMEOUT_MS statement timeout unless
+    it passes statement_timeout_ms=None, as the rollup rebuild scripts do.
+    """
+    factory = create_async_engine if is_async else create_engine
+    engine = factory(url, **engine_options(url, is_async, statement_timeout_ms))
+    sync_engine = engine.sync_engine if is_async else engine
+
+    if settings.DB_PGBOUNCER and statement_timeout_ms and sync_engine.dialect.name == "postgresql":
+        _set_local_statement_timeout(engine, statement_timeout_ms)
+
+    metrics = PoolMetrics(name).attach(sync_engine)
+    sync_engine.pool.pool_metrics = metrics
+    sync_engine.pool_metrics = metrics
+    instrument_engine(sync_engine)
+    return engine
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    """Pool occupancy and checkout metrics of an engine from build_engine"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    return sync_engine.pool_metrics.stats(sync_engine.pool)
+
+
+engine = build_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -15,4 +119,98 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Async drivers for the same database: asyncpg for PostgreSQL, aiosqlite for SQLite
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL rewritten for its async driver (unchanged if it already names one)"""
+    url = make_url(url)
+    backend = url.drivername.split("+")[0]
+    if backend not in ASYNC_DRIVERS or url.drivername in ASYNC_DRIVERS.values():
+        return url.render_as_string(hide_password=False)
+    query = dict(url.query)
+    # asyncpg takes ssl=require rather than libpq's sslmode=require
+    if "sslmode" in query and backend != "sqlite":
+        query["ssl"] = query.pop("sslmode")
+    return url.set(drivername=ASYNC_DRIVERS[backend], query=query).render_as_string(hide_password=False)
+
+try:
+    async_engine = build_engine(
+        settings.ASYNC_DATABASE_URL or async_database_url(SQLALCHEMY_DATABASE_URL), name="async", is_async=True
+    )
+    # Objects stay readable after commit; attribute loads can't be awaited implicitly
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    ASYNC_DATABASE_AVAILABLE = True
+except ImportError as e:
+    async_engine = None
+    AsyncSessionLocal = None
+    ASYNC_DATABASE_AVAILABLE = False
+    print(f"Warning: Async database driver not available ({e}) - install asyncpg/aiosqlite")
+
+async def get_async_db():
+    """Async counterpart of get_db: queries are awaited instead of blocking the event loop"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database driver not installed (asyncpg for PostgreSQL, aiosqlite for SQLite)")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def run_in_session(method):
+    """
+    Async version of a sync service method taking a Session first.
+
+    The method runs through AsyncSession.run_sync, so its db.query() calls go
+    through the async driver and await the database instead of blocking the
+    event loop. Used where porting a method's queries one by one isn't worth it.
+    """
+    @wraps(method)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await db.run_sync(method, *args, **kwargs)
+    return staticmethod(wrapper)
+
+
+def replica_urls() -> list:
+    return [url.strip() for url in (settings.DATABASE_REPLICA_URLS or "").split(",") if url.strip()]
+
+def build_replica_router() -> ReplicaRouter:
+    """Replicas from DATABASE_REPLICA_URLS, with engines from build_engine"""
+    replicas = []
+    for number, url in enumerate(replica_urls(), start=1):
+        name = f"replica{number}"
+        try:
+            replica_async_engine = build_engine(async_database_url(url), name=f"{name}-async", is_async=True)
+        except ImportError:
+            replica_async_engine = None
+        replicas.append(Replica(name, url, build_engine(url, name=name), replica_async_engine))
+    return ReplicaRouter(replicas, settings.DB_REPLICA_MAX_LAG_SECONDS, settings.DB_REPLICA_CHECK_SECONDS)
+
+replica_router = build_replica_router()
+ReadSessionLocal = sessionmaker(class_=ReadOnlySession, autocommit=False, autoflush=False)
+AsyncReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession, sync_session_class=ReadOnlySession, autoflush=False, expire_on_commit=False
+)
+
+def open_read_session() -> ReadOnlySession:
+    """Read-only session on a replica that is up and caught up, else on the primary"""
+    replica = replica_router.choose()
+    return ReadSessionLocal(bind=replica.engine if replica else engine)
+
+def get_read_db():
+    """get_db for read-only routes (analytics, reports): routed to a replica when one is usable"""
+    db = open_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db():
+    """get_async_db for read-only routes, routed like get_read_db"""
+    replica = await replica_router.choose_async()
+    bind = replica.async_engine if replica else async_engine
+    if bind is None:
+        raise RuntimeError("Async database driver not installed (asyncpg for PostgreSQL, aiosqlite for SQLite)")
+    async with AsyncReadSessionLocal(bind=bind) as db:
+        yield db
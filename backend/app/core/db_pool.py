@@ -0,0 +1,133 @@
+# backend/app/core/db_pool.py
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Checkout counters for one engine's connection pool.
+
+    wait is the time a checkout spent getting a connection (including opening
+    a new one); hold is how long it was kept before being returned. A growing
+    wait with every connection checked out means the pool is too small, or
+    connections are held too long.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._checkout_started: Dict[int, float] = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.waits = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+            self.hold_seconds = 0.0
+            self.max_hold_seconds = 0.0
+            self._checkout_started.clear()
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.waits += 1
+            if timed_out:
+                self.timeouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def attach(self, engine):
+        """Count connects, checkouts, hold times and invalidations from the pool events"""
+        pool = engine.pool if hasattr(engine, "pool") else engine.sync_engine.pool
+
+        @event.listens_for(pool, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+
+        @event.listens_for(pool, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self.checkouts += 1
+                self._checkout_started[id(connection_record)] = time.perf_counter()
+
+        @event.listens_for(pool, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                started = self._checkout_started.pop(id(connection_record), None)
+                if started is not None:
+                    held = time.perf_counter() - started
+                    self.hold_seconds += held
+                    self.max_hold_seconds = max(self.max_hold_seconds, held)
+
+        @event.listens_for(pool, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+        return self
+
+    def stats(self, pool) -> Dict[str, Any]:
+        """Counters plus the pool's current occupancy"""
+        with self._lock:
+            stats = {
+                "name": self.name,
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "avg_wait_ms": round(self.wait_seconds / self.waits * 1000, 3) if self.waits else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "avg_hold_ms": round(self.hold_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_hold_ms": round(self.max_hold_seconds * 1000, 3)
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=pool.overflow(),
+                max_overflow=pool._max_overflow,
+                timeout_seconds=pool.timeout()
+            )
+        return stats
+
+
+class _TimedPoolMixin:
+    """Times every checkout of a QueuePool into pool_metrics (set by build_engine)"""
+
+    pool_metrics: PoolMetrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.pool_metrics:
+                self.pool_metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.pool_metrics:
+            self.pool_metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.pool_metrics = self.pool_metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
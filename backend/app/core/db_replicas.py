@@ -0,0 +1,175 @@
+# backend/app/core/db_replicas.py
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+
+# Seconds a PostgreSQL standby is behind: 0 when it has replayed everything it
+# received (an idle primary doesn't make a caught-up standby look stale), NULL
+# on a primary
+POSTGRES_LAG_SQL = text("""
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN NULL
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+""")
+
+
+class ReadOnlySessionError(RuntimeError):
+    """A write was attempted through a session bound to a read replica"""
+
+
+class ReadOnlySession(Session):
+    """Session for replica reads: flushing changes raises instead of writing"""
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise ReadOnlySessionError("Read-only session: writes must use the primary (get_db)")
+        super().flush(objects)
+
+
+class Replica:
+    """
+    One read replica: its engines and its last measured replication lag.
+
+    The async engine is only built when async reads are used.
+    """
+
+    def __init__(self, name: str, url: str, engine, async_engine=None):
+        self.name = name
+        self.url = url
+        self.engine = engine
+        self.async_engine = async_engine
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = 0.0
+        self.healthy = False
+        self.error: Optional[str] = None
+        self.reads = 0
+
+    def _record(self, lag: Optional[float]):
+        self.lag_seconds = float(lag) if lag is not None else 0.0
+        self.healthy = True
+        self.error = None
+
+    def _record_error(self, e: Exception):
+        self.healthy = False
+        self.error = str(e).splitlines()[0] if str(e) else type(e).__name__
+        log.warning("Replica %s unavailable: %s", self.name, self.error)
+
+    def check(self):
+        """Measure lag over the sync engine (SQLite and others report 0)"""
+        self.checked_at = time.monotonic()
+        try:
+            with self.engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    self._record(connection.execute(POSTGRES_LAG_SQL).scalar())
+                else:
+                    connection.execute(text("SELECT 1"))
+                    self._record(0)
+        except Exception as e:
+            self._record_error(e)
+
+    async def check_async(self):
+        """check() over the async engine, for use from the event loop"""
+        self.checked_at = time.monotonic()
+        try:
+            async with self.async_engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    self._record((await connection.execute(POSTGRES_LAG_SQL)).scalar())
+                else:
+                    await connection.execute(text("SELECT 1"))
+                    self._record(0)
+        except Exception as e:
+            self._record_error(e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": round(self.lag_seconds, 3) if self.lag_seconds is not None else None,
+            "checked_seconds_ago": round(time.monotonic() - self.checked_at, 1) if self.checked_at else None,
+            "error": self.error,
+            "reads": self.reads
+        }
+
+
+class ReplicaRouter:
+    """
+    Picks the engine for a read-only session.
+
+    Replicas take turns (round robin); one is skipped while it is down or more
+    than max_lag seconds behind the primary. Lag is measured at most every
+    check_interval seconds per replica, on the request that finds it stale.
+    With no usable replica, reads go to the primary.
+    """
+
+    def __init__(self, replicas: List[Replica], max_lag: float = 30.0, check_interval: float = 10.0):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._turns = itertools.cycle(range(len(replicas))) if replicas else None
+        self._lock = threading.Lock()
+        self.primary_reads = 0
+        self.fallbacks = 0
+
+    def _candidates(self) -> List[Replica]:
+        """Replicas in this call's round-robin order"""
+        with self._lock:
+            start = next(self._turns)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def _stale(self, replica: Replica) -> bool:
+        return time.monotonic() - replica.checked_at >= self.check_interval
+
+    def _usable(self, replica: Replica) -> bool:
+        return replica.healthy and replica.lag_seconds is not None and replica.lag_seconds <= self.max_lag
+
+    def _pick(self, replica: Optional[Replica]) -> Optional[Replica]:
+        with self._lock:
+            if replica is not None:
+                replica.reads += 1
+            else:
+                self.primary_reads += 1
+                if self.replicas:
+                    self.fallbacks += 1
+        return replica
+
+    def choose(self) -> Optional[Replica]:
+        """A usable replica, or None for the primary"""
+        if not self.replicas:
+            return self._pick(None)
+        for replica in self._candidates():
+            if self._stale(replica):
+                replica.check()
+            if self._usable(replica):
+                return self._pick(replica)
+        return self._pick(None)
+
+    async def choose_async(self) -> Optional[Replica]:
+        """choose() for async sessions"""
+        if not self.replicas:
+            return self._pick(None)
+        for replica in self._candidates():
+            if replica.async_engine is None:
+                continue
+            if self._stale(replica):
+                await replica.check_async()
+            if self._usable(replica):
+                return self._pick(replica)
+        return self._pick(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_lag_seconds": self.max_lag,
+            "check_interval_seconds": self.check_interval,
+            "primary_reads": self.primary_reads,
+            "fallbacks_to_primary": self.fallbacks,
+            "replicas": [replica.stats() for replica in self.replicas]
+        }
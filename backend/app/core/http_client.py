@@ -0,0 +1,80 @@
+# backend/app/core/http_client.py
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+# One pooled client per event loop: httpx connections belong to the loop that opened them
+_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_clients_pid = os.getpid()
+_clients_lock = threading.Lock()
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install httpx[http2])"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_http_client(**overrides) -> httpx.AsyncClient:
+    """Create a keep-alive AsyncClient with the configured pool limits and timeouts"""
+    http2 = settings.HTTP_CLIENT_HTTP2
+    if http2 and not http2_available():
+        log.warning("h2 package not installed - outbound HTTP stays on HTTP/1.1 keep-alive")
+        http2 = False
+
+    options = {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        "timeout": httpx.Timeout(
+            settings.HTTP_CLIENT_TIMEOUT_SECONDS,
+            connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS
+        )
+    }
+    options.update(overrides)
+    return httpx.AsyncClient(**options)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared client for the running event loop, creating it on first use.
+
+    The API process has one loop, so every request reuses the same pool; a
+    Celery worker gets one per loop it runs. A forked child starts a fresh
+    registry, since the parent's sockets can't be shared.
+    """
+    global _clients_pid
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+        # Forget clients of loops that were closed without closing them
+        for stale in [l for l in _clients if l.is_closed()]:
+            del _clients[stale]
+
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = build_http_client()
+            _clients[loop] = client
+        return client
+
+
+async def close_http_client(loop: Optional[asyncio.AbstractEventLoop] = None):
+    """Close the shared client of a loop (default: the running one), dropping its connections"""
+    loop = loop or asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
@@ -0,0 +1,284 @@
+# backend/app/core/metrics.py
+import bisect
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; upper bounds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route label for requests that matched no route (keeps 404 scans from adding series)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(**labels) -> str:
+    """Labels in exposition format, e.g. {method="GET",route="/health"}"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, in the Prometheus layout"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        """Sample lines for name_bucket/_sum/_count; labels is the inside of {} (may be empty)"""
+        separator = "," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{_number(bound)}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {_number(self.sum)}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class RouteSeries:
+    """Latency histogram and per-status response counts of one method and route"""
+
+    __slots__ = ("labels", "latency", "responses")
+
+    def __init__(self, method: str, route: str):
+        # Rendered once here, so recording a request builds no label dicts or strings
+        self.labels = format_labels(method=method, route=route)[1:-1]
+        self.latency = Histogram()
+        self.responses: Dict[int, int] = {}
+
+
+class RequestMetrics:
+    """
+    HTTP request metrics for this process.
+
+    Series are keyed by method and route template (/referrals/{referral_id},
+    not the requested path), so their number stays bounded. Recording happens
+    on the event loop thread, in the middleware, so no locking is needed.
+    """
+
+    def __init__(self):
+        self.series: Dict[Tuple[str, str], RouteSeries] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float):
+        series = self.series.get((method, route))
+        if series is None:
+            series = self.series[(method, route)] = RouteSeries(method, route)
+        series.latency.observe(seconds)
+        series.responses[status_code] = series.responses.get(status_code, 0) + 1
+
+    def render(self) -> List[str]:
+        lines = [
+            "# HELP ndis_http_requests_in_flight Requests being served",
+            "# TYPE ndis_http_requests_in_flight gauge",
+            f"ndis_http_requests_in_flight {self.in_flight}",
+            "# HELP ndis_http_request_duration_seconds Time to the response of each request",
+            "# TYPE ndis_http_request_duration_seconds histogram"
+        ]
+        series = sorted(self.series.items())
+        for _, route_series in series:
+            lines += route_series.latency.render("ndis_http_request_duration_seconds", route_series.labels)
+        lines += [
+            "# HELP ndis_http_responses_total Responses by status code",
+            "# TYPE ndis_http_responses_total counter"
+        ]
+        for _, route_series in series:
+            for status_code, count in sorted(route_series.responses.items()):
+                lines.append(f'ndis_http_responses_total{{{route_series.labels},status="{status_code}"}} {count}')
+        return lines
+
+
+request_metrics = RequestMetrics()
+
+
+def route_template(scope) -> str:
+    """Path template of the route that served the request"""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class Gauges:
+    """Builds one family of scrape-time samples: gauges or counters read from elsewhere"""
+
+    def __init__(self, name: str, kind: str, help_text: str):
+        self.lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        self.name = name
+
+    def add(self, value, **labels):
+        if value is not None:
+            self.lines.append(f"{self.name}{format_labels(**labels)} {_number(value)}")
+
+
+def pool_families() -> List[Gauges]:
+    """Connection pool occupancy and checkout counters of every engine"""
+    from app.core.database import async_engine, engine, pool_stats, replica_router
+
+    engines = [engine, async_engine]
+    for replica in replica_router.replicas:
+        engines += [replica.engine, replica.async_engine]
+
+    families = {
+        "checked_out": Gauges("ndis_db_pool_checked_out", "gauge", "Connections checked out of the pool"),
+        "size": Gauges("ndis_db_pool_size", "gauge", "Configured pool size"),
+        "overflow": Gauges("ndis_db_pool_overflow", "gauge", "Connections open beyond the pool size"),
+        "checkouts": Gauges("ndis_db_pool_checkouts_total", "counter", "Connection checkouts"),
+        "timeouts": Gauges("ndis_db_pool_timeouts_total", "counter", "Checkouts that timed out waiting"),
+        "invalidations": Gauges("ndis_db_pool_invalidations_total", "counter", "Connections invalidated"),
+        "wait": Gauges("ndis_db_pool_wait_seconds_total", "counter", "Time spent waiting for connections")
+    }
+    for pool_engine in engines:
+        if pool_engine is None:
+            continue
+        sync_engine = getattr(pool_engine, "sync_engine", pool_engine)
+        stats = pool_stats(pool_engine)
+        for key in ("checked_out", "size", "overflow", "checkouts", "timeouts", "invalidations"):
+            families[key].add(stats.get(key), pool=stats["name"])
+        families["wait"].add(sync_engine.pool_metrics.wait_seconds, pool=stats["name"])
+    return list(families.values())
+
+
+def replica_families() -> List[Gauges]:
+    from app.core.database import replica_router
+
+    lag = Gauges("ndis_db_replica_lag_seconds", "gauge", "Replication lag at the last check")
+    healthy = Gauges("ndis_db_replica_healthy", "gauge", "Whether the replica answered its last check")
+    fallbacks = Gauges("ndis_db_replica_fallbacks_total", "counter", "Reads sent to the primary with replicas configured")
+    for replica in replica_router.replicas:
+        lag.add(replica.lag_seconds, replica=replica.name)
+        healthy.add(int(replica.healthy), replica=replica.name)
+    if replica_router.replicas:
+        fallbacks.add(replica_router.fallbacks)
+    return [lag, healthy, fallbacks]
+
+
+def cache_families() -> List[Gauges]:
+    """Hit and miss counters of every TTLCache, summed per cache name"""
+    from app.core.cache import all_caches
+
+    totals: Dict[str, Dict[str, int]] = {}
+    for cache in all_caches():
+        stats = cache.stats()
+        total = totals.setdefault(stats["name"], {"hits": 0, "misses": 0, "entries": 0, "evictions": 0})
+        for key in total:
+            total[key] += stats[key]
+
+    hits = Gauges("ndis_cache_hits_total", "counter", "Cache lookups that found a live entry")
+    misses = Gauges("ndis_cache_misses_total", "counter", "Cache lookups that missed or found an expired entry")
+    ratio = Gauges("ndis_cache_hit_ratio", "gauge", "Hits over lookups since the process started")
+    entries = Gauges("ndis_cache_entries", "gauge", "Entries held")
+    evictions = Gauges("ndis_cache_evictions_total", "counter", "Entries evicted to stay under max_entries")
+    for name, total in sorted(totals.items()):
+        lookups = total["hits"] + total["misses"]
+        hits.add(total["hits"], cache=name)
+        misses.add(total["misses"], cache=name)
+        ratio.add(round(total["hits"] / lookups, 4) if lookups else 0.0, cache=name)
+        entries.add(total["entries"], cache=name)
+        evictions.add(total["evictions"], cache=name)
+    return [hits, misses, ratio, entries, evictions]
+
+
+class OutboxDepth:
+    """
+    Outbox depth for scrapes, counted at most every METRICS_OUTBOX_CACHE_SECONDS
+
+    Scrapes in between reuse the last count, and concurrent scrapes wait for
+    one query rather than each running it. The count query gets
+    METRICS_OUTBOX_TIMEOUT_MS on PostgreSQL; a failed count is not retried
+    until the interval is up and leaves the gauge out meanwhile.
+    """
+
+    def __init__(self):
+        self.value: Optional[int] = None
+        self.read_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[int]:
+        from app.core.config import settings
+
+        with self._lock:
+            now = time.monotonic()
+            if self.read_at is not None and now - self.read_at < settings.METRICS_OUTBOX_CACHE_SECONDS:
+                return self.value
+            self.read_at, self.value = now, None
+            self.value = self._count(settings.METRICS_OUTBOX_TIMEOUT_MS)
+            return self.value
+
+    @staticmethod
+    def _count(timeout_ms: int) -> int:
+        from sqlalchemy import text
+        from app.core.database import SessionLocal
+        from app.services.email_outbox import EmailOutbox
+
+        with SessionLocal() as db:
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+            return EmailOutbox.pending_count(db)
+
+
+outbox_depth = OutboxDepth()
+
+
+def email_queue_families() -> List[Gauges]:
+    """Outbox depth, read from the database at most every METRICS_OUTBOX_CACHE_SECONDS"""
+    pending = Gauges("ndis_email_outbox_pending", "gauge", "Queued emails not yet sent (pending or waiting to retry)")
+    pending.add(outbox_depth.get())
+    return [pending]
+
+
+# Scrape-time collectors; one failing leaves its metrics out of the scrape and
+# counts in ndis_metrics_collector_errors_total
+COLLECTORS: List[Tuple[str, Callable[[], List[Gauges]]]] = [
+    ("db_pool", pool_families),
+    ("db_replicas", replica_families),
+    ("caches", cache_families),
+    ("email_queue", email_queue_families)
+]
+collector_errors: Dict[str, int] = {name: 0 for name, _ in COLLECTORS}
+
+
+def render_metrics() -> str:
+    """Every metric in the Prometheus text exposition format"""
+    started = time.perf_counter()
+    lines = request_metrics.render()
+    for name, collect in COLLECTORS:
+        try:
+            for family in collect():
+                lines += family.lines
+        except Exception as e:
+            collector_errors[name] = collector_errors.get(name, 0) + 1
+            log.warning("Metrics collector %s failed: %s", name, e)
+
+    errors = Gauges("ndis_metrics_collector_errors_total", "counter", "Scrapes where a collector failed")
+    for name, count in sorted(collector_errors.items()):
+        errors.add(count, collector=name)
+    duration = Gauges("ndis_metrics_scrape_duration_seconds", "gauge", "Time taken to collect this scrape")
+    duration.add(round(time.perf_counter() - started, 6))
+    return "\n".join(lines + errors.lines + duration.lines) + "\n"
@@ -0,0 +1,171 @@
+# backend/app/core/query_stats.py
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+# query_budget() blocks in progress: they see every statement in the process,
+# whichever thread or event loop runs it (TestClient serves from its own thread)
+_watchers: List["QueryStats"] = []
+
+
+class QueryStats:
+    """
+    SQL statements run while tracking (one request, or one block of code).
+
+    Statements are counted by their SQL text. SQLAlchemy renders bound
+    parameters as placeholders, so the same query issued once per row of a
+    loop shows up as one text with a high count: the N+1 pattern.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.by_statement: Counter = Counter()
+        self.started = time.perf_counter()
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.db_seconds += seconds
+        self.by_statement[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements run at least threshold times, most frequent first"""
+        return [(statement, count) for statement, count in self.by_statement.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: DB time with the statement count, and total time so far"""
+        total_ms = (time.perf_counter() - self.started) * 1000
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} queries", '
+            f"app;dur={total_ms:.1f}"
+        )
+
+    def summary(self, repeat_threshold: Optional[int] = None) -> Dict[str, Any]:
+        threshold = repeat_threshold or settings.SQL_REPEAT_THRESHOLD
+        return {
+            "statements": self.statements,
+            "db_ms": round(self.db_seconds * 1000, 3),
+            "repeated": [
+                {"statement": _shorten(statement), "count": count}
+                for statement, count in self.repeated(threshold)
+            ]
+        }
+
+
+def _shorten(statement: str, length: int = 200) -> str:
+    """One-line statement for logs, with the SELECT column list left out"""
+    statement = re.sub(r"^SELECT .+? FROM ", "SELECT ... FROM ", " ".join(statement.split()))
+    return statement if len(statement) <= length else statement[:length] + "..."
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None or _watchers:
+        conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_stats_started")
+    if not started:
+        return
+    seconds = time.perf_counter() - started.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    for watcher in _watchers:
+        watcher.record(statement, seconds)
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_stats_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine):
+    """Count statements and their time on the engine into the current QueryStats (see build_engine)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    return engine
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Count the statements run inside the block, on any engine from build_engine
+
+    The stats follow the context into FastAPI's threadpool and into
+    AsyncSession greenlets, so they cover sync and async routes alike.
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def log_if_over_budget(stats: QueryStats, label: str) -> bool:
+    """
+    Warn when a request ran more than SQL_QUERY_BUDGET statements, or one
+    statement SQL_REPEAT_THRESHOLD times or more (likely N+1); returns
+    whether it warned
+    """
+    repeated = stats.repeated(settings.SQL_REPEAT_THRESHOLD)
+    over_budget = settings.SQL_QUERY_BUDGET and stats.statements > settings.SQL_QUERY_BUDGET
+    if not over_budget and not repeated:
+        return False
+    log.warning(
+        "%s ran %d SQL statements in %.1f ms (budget %d)%s",
+        label, stats.statements, stats.db_seconds * 1000, settings.SQL_QUERY_BUDGET,
+        "".join(f"\n  {count}x {_shorten(statement)}" for statement, count in repeated[:3])
+    )
+    return True
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A block ran more SQL statements than its declared budget"""
+
+
+@contextmanager
+def query_budget(max_statements: int, max_repeats: Optional[int] = None) -> Iterator[QueryStats]:
+    """
+    Fail with QueryBudgetExceeded when more than max_statements statements
+    run while the block is open (in any thread), or any one statement more
+    than max_repeats times
+
+        with query_budget(5):
+            client.get("/api/v1/admin/providers")
+    """
+    stats = QueryStats()
+    _watchers.append(stats)
+    try:
+        yield stats
+    finally:
+        _watchers.remove(stats)
+    problems = []
+    if stats.statements > max_statements:
+        problems.append(f"{stats.statements} statements (budget {max_statements})")
+    if max_repeats is not None:
+        problems += [
+            f"{count}x (max {max_repeats}) {_shorten(statement)}"
+            for statement, count in stats.repeated(max_repeats + 1)
+        ]
+    if problems:
+        raise QueryBudgetExceeded("Query budget exceeded:\n  " + "\n  ".join(problems))
@@ -0,0 +1,208 @@
+# backend/app/core/rate_limit.py
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Waiting for tokens would take longer than the caller allows"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket(ABC):
+    """
+    Token bucket: rate tokens are added per second, up to burst.
+
+    try_acquire takes tokens if they are all available and returns 0, or
+    takes nothing and returns how many seconds until they will be.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+
+    @abstractmethod
+    def try_acquire(self, key: str, tokens: int = 1) -> float:
+        """Take tokens for key and return 0, or return the seconds until they are available"""
+
+
+class InMemoryTokenBucket(TokenBucket):
+    """Buckets in this process only (single API process, dispatcher or tests)"""
+
+    def __init__(self, rate: float, burst: int):
+        super().__init__(rate, burst)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str, tokens: int = 1) -> float:
+        now = time.monotonic()
+        with self._lock:
+            available, updated_at = self._buckets.get(key, (self.burst, now))
+            available = min(self.burst, available + (now - updated_at) * self.rate)
+            if available >= tokens:
+                self._buckets[key] = (available - tokens, now)
+                return 0.0
+            self._buckets[key] = (available, now)
+            return (tokens - available) / self.rate
+
+
+# Refill and take in one atomic step; KEYS[1] bucket, ARGV rate, burst, tokens
+# Returns 0 when granted, otherwise the milliseconds until enough tokens are available
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local tokens = tonumber(ARGV[3])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'available', 'updated_at')
+local available = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+available = math.min(burst, available + math.max(0, now - updated_at) * rate)
+local wait = 0
+if available >= tokens then
+    available = available - tokens
+else
+    wait = math.ceil((tokens - available) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'available', available, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return wait
+"""
+
+
+class RedisTokenBucket(TokenBucket):
+    """Buckets in Redis, shared by every API process, Celery worker and dispatcher"""
+
+    def __init__(self, redis_url: str, rate: float, burst: int, prefix: str = "ndis:rate"):
+        import redis
+
+        super().__init__(rate, burst)
+        self._client = redis.Redis.from_url(redis_url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._prefix = prefix
+
+    def try_acquire(self, key: str, tokens: int = 1) -> float:
+        wait_ms = self._script(keys=[f"{self._prefix}:{key}"], args=[self.rate, self.burst, tokens])
+        return int(wait_ms) / 1000
+
+
+def create_token_bucket(rate: float, burst: int, redis_url: Optional[str] = None) -> TokenBucket:
+    """Redis bucket when a URL is configured, otherwise an in-process one"""
+    if redis_url:
+        try:
+            return RedisTokenBucket(redis_url, rate, burst)
+        except ImportError:
+            log.warning("redis package not installed - rate limits apply per process")
+    return InMemoryTokenBucket(rate, burst)
+
+
+class RateLimiter:
+    """
+    Async front end to a token bucket: callers over the limit wait their turn.
+
+    acquire() sleeps until the bucket has the tokens, so excess sends queue up
+    instead of failing; it gives up with RateLimitExceeded once max_wait would
+    be exceeded. Queue depth and time spent throttled are kept for monitoring.
+    """
+
+    def __init__(self, name: str, bucket: TokenBucket, max_wait: float = 5.0):
+        self.name = name
+        self.bucket = bucket
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._max_queued = 0
+        self._acquired = 0
+        self._throttled = 0
+        self._throttle_seconds = 0.0
+        self._rejected = 0
+
+    def _try_acquire(self, key: str, tokens: int) -> float:
+        try:
+            return self.bucket.try_acquire(key, tokens)
+        except Exception as e:
+            # A rate limit outage shouldn't stop email; Mailgun's own limits still apply
+            log.warning("Rate limiter %s unavailable, not throttling: %s", self.name, e)
+            return 0.0
+
+    async def acquire(self, key: str, tokens: int = 1, max_wait: Optional[float] = None):
+        """
+        Wait until tokens are available for key
+
+        More tokens than the bucket holds (a batch send to many recipients) are
+        taken burst at a time, so a large batch waits for its full share of
+        the rate instead of being charged for only one burst.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        tokens = max(1, tokens)
+        burst = max(1, int(self.bucket.burst))
+        if tokens > burst and (tokens - burst) / self.bucket.rate > max_wait:
+            # Even a full bucket can't cover it in time; take nothing
+            with self._lock:
+                self._rejected += 1
+            raise RateLimitExceeded(
+                f"Rate limit {self.name} for {key}: {tokens} tokens need more than {max_wait:g}s",
+                retry_after=(tokens - burst) / self.bucket.rate
+            )
+
+        started = time.monotonic()
+        throttled = False
+        while tokens:
+            chunk = min(tokens, burst)
+            wait = self._try_acquire(key, chunk)
+            if wait:
+                throttled = True
+                await self._wait_for(key, chunk, wait, started, max_wait)
+            tokens -= chunk
+
+        with self._lock:
+            self._acquired += 1
+            self._throttled += throttled
+
+    async def _wait_for(self, key: str, tokens: int, wait: float, started: float, max_wait: float):
+        """Sleep and retry until tokens are taken, within max_wait of started"""
+        wait_started = time.monotonic()
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        try:
+            while wait:
+                waited = time.monotonic() - started
+                if waited + wait > max_wait:
+                    with self._lock:
+                        self._rejected += 1
+                    raise RateLimitExceeded(
+                        f"Rate limit {self.name} for {key}: no capacity within {max_wait:g}s",
+                        retry_after=wait
+                    )
+                await asyncio.sleep(wait)
+                wait = self._try_acquire(key, tokens)
+        finally:
+            with self._lock:
+                self._queued -= 1
+                self._throttle_seconds += time.monotonic() - wait_started
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and throttling counters for monitoring"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "rate_per_second": self.bucket.rate,
+                "burst": self.bucket.burst,
+                "max_wait_seconds": self.max_wait,
+                "queued": self._queued,
+                "max_queued": self._max_queued,
+                "acquired": self._acquired,
+                "throttled": self._throttled,
+                "throttle_seconds": round(self._throttle_seconds, 3),
+                "rejected": self._rejected,
+                "backend": type(self.bucket).__name__
+            }
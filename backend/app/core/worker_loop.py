@@ -0,0 +1,105 @@
+# backend/app/core/worker_loop.py
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+log = logging.getLogger(__name__)
+
+
+class WorkerEventLoop:
+    """
+    Long-lived asyncio loop running in a background thread.
+
+    Synchronous code (Celery tasks) submits coroutines with run() and blocks
+    for the result. Because the loop outlives each task, pooled connections
+    opened on it (app.core.http_client) are reused by the next task.
+    """
+
+    def __init__(self, name: str = "worker-event-loop"):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "WorkerEventLoop":
+        """Start the loop thread (no-op if it is already running)"""
+        with self._lock:
+            if self.is_running:
+                return self
+            self.loop = asyncio.new_event_loop()
+            started = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(self.loop, started), name=self.name, daemon=True
+            )
+            self._thread.start()
+            started.wait()
+            return self
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop, started: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        loop.run_forever()
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop from another thread and return its result"""
+        if not self.is_running:
+            self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Timed out, or the task itself was interrupted (e.g. soft time limit)
+            future.cancel()
+            raise
+
+    def stop(self, timeout: float = 10):
+        """Close the loop's pooled HTTP client, then stop and close the loop"""
+        with self._lock:
+            if not self.is_running:
+                return
+            from app.core.http_client import close_http_client
+
+            try:
+                asyncio.run_coroutine_threadsafe(close_http_client(self.loop), self.loop).result(timeout)
+            except Exception as e:
+                log.warning("Error closing pooled HTTP client on %s: %s", self.name, e)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+            self.loop.close()
+            self._thread = None
+            self.loop = None
+
+
+# The loop of this worker process
+worker_loop: Optional[WorkerEventLoop] = None
+worker_loop_pid: Optional[int] = None
+
+
+def get_worker_loop() -> WorkerEventLoop:
+    """Get this process's worker loop, starting it on first use (and again after a fork)"""
+    global worker_loop, worker_loop_pid
+    if worker_loop is None or worker_loop_pid != os.getpid():
+        # A forked child inherits the parent's loop object but not its thread
+        worker_loop = WorkerEventLoop()
+        worker_loop_pid = os.getpid()
+    return worker_loop.start()
+
+
+def run_async(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Run a coroutine on this process's worker loop and wait for its result"""
+    return get_worker_loop().run(coro, timeout)
+
+
+def stop_worker_loop():
+    """Stop this process's worker loop, if it was started"""
+    global worker_loop
+    if worker_loop is not None and worker_loop_pid == os.getpid():
+        worker_loop.stop()
+    worker_loop = None
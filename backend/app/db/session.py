@@ -1,24 +1,14 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
 # Load backend/.env so we don’t rely on shell exports
 env_path = Path(__file__).resolve().parents[2] / ".env"
 if env_path.exists():
     load_dotenv(env_path)
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
+if not os.getenv("DATABASE_URL"):
     raise RuntimeError("DATABASE_URL is not set")
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# One engine per process: reuse app.core.database's (pool settings come from Settings)
+from app.core.database import engine, SessionLocal, get_db
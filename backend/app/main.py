@@ -1,11 +1,15 @@
 # backend/app/main.py - Updated with Complete Dynamic Data Support
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from datetime import datetime
-import logging, traceback
+import logging, time, traceback
 
 # Database imports
+from app.core.config import settings
 from app.core.database import Base, engine
+from app.core.metrics import CONTENT_TYPE, render_metrics, request_metrics, route_template
+from app.core.query_stats import log_if_over_budget, track_queries
 # Import API routers
 from app.api.v1.api_simple import api_router
 from app.api.v1 import dynamic_data_complete
@@ -32,8 +36,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor for the next page of referral listings; SQL statement count and time
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
+# Compress larger JSON bodies such as the dynamic data snapshot
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Middleware to log unhandled exceptions
 @app.middleware("http")
 async def log_exceptions(request: Request, call_next):
@@ -44,6 +53,36 @@ async def log_exceptions(request: Request, call_next):
         traceback.print_exc()
         raise
 
+# Middleware to count each request's SQL statements: reported in the Server-Timing
+# header, and logged when over SQL_QUERY_BUDGET or repeating one query (N+1)
+@app.middleware("http")
+async def count_queries(request: Request, call_next):
+    if not settings.SQL_STATS_ENABLED:
+        return await call_next(request)
+    with track_queries() as stats:
+        response = await call_next(request)
+    response.headers.append("Server-Timing", stats.server_timing())
+    log_if_over_budget(stats, f"{request.method} {request.url.path}")
+    return response
+
+# Middleware to record request latency per route for /metrics
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    if not settings.METRICS_ENABLED:
+        return await call_next(request)
+    request_metrics.in_flight += 1
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        request_metrics.in_flight -= 1
+        request_metrics.observe(
+            request.method, route_template(request.scope), status_code, time.perf_counter() - started
+        )
+
 # Startup event: create DB tables and initialize default data
 @app.on_event("startup")
 async def startup_event():
@@ -86,6 +125,34 @@ async def startup_event():
     except Exception as e:
         logging.error(f"Failed to initialize dynamic data: {e}")
 
+    if settings.EMAIL_DELIVERY == "outbox":
+        check_email_outbox()
+
+
+def check_email_outbox():
+    """Warn when outbox emails sit unsent, i.e. no dispatch_emails.py is running"""
+    from app.core.database import SessionLocal
+    from app.services.email_outbox import EmailOutbox
+
+    logging.warning("EMAIL_DELIVERY=outbox: referral emails are only sent while dispatch_emails.py runs")
+    try:
+        with SessionLocal() as db:
+            overdue = EmailOutbox.overdue_count(db, settings.EMAIL_OUTBOX_STALE_SECONDS)
+    except Exception as e:
+        logging.error(f"Could not check the email outbox: {e}")
+        return
+    if overdue:
+        logging.error(
+            f"{overdue} outbox emails have been due for over {settings.EMAIL_OUTBOX_STALE_SECONDS:.0f}s - "
+            "is dispatch_emails.py running?"
+        )
+
+# Shutdown event: close pooled outbound connections (Mailgun)
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.core.http_client import close_http_client
+    await close_http_client()
+
 # Include main API routes
 app.include_router(api_router, prefix="/api/v1")
 
@@ -126,6 +193,14 @@ async def health_check():
         }
     }
 
+# Prometheus metrics endpoint (a def route: the email queue depth, cached for
+# METRICS_OUTBOX_CACHE_SECONDS, is a database query)
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 # Debug endpoint to list all routes
 @app.get("/debug/routes")
 async def debug_routes():
@@ -1,7 +1,15 @@
 # Import all models to ensure they are registered with SQLAlchemy
 from .user import User
 from .referral import Referral
-from .email_log import EmailLog
+from .email_log import EmailLog, EmailLogRollup, EmailLogRollupState
+from .provider_models import (
+    ProviderAvailability, Appointment, SessionNote,
+    ProviderNotification, ProviderPerformanceMetric, ProviderDocument
+)
 # from .participant import Participant  # <-- Comment this out temporarily
 
-__all__ = ["User", "Referral", "EmailLog"]  # Remove "Participant" from here too
\ No newline at end of file
+__all__ = [
+    "User", "Referral", "EmailLog", "EmailLogRollup", "EmailLogRollupState",
+    "ProviderAvailability", "Appointment", "SessionNote",
+    "ProviderNotification", "ProviderPerformanceMetric", "ProviderDocument"
+]  # Remove "Participant" from here too
\ No newline at end of file
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index, UniqueConstraint, insert, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
 import enum
 
 
@@ -44,6 +46,9 @@ class EmailLog(Base):
     # Celery Task Info
     task_id = Column(String(255), nullable=True)  # Celery task ID
     
+    # Outbox: when the email dispatcher should send this email (NULL when sent in-process)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -52,6 +57,18 @@ class EmailLog(Base):
     referral = relationship("Referral", back_populates="email_logs")
     user = relationship("User", back_populates="email_logs")
     
+    __table_args__ = (
+        # Outbox emails waiting for the dispatcher, oldest due first
+        Index(
+            "ix_email_logs_outbox_due", "next_attempt_at", "id",
+            postgresql_where=text("status IN ('pending', 'retry') AND next_attempt_at IS NOT NULL"),
+            sqlite_where=text("status IN ('pending', 'retry') AND next_attempt_at IS NOT NULL")
+        ),
+        # Statistics: logs changed since the last rollup refresh, and logs per time bucket
+        Index("ix_email_logs_updated_at", "updated_at"),
+        Index("ix_email_logs_created_at", "created_at"),
+    )
+    
     def __repr__(self):
         return f"<EmailLog(id={self.id}, type='{self.email_type}', recipient='{self.recipient_email}', status='{self.status}')>"
     
@@ -66,10 +83,37 @@ class EmailLog(Base):
         self.error_message = error_message
         self.retry_count += 1
     
-    def mark_for_retry(self):
-        """Mark email for retry"""
+    def mark_for_retry(self, error_message: str = None, next_attempt_at=None):
+        """Mark email for retry, optionally recording why and when to try again"""
         self.status = EmailStatus.RETRY.value
         self.retry_count += 1
+        if error_message:
+            self.error_message = error_message
+        if next_attempt_at is not None:
+            self.next_attempt_at = next_attempt_at
+
+
+class EmailLogRollup(Base):
+    """Email log counts per hour (of created_at), email type and status"""
+    __tablename__ = "email_log_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    email_type = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False)
+    email_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("bucket_start", "email_type", "status", name="uq_email_log_rollups_bucket"),
+    )
+
+
+class EmailLogRollupState(Base):
+    """Single row recording how far email_log_rollups has been refreshed"""
+    __tablename__ = "email_log_rollup_state"
+
+    id = Column(Integer, primary_key=True)
+    refreshed_at = Column(DateTime(timezone=True), nullable=True)
 
 
 def log_email_attempt(db, email_type: str, recipient: str, subject: str, 
@@ -138,6 +182,122 @@ def update_email_status(db, email_log_id: int, status: str,
     return True
 
 
+def _status_values(status: str, error_message: str = None, next_attempt_at=None) -> dict:
+    """Column values for a status transition, matching the EmailLog.mark_* methods"""
+    values = {EmailLog.status: status}
+    if status == EmailStatus.SENT.value:
+        values[EmailLog.sent_at] = func.now()
+    elif status == EmailStatus.FAILED.value:
+        values[EmailLog.error_message] = error_message or "Unknown error"
+        values[EmailLog.retry_count] = EmailLog.retry_count + 1
+    elif status == EmailStatus.RETRY.value:
+        values[EmailLog.retry_count] = EmailLog.retry_count + 1
+        if error_message:
+            values[EmailLog.error_message] = error_message
+    if next_attempt_at is not None:
+        values[EmailLog.next_attempt_at] = next_attempt_at
+    return values
+
+
+def update_email_statuses(db, email_log_ids: List[int], status: str,
+                          error_message: str = None, commit: bool = True,
+                          next_attempt_at=None) -> int:
+    """
+    Apply one status to many email logs in a single UPDATE
+    
+    Args:
+        db: Database session
+        email_log_ids: Email log IDs to update
+        status: New status (sent/failed/retry)
+        error_message: Error message if failed (or why a retry is needed)
+        commit: Commit after the update
+        next_attempt_at: When the dispatcher should send it again (outbox emails)
+    
+    Returns:
+        int: Number of logs updated
+    """
+    if not email_log_ids:
+        return 0
+    
+    updated = db.query(EmailLog).filter(
+        EmailLog.id.in_(email_log_ids)
+    ).update(_status_values(status, error_message, next_attempt_at), synchronize_session=False)
+    if commit:
+        db.commit()
+    return updated
+
+
+class EmailLogWriter:
+    """
+    Batched EmailLog writes for one send (or one Celery task)
+    
+    log_attempts inserts every recipient's pending log with one INSERT; status
+    changes are queued with set_status and applied by flush as one
+    UPDATE ... WHERE id IN (...) per distinct transition, in a single commit.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._transitions: Dict[int, Tuple[str, Optional[str], Optional[datetime]]] = {}
+    
+    def log_attempts(self, email_type: str, recipients: Iterable[str], subject: str,
+                     referral_id: int = None, task_id: str = None,
+                     user_ids: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """
+        Insert a pending log per recipient in one statement and commit
+        
+        Returns:
+            dict: Recipient email -> email log ID
+        """
+        user_ids = user_ids or {}
+        rows = [
+            {
+                "email_type": email_type,
+                "recipient_email": recipient,
+                "subject": subject,
+                "referral_id": referral_id,
+                "user_id": user_ids.get(recipient),
+                "task_id": task_id,
+                "status": EmailStatus.PENDING.value,
+                "retry_count": 0
+            }
+            for recipient in dict.fromkeys(recipients)
+        ]
+        if not rows:
+            return {}
+        
+        result = self.db.execute(
+            insert(EmailLog).returning(EmailLog.id, EmailLog.recipient_email), rows
+        )
+        log_ids = {recipient: log_id for log_id, recipient in result}
+        self.db.commit()
+        return log_ids
+    
+    def set_status(self, email_log_ids: Iterable[int], status: str, error_message: str = None,
+                   next_attempt_at: Optional[datetime] = None):
+        """Queue a status transition; a later call for the same log replaces an earlier one"""
+        for email_log_id in email_log_ids:
+            self._transitions[email_log_id] = (status, error_message, next_attempt_at)
+    
+    def flush(self) -> int:
+        """Apply the queued transitions and commit once; returns the number of logs updated"""
+        if not self._transitions:
+            return 0
+        
+        groups: Dict[Tuple[str, Optional[str], Optional[datetime]], List[int]] = {}
+        for email_log_id, transition in self._transitions.items():
+            groups.setdefault(transition, []).append(email_log_id)
+        self._transitions = {}
+        
+        updated = 0
+        for (status, error_message, next_attempt_at), email_log_ids in groups.items():
+            updated += update_email_statuses(
+                self.db, email_log_ids, status, error_message, commit=False, next_attempt_at=next_attempt_at
+            )
+        self.db.commit()
+        return updated
+
+
 def get_email_stats_for_referral(db, referral_id: int) -> dict:
     """
     Get email statistics for a specific referral
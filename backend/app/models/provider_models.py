@@ -1,5 +1,5 @@
 # backend/app/models/provider_models.py
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Time, Float, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Time, Float, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -153,7 +153,7 @@ class ProviderNotification(Base):
     related_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     
     # Metadata
-    metadata = Column(JSON, nullable=True)  # Additional data
+    extra_data = Column("metadata", JSON, nullable=True)  # Additional data (renamed from metadata)
     expires_at = Column(DateTime(timezone=True), nullable=True)
     
     # Timestamps
@@ -163,7 +163,7 @@ class ProviderNotification(Base):
     acknowledged_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
-    provider = relationship("User", back_populates="notifications")
+    provider = relationship("User", back_populates="notifications", foreign_keys=[provider_id])
     related_referral = relationship("Referral", foreign_keys=[related_referral_id])
     related_appointment = relationship("Appointment", foreign_keys=[related_appointment_id])
 
@@ -176,11 +176,12 @@ class ProviderPerformanceMetric(Base):
     
     # Time Period
     metric_date = Column(DateTime(timezone=True), nullable=False)
-    period_type = Column(String(20), nullable=False)  # daily, weekly, monthly, yearly
+    period_type = Column(String(20), nullable=False)  # daily, weekly, monthly, yearly, current
     
     # Referral Metrics
     total_referrals_received = Column(Integer, default=0)
     referrals_accepted = Column(Integer, default=0)
+    referrals_active = Column(Integer, default=0)  # "current" rows: accepted or in progress
     referrals_completed = Column(Integer, default=0)
     referrals_declined = Column(Integer, default=0)
     average_response_time_hours = Column(Float, nullable=True)
@@ -214,6 +215,11 @@ class ProviderPerformanceMetric(Base):
     
     # Relationships
     provider = relationship("User", back_populates="performance_metrics")
+    
+    # One row per provider, period type and period start
+    __table_args__ = (
+        UniqueConstraint('provider_id', 'period_type', 'metric_date', name='uix_provider_metric_period'),
+    )
 
 class ProviderDocument(Base):
     """Provider-related documents and files"""
@@ -243,7 +249,7 @@ class ProviderDocument(Base):
     
     # Metadata
     tags = Column(JSON, nullable=True)  # Search tags
-    metadata = Column(JSON, nullable=True)  # Additional metadata
+    extra_data = Column("metadata", JSON, nullable=True)  # Additional metadata (renamed from metadata)
     
     # Version Control
     version = Column(String(20), default="1.0")
@@ -259,33 +265,3 @@ class ProviderDocument(Base):
     referral = relationship("Referral", foreign_keys=[referral_id])
     appointment = relationship("Appointment", foreign_keys=[appointment_id])
     parent_document = relationship("ProviderDocument", remote_side=[id])
-
-# Update User model relationships (add to existing User model)
-"""
-Add these relationships to the existing User model in app/models/user.py:
-
-# Provider-specific relationships
-availability_slots = relationship("ProviderAvailability", back_populates="provider")
-appointments = relationship("Appointment", back_populates="provider")
-session_notes = relationship("SessionNote", back_populates="provider")
-notifications = relationship("ProviderNotification", back_populates="provider")
-performance_metrics = relationship("ProviderPerformanceMetric", back_populates="provider")
-documents = relationship("ProviderDocument", back_populates="provider")
-"""
-
-# Update Referral model relationships (add to existing Referral model)
-"""
-Add these relationships to the existing Referral model in app/models/referral.py:
-
-# Provider-specific relationships
-appointments = relationship("Appointment", back_populates="referral")
-session_notes = relationship("SessionNote", back_populates="referral")
-
-# Add these fields to Referral model:
-assigned_provider_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-accepted_at = Column(DateTime(timezone=True), nullable=True)
-priority = Column(String(20), default="medium")  # Priority enum
-
-# Add relationship
-assigned_provider = relationship("User", foreign_keys=[assigned_provider_id])
-"""
\ No newline at end of file
@@ -1,5 +1,5 @@
 # backend/app/models/referral.py
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, JSON, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -63,12 +63,47 @@ class Referral(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     notes = Column(Text, nullable=True)  # Admin notes
     
+    # Provider Assignment (columns added by create_provider_tables.py)
+    assigned_provider_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    accepted_at = Column(DateTime(timezone=True), nullable=True)
+    priority = Column(String(20), default="medium")  # low, medium, high, urgent
+    
     # Metadata & Audit
     form_metadata = Column(JSON, nullable=True)  # Flexible extras and submission info
     raw_submission = Column(JSON, nullable=True)  # Original form data for traceability
     
     # Relationships
     email_logs = relationship("EmailLog", back_populates="referral")
+    
+    # Provider-specific relationships
+    appointments = relationship("Appointment", back_populates="referral")
+    session_notes = relationship("SessionNote", back_populates="referral")
+
+    # Indexes for the referral hot paths; applied to existing databases by the
+    # alembic/versions chain (keep the two in step; tests/test_query_plans.py checks
+    # the hot paths can use them)
+    __table_args__ = (
+        # Newest-first keyset pagination of the referral listings
+        Index("ix_referrals_created_at_id", "created_at", "id"),
+        Index("ix_referrals_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_referrals_provider_created_at_id", "assigned_provider_id", "created_at", "id"),
+        Index(
+            "ix_referrals_unassigned_created_at_id", "created_at", "id",
+            postgresql_where=text("assigned_provider_id IS NULL OR status = 'declined'"),
+            sqlite_where=text("assigned_provider_id IS NULL OR status = 'declined'")
+        ),
+        Index("ix_referrals_referred_for_created_at_id", "referred_for", "created_at", "id"),
+        # Provider dashboards: per-status counts, capacity and stale in-progress alerts
+        Index("ix_referrals_provider_status_accepted_at", "assigned_provider_id", "status", "accepted_at"),
+        # Provider recent activity and timeline (latest updates first)
+        Index("ix_referrals_provider_updated_at", "assigned_provider_id", "updated_at"),
+        # Overdue in-progress referrals across all providers
+        Index(
+            "ix_referrals_in_progress_accepted_at", "accepted_at",
+            postgresql_where=text("status = 'in_progress'"),
+            sqlite_where=text("status = 'in_progress'")
+        ),
+    )
 
     def __repr__(self):
         return f"<Referral(id={self.id}, name='{self.first_name} {self.last_name}', status='{self.status}')>"
\ No newline at end of file
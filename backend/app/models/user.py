@@ -55,6 +55,17 @@ class User(Base):
     # Relationships
     email_logs = relationship("EmailLog", back_populates="user")
     
+    # Provider-specific relationships
+    availability_slots = relationship("ProviderAvailability", back_populates="provider")
+    appointments = relationship("Appointment", back_populates="provider")
+    session_notes = relationship("SessionNote", back_populates="provider")
+    notifications = relationship(
+        "ProviderNotification", back_populates="provider",
+        foreign_keys="ProviderNotification.provider_id"
+    )
+    performance_metrics = relationship("ProviderPerformanceMetric", back_populates="provider")
+    documents = relationship("ProviderDocument", back_populates="provider")
+    
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}', role='{self.role.value}')>"
     
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, List, Literal
 from pydantic import BaseModel, ConfigDict
 
 # DataType Schemas
@@ -63,7 +63,28 @@ class DataTypeWithPointsResponse(DataTypeResponse):
 class BulkDataPointCreate(BaseModel):
     data_type_id: str
     data_points: List[DataPointBase]
+    # What to do with names that already exist for the type
+    on_conflict: Literal["fail", "skip", "update"] = "fail"
 
 class BulkDataPointResponse(BaseModel):
     created_count: int
-    data_points: List[DataPointResponse]
\ No newline at end of file
+    updated_count: int = 0
+    skipped_count: int = 0
+    data_points: List[DataPointResponse]
+
+# Streaming imports
+class DataPointImportError(BaseModel):
+    record: int
+    error: str
+
+class DataPointImportResponse(BaseModel):
+    data_type: str
+    records_read: int = 0
+    created_count: int = 0
+    updated_count: int = 0
+    skipped_count: int = 0
+    invalid_count: int = 0
+    # Records fully handled and committed; pass as resume_from to continue an interrupted import
+    committed_records: int = 0
+    completed: bool = False
+    errors: List[DataPointImportError] = []
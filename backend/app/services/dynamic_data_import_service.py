@@ -0,0 +1,177 @@
+# backend/app/services/dynamic_data_import_service.py
+import csv
+import json
+import logging
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.models.dynamic_data import DataType
+from app.schemas.dynamic_data import (
+    DataPointCreate, DataPointImportError, DataPointImportResponse
+)
+from app.services.dynamic_data_service import DynamicDataService
+
+log = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ["csv", "ndjson"]
+
+# Keep the response bounded when a large file is mostly invalid
+MAX_REPORTED_ERRORS = 100
+
+
+class DynamicDataImportService:
+    """Streaming CSV/NDJSON imports of data points (e.g. the NDIS support catalogue)"""
+
+    @staticmethod
+    def detect_format(filename: Optional[str]) -> str:
+        """Guess the import format from a file name, defaulting to CSV"""
+        if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+            return "ndjson"
+        return "csv"
+
+    @staticmethod
+    def iter_records(
+        stream: TextIO,
+        file_format: str = "csv",
+        name_column: str = "name",
+        description_column: str = "description"
+    ) -> Iterator[Tuple[int, Any]]:
+        """
+        Yield (record number, point fields) one record at a time.
+
+        Columns other than the point fields go into extra_data, so catalogue
+        columns such as prices are kept without a schema change. Records that
+        can't be parsed are yielded as an Exception for the caller to report.
+        """
+        if file_format == "csv":
+            records = csv.DictReader(stream)
+        elif file_format == "ndjson":
+            records = (line for line in stream if line.strip())
+        else:
+            raise ValueError(f"Unsupported import format: {file_format}")
+
+        for number, record in enumerate(records, start=1):
+            try:
+                if file_format == "ndjson":
+                    record = json.loads(record)
+                    if not isinstance(record, dict):
+                        raise ValueError("Each line must be a JSON object")
+                yield number, DynamicDataImportService._to_point_fields(
+                    record, name_column, description_column
+                )
+            except (ValueError, TypeError) as e:
+                yield number, e
+
+    @staticmethod
+    def _to_point_fields(record: Dict[str, Any], name_column: str, description_column: str) -> Dict[str, Any]:
+        """Map a raw record onto DataPoint fields, moving unknown columns into extra_data"""
+        fields: Dict[str, Any] = {}
+        extra_data: Dict[str, Any] = {}
+
+        for key, value in record.items():
+            if key is None:
+                continue
+            # CSV cells are strings; treat blanks as missing so defaults apply
+            if isinstance(value, str):
+                value = value.strip()
+                if value == "":
+                    continue
+            if key == name_column:
+                fields["name"] = value
+            elif key == description_column:
+                fields["description"] = value
+            elif key in ("sort_order", "is_active"):
+                fields[key] = value
+            elif key == "extra_data":
+                if isinstance(value, str):
+                    value = json.loads(value)
+                extra_data.update(value or {})
+            else:
+                extra_data[key] = value
+
+        if extra_data:
+            fields["extra_data"] = extra_data
+        return fields
+
+    @staticmethod
+    def _add_error(result: DataPointImportResponse, record: int, error: str):
+        """Count an invalid record, keeping only the first MAX_REPORTED_ERRORS messages"""
+        result.invalid_count += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(DataPointImportError(record=record, error=error))
+
+    @staticmethod
+    def import_records(
+        db: Session,
+        data_type: DataType,
+        records: Iterator[Tuple[int, Any]],
+        on_conflict: str = "update",
+        batch_size: int = 1000,
+        resume_from: int = 0,
+        progress: Optional[Callable[[DataPointImportResponse], None]] = None
+    ) -> DataPointImportResponse:
+        """
+        Validate and upsert records in batches, committing after each batch.
+
+        Only one batch is held in memory. committed_records in the result (and in
+        each progress report) is the number of records safely written; passing it
+        back as resume_from skips them when an interrupted import is restarted.
+        completed stays False if the import stopped on a conflict in "fail" mode.
+        """
+        result = DataPointImportResponse(data_type=data_type.name, committed_records=resume_from)
+        data_type_id = str(data_type.id)
+
+        if resume_from:
+            records = islice(records, resume_from, None)
+
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+
+            points = []
+            for number, fields in batch:
+                result.records_read += 1
+                try:
+                    if isinstance(fields, Exception):
+                        raise fields
+                    # Without an explicit order, keep the file's order
+                    fields.setdefault("sort_order", number)
+                    points.append(DataPointCreate(data_type_id=data_type_id, **fields))
+                except ValidationError as e:
+                    DynamicDataImportService._add_error(result, number, "; ".join(
+                        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                        for error in e.errors()
+                    ))
+                except (ValueError, TypeError) as e:
+                    DynamicDataImportService._add_error(result, number, str(e))
+
+            try:
+                written, created_count = DynamicDataService.upsert_data_points(
+                    db, data_type, points, on_conflict
+                )
+            except ValueError as e:
+                # on_conflict="fail" hit an existing name; earlier batches stay committed
+                db.rollback()
+                result.errors.append(DataPointImportError(record=batch[0][0], error=str(e)))
+                return result
+            db.commit()
+            DynamicDataService.invalidate_cache([data_type.name])
+
+            result.created_count += created_count
+            result.updated_count += len(written) - created_count
+            result.skipped_count += len(points) - len(written)
+            result.committed_records = batch[-1][0]
+            if progress:
+                progress(result)
+
+        result.completed = True
+        log.info(
+            "Imported %s into %s: %s created, %s updated, %s skipped, %s invalid",
+            result.records_read, data_type.name, result.created_count,
+            result.updated_count, result.skipped_count, result.invalid_count
+        )
+        return result
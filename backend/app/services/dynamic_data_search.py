@@ -0,0 +1,234 @@
+# backend/app/services/dynamic_data_search.py
+import heapq
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# The pg_trgm indexes backing PostgreSQL search are created by the
+# 0007_data_point_search_indexes migration; search falls back to plain ILIKE
+# ranking without them.
+
+# Separates the parts of "type<SEP>text<SEP>position" keys; sorts before any printable character
+KEY_SEPARATOR = "\x1f"
+# Separates points in the packed text used for substring search
+TEXT_SEPARATOR = "\x1e"
+
+# Words split on punctuation and underscores, so "support_coordination" matches "coord"
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def has_trigram_support(db: Session) -> bool:
+    """Check whether the pg_trgm extension is installed in the connected database"""
+    return db.execute(
+        text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    ).first() is not None
+
+
+class DataPointSearchIndex:
+    """
+    In-process search index over data points.
+
+    Sorted "type/name" and "type/word" keys answer prefix (typeahead) lookups
+    with a binary search, so a type-filtered lookup only walks that type's range.
+    Substring search scans packed lowercase strings with str.find, which runs
+    in C and needs no per-trigram postings to build. Names and descriptions
+    are packed separately, so a match can't span the two.
+    """
+
+    def __init__(self, entries: List[Tuple[Any, str]]):
+        """Build from (data point, data type name) pairs"""
+        self.points = [point for point, _ in entries]
+        self._type_names = [type_name or "" for _, type_name in entries]
+        self._names = [(point.name or "").lower() for point in self.points]
+        descriptions = [(point.description or "").lower() for point in self.points]
+        self._types = sorted(set(self._type_names))
+
+        # Position in the default (sort_order, name) ordering, used for tie-breaks
+        self._order = array("I", bytes(4 * len(self.points)))
+        ordered = sorted(
+            range(len(self.points)), key=lambda i: (self.points[i].sort_order or 0, self._names[i])
+        )
+        for position, i in enumerate(ordered):
+            self._order[i] = position
+
+        # Sorting plain strings is much faster than sorting tuples; the point
+        # position rides along at the end of each key and is unpacked once
+        self._name_keys = sorted(
+            f"{self._type_names[i]}{KEY_SEPARATOR}{name}{KEY_SEPARATOR}{i}"
+            for i, name in enumerate(self._names)
+        )
+        self._name_points = self._key_points(self._name_keys)
+        self._word_sets = [
+            set(WORD_PATTERN.findall(name)) | set(WORD_PATTERN.findall(description))
+            for name, description in zip(self._names, descriptions)
+        ]
+        self._word_keys = sorted(
+            f"{self._type_names[i]}{KEY_SEPARATOR}{word}{KEY_SEPARATOR}{i}"
+            for i, words in enumerate(self._word_sets) for word in words
+        )
+        self._word_points = self._key_points(self._word_keys)
+
+        self._texts = [self._pack(self._names), self._pack(descriptions)]
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _accept(self, i: int, type_name: Optional[str], active_only: bool) -> bool:
+        if type_name and self._type_names[i] != type_name:
+            return False
+        return not active_only or self.points[i].is_active
+
+    @staticmethod
+    def _pack(values: List[str]) -> Tuple[str, array]:
+        """One string of every value, and the position each value starts at"""
+        starts = array("I")
+        position = 0
+        for value in values:
+            starts.append(position)
+            position += len(value) + 1
+        return TEXT_SEPARATOR.join(values), starts
+
+    @staticmethod
+    def _key_points(keys: List[str]) -> array:
+        return array("I", (int(key.rsplit(KEY_SEPARATOR, 1)[1]) for key in keys))
+
+    def _prefix_ranges(self, keys: List[str], prefix: str, type_name: Optional[str]) -> List[Tuple[int, int]]:
+        """[start, end) positions of keys starting with prefix, one range per requested type"""
+        ranges = []
+        for name in ([type_name] if type_name else self._types):
+            key_prefix = f"{name}{KEY_SEPARATOR}{prefix}"
+            start = bisect_left(keys, key_prefix)
+            end = bisect_left(keys, key_prefix + "\U0010ffff", start)
+            if start < end:
+                ranges.append((start, end))
+        return ranges
+
+    def _prefix_points(
+        self, keys: List[str], points: array, prefix: str, type_name: Optional[str]
+    ) -> Iterator[int]:
+        """Points whose key text starts with prefix, in text order across the requested type(s)"""
+        ranges = self._prefix_ranges(keys, prefix, type_name)
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            return iter(points[start:end])
+
+        def walk(start: int, end: int, offset: int) -> Iterator[Tuple[str, int]]:
+            for position in range(start, end):
+                yield keys[position][offset:], points[position]
+
+        # Merge the per-type ranges lazily; a typeahead usually stops after a few items
+        walks = [walk(start, end, keys[start].index(KEY_SEPARATOR) + 1) for start, end in ranges]
+        return (i for _, i in heapq.merge(*walks))
+
+    def _word_prefix_set(self, prefix: str, type_name: Optional[str]) -> Set[int]:
+        """All points having a word that starts with prefix"""
+        points: Set[int] = set()
+        for start, end in self._prefix_ranges(self._word_keys, prefix, type_name):
+            points.update(self._word_points[start:end])
+        return points
+
+    def _substring_points(self, query: str) -> Iterator[int]:
+        """Points whose name or description contains query (each point once)"""
+        seen: Set[int] = set()
+        for text, starts in self._texts:
+            position = text.find(query)
+            while position != -1:
+                i = bisect_right(starts, position) - 1
+                if i not in seen:
+                    seen.add(i)
+                    yield i
+                if i + 1 >= len(starts):
+                    break
+                position = text.find(query, starts[i + 1])
+
+    def search(
+        self,
+        query: str,
+        type_name: Optional[str] = None,
+        active_only: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Any]:
+        """Substring search over name and description, best matches first (all of them without a limit)"""
+        query = query.lower().strip()
+        if not query or TEXT_SEPARATOR in query:
+            return []
+
+        def rank(i: int) -> Tuple[int, int]:
+            name = self._names[i]
+            if name == query:
+                tier = 0
+            elif name.startswith(query):
+                tier = 1
+            elif query in name:
+                tier = 2
+            else:
+                tier = 3
+            return tier, self._order[i]
+
+        matches = (
+            i for i in self._substring_points(query) if self._accept(i, type_name, active_only)
+        )
+        if limit is None:
+            ranked = sorted(matches, key=rank)
+        else:
+            ranked = heapq.nsmallest(offset + limit, matches, key=rank)
+        return [self.points[i] for i in ranked[offset:]]
+
+    def typeahead(
+        self,
+        prefix: str,
+        type_name: Optional[str] = None,
+        active_only: bool = True,
+        limit: int = 10
+    ) -> List[Any]:
+        """
+        Prefix completion: points whose name starts with the text come first
+        (alphabetically), then points with a word starting with it.
+
+        With several words, every word must prefix-match some word of the point.
+        """
+        raw = prefix.lower().strip()
+        tokens = WORD_PATTERN.findall(raw)
+        if not raw or limit <= 0:
+            return []
+
+        results: List[int] = []
+        seen: Set[int] = set()
+
+        for i in self._prefix_points(self._name_keys, self._name_points, raw, type_name):
+            if len(results) >= limit:
+                break
+            if self._accept(i, type_name, active_only):
+                results.append(i)
+            seen.add(i)
+
+        if len(results) < limit and tokens:
+            if len(tokens) == 1:
+                word_matches: Iterator[int] = self._prefix_points(
+                    self._word_keys, self._word_points, tokens[0], type_name
+                )
+            else:
+                # Intersect the point sets of every word, longest (most selective) first
+                candidates: Optional[Set[int]] = None
+                for token in sorted(set(tokens), key=len, reverse=True):
+                    matches = self._word_prefix_set(token, type_name)
+                    candidates = matches if candidates is None else candidates & matches
+                    if not candidates:
+                        break
+                word_matches = iter(heapq.nsmallest(
+                    limit, (candidates or set()) - seen, key=lambda i: self._names[i]
+                ))
+
+            for i in word_matches:
+                if len(results) >= limit:
+                    break
+                if i not in seen and self._accept(i, type_name, active_only):
+                    results.append(i)
+                seen.add(i)
+
+        return [self.points[i] for i in results]
@@ -1,19 +1,100 @@
 # backend/app/services/dynamic_data_service.py - FIXED VERSION
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func, or_
-from typing import List, Optional, Dict, Any
+from sqlalchemy import and_, case, desc, func, insert, literal_column, or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+import hashlib
+import json
+import threading
+import uuid
 
+from app.core.cache import TTLCache, get_invalidation_bus
+from app.core.config import settings
 from app.models.dynamic_data import DataType, DataPoint
+from app.services.dynamic_data_search import DataPointSearchIndex, has_trigram_support
 from app.schemas.dynamic_data import (
     DataTypeCreate, DataTypeUpdate, DataTypeResponse, DataTypeWithPointsResponse,
-    DataPointCreate, DataPointUpdate, DataPointResponse,
+    DataPointBase, DataPointCreate, DataPointUpdate, DataPointResponse,
     BulkDataPointCreate, BulkDataPointResponse
 )
 
+# Read-through cache for data points by type name, keyed by (type_name, active_only)
+# and tagged with the type name. Invalidated by every write in this service.
+data_points_cache = TTLCache(
+    "dynamic_data_points",
+    max_entries=settings.DYNAMIC_DATA_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.DYNAMIC_DATA_CACHE_TTL_SECONDS,
+    bus=get_invalidation_bus()
+)
+
+# Version stamps per type name, invalidated together with data_points_cache
+data_versions_cache = TTLCache(
+    "dynamic_data_versions",
+    max_entries=settings.DYNAMIC_DATA_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.DYNAMIC_DATA_CACHE_TTL_SECONDS,
+    bus=get_invalidation_bus()
+)
+
+# Serialized snapshot of all active reference data; a single entry cleared on any write
+snapshot_cache = TTLCache(
+    "dynamic_data_snapshot",
+    max_entries=1,
+    ttl_seconds=settings.DYNAMIC_DATA_CACHE_TTL_SECONDS,
+    bus=get_invalidation_bus()
+)
+
+# In-process search index over all points; rebuilt lazily after any write
+search_index_cache = TTLCache(
+    "dynamic_data_search_index",
+    max_entries=1,
+    ttl_seconds=settings.DYNAMIC_DATA_CACHE_TTL_SECONDS,
+    bus=get_invalidation_bus()
+)
+_search_index_lock = threading.Lock()
+
+# Whether pg_trgm is installed, checked once per process
+_trigram_support: Optional[bool] = None
+
+# Column order of each point row in the snapshot
+SNAPSHOT_POINT_FIELDS = ["id", "name", "description", "sort_order", "extra_data"]
+
+# Names/ids per IN (...) lookup in the portable bulk upsert (below SQLite's variable limit)
+KEYS_PER_QUERY = 500
+
+def _detached_copy(point: DataPoint) -> DataPoint:
+    """Copy a data point's column values into a transient instance safe to share across sessions"""
+    return DataPoint(**{
+        column.key: getattr(point, column.key) for column in DataPoint.__table__.columns
+    })
+
 class DynamicDataService:
     """Service for managing dynamic data types and points"""
     
+    @staticmethod
+    def invalidate_cache(type_names: Optional[List[str]] = None):
+        """Invalidate cached data points for the given type names (all types if None)"""
+        for cache in (data_points_cache, data_versions_cache):
+            if type_names is None:
+                cache.clear()
+            else:
+                cache.invalidate_tags([name.lower() for name in type_names if name])
+        # Every change to any type is a change to the snapshot and the search index
+        snapshot_cache.clear()
+        search_index_cache.clear()
+    
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Any]:
+        """Get hit/miss counters for the data points cache"""
+        return data_points_cache.stats()
+    
+    @staticmethod
+    def _type_name_for_id(db: Session, data_type_id) -> Optional[str]:
+        """Get a data type's name from its ID"""
+        row = db.query(DataType.name).filter(DataType.id == data_type_id).first()
+        return row.name if row else None
+    
     @staticmethod
     def get_data_types(db: Session, active_only: bool = True) -> List[DataType]:
         """Get all data types"""
@@ -39,6 +120,7 @@ class DynamicDataService:
         db.add(db_data_type)
         db.commit()
         db.refresh(db_data_type)
+        DynamicDataService.invalidate_cache([db_data_type.name])
         return db_data_type
     
     @staticmethod
@@ -48,6 +130,7 @@ class DynamicDataService:
         if not db_data_type:
             return None
         
+        old_name = db_data_type.name
         update_data = updates.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             if field == 'name' and value:
@@ -57,6 +140,7 @@ class DynamicDataService:
         db_data_type.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(db_data_type)
+        DynamicDataService.invalidate_cache([old_name, db_data_type.name])
         return db_data_type
     
     @staticmethod
@@ -65,7 +149,15 @@ class DynamicDataService:
         type_name: str, 
         active_only: bool = True
     ) -> List[DataPoint]:
-        """Get data points by data type name"""
+        """Get data points by data type name (cached; treat the returned points as read-only)"""
+        tag = type_name.lower()
+        cache_key = (tag, active_only)
+        found, points = data_points_cache.get(cache_key)
+        if found:
+            return list(points)
+        # Taken before querying, so a write committed meanwhile keeps the result out of the cache
+        generation = data_points_cache.generation([tag])
+        
         data_type = DynamicDataService.get_data_type_by_name(db, type_name)
         if not data_type:
             return []
@@ -74,7 +166,94 @@ class DynamicDataService:
         if active_only:
             query = query.filter(DataPoint.is_active == True)
         
-        return query.order_by(DataPoint.sort_order, DataPoint.name).all()
+        points = [_detached_copy(point) for point in query.order_by(DataPoint.sort_order, DataPoint.name).all()]
+        data_points_cache.set(cache_key, points, tags=[tag], generation=generation)
+        return list(points)
+    
+    @staticmethod
+    def get_data_type_version(db: Session, type_name: str) -> Optional[str]:
+        """
+        Get a version stamp for a data type and its points (cached).
+
+        Built from the latest DataType/DataPoint updated_at and the point count,
+        so edits, inserts and deletes all produce a new stamp.
+        """
+        type_name = type_name.lower()
+        found, version = data_versions_cache.get(type_name)
+        if found:
+            return version
+        generation = data_versions_cache.generation([type_name])
+        
+        row = db.query(
+            DataType.updated_at,
+            func.max(DataPoint.updated_at).label("points_updated_at"),
+            func.count(DataPoint.id).label("points_count")
+        ).outerjoin(
+            DataPoint, DataPoint.data_type_id == DataType.id
+        ).filter(
+            DataType.name == type_name
+        ).group_by(DataType.id, DataType.updated_at).first()
+        
+        if not row:
+            return None
+        
+        stamps = [stamp for stamp in (row.updated_at, row.points_updated_at) if stamp]
+        latest = max(stamps).isoformat() if stamps else ""
+        version = f"{latest}:{row.points_count}"
+        data_versions_cache.set(type_name, version, tags=[type_name], generation=generation)
+        return version
+    
+    @staticmethod
+    def get_snapshot(db: Session) -> Tuple[bytes, str]:
+        """
+        Get every active data type with its active points as compact JSON (cached).
+
+        Built from one joined query. Points are arrays in SNAPSHOT_POINT_FIELDS
+        order rather than objects, which keeps the body small and compresses well.
+
+        Returns:
+            Tuple[bytes, str]: Encoded snapshot and its content hash version
+        """
+        found, snapshot = snapshot_cache.get("snapshot")
+        if found:
+            return snapshot
+        generation = snapshot_cache.generation()
+        
+        rows = db.query(DataType, DataPoint).outerjoin(
+            DataPoint,
+            and_(DataPoint.data_type_id == DataType.id, DataPoint.is_active == True)
+        ).filter(
+            DataType.is_active == True
+        ).order_by(
+            DataType.name, DataPoint.sort_order, DataPoint.name
+        ).all()
+        
+        types: Dict[str, Dict[str, Any]] = {}
+        for data_type, point in rows:
+            entry = types.get(data_type.name)
+            if entry is None:
+                entry = types[data_type.name] = {
+                    "id": str(data_type.id),
+                    "display_name": data_type.display_name,
+                    "points": []
+                }
+            if point is not None:
+                entry["points"].append([
+                    str(point.id), point.name, point.description, point.sort_order, point.extra_data
+                ])
+        
+        # Hash the content rather than timestamps so every worker derives the same version
+        encoded_types = json.dumps(types, separators=(",", ":"), sort_keys=True, default=str)
+        version = hashlib.sha1(encoded_types.encode("utf-8")).hexdigest()
+        body = (
+            '{"version":' + json.dumps(version)
+            + ',"fields":' + json.dumps(SNAPSHOT_POINT_FIELDS, separators=(",", ":"))
+            + ',"types":' + encoded_types + '}'
+        ).encode("utf-8")
+        
+        snapshot = (body, version)
+        snapshot_cache.set("snapshot", snapshot, generation=generation)
+        return snapshot
     
     @staticmethod
     def get_data_points_by_type_id(
@@ -108,6 +287,7 @@ class DynamicDataService:
         db.add(db_data_point)
         db.commit()
         db.refresh(db_data_point)
+        DynamicDataService.invalidate_cache([data_type.name])
         return db_data_point
     
     @staticmethod
@@ -126,6 +306,9 @@ class DynamicDataService:
         db_data_point.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(db_data_point)
+        DynamicDataService.invalidate_cache(
+            [DynamicDataService._type_name_for_id(db, db_data_point.data_type_id)]
+        )
         return db_data_point
     
     @staticmethod
@@ -135,8 +318,10 @@ class DynamicDataService:
         if not db_data_point:
             return False
         
+        type_name = DynamicDataService._type_name_for_id(db, db_data_point.data_type_id)
         db.delete(db_data_point)
         db.commit()
+        DynamicDataService.invalidate_cache([type_name])
         return True
     
     @staticmethod
@@ -144,54 +329,283 @@ class DynamicDataService:
         db: Session, 
         bulk_data: BulkDataPointCreate
     ) -> BulkDataPointResponse:
-        """Create multiple data points at once"""
+        """
+        Create multiple data points at once using set-based inserts.
+
+        Names that already exist for the type are handled per bulk_data.on_conflict:
+        "fail" rejects the whole batch, "skip" keeps the existing point and
+        "update" overwrites it with the submitted values.
+        """
         # Verify data type exists
         data_type = db.query(DataType).filter(DataType.id == bulk_data.data_type_id).first()
         if not data_type:
             raise ValueError("Data type not found")
         
-        created_points = []
-        for point_data in bulk_data.data_points:
-            db_data_point = DataPoint(
-                data_type_id=bulk_data.data_type_id,
-                name=point_data.name.lower(),
-                description=point_data.description,
-                sort_order=point_data.sort_order,
-                is_active=point_data.is_active,
-                extra_data=point_data.extra_data
-            )
-            db.add(db_data_point)
-            created_points.append(db_data_point)
+        written, created_count = DynamicDataService.upsert_data_points(
+            db, data_type, bulk_data.data_points, bulk_data.on_conflict
+        )
         
         db.commit()
-        for point in created_points:
-            db.refresh(point)
+        DynamicDataService.invalidate_cache([data_type.name])
         
         return BulkDataPointResponse(
-            created_count=len(created_points),
-            data_points=[DataPointResponse.model_validate(point) for point in created_points]
+            created_count=created_count,
+            updated_count=len(written) - created_count,
+            skipped_count=len(bulk_data.data_points) - len(written),
+            data_points=[
+                DataPointResponse(
+                    id=str(row.id),
+                    data_type_id=str(row.data_type_id),
+                    name=row.name,
+                    description=row.description,
+                    sort_order=row.sort_order,
+                    is_active=row.is_active,
+                    extra_data=row.extra_data,
+                    created_at=row.created_at,
+                    updated_at=row.updated_at
+                )
+                for row in written
+            ]
         )
     
+    @staticmethod
+    def upsert_data_points(
+        db: Session,
+        data_type: DataType,
+        points: List[DataPointBase],
+        on_conflict: str = "fail"
+    ) -> Tuple[List[Any], int]:
+        """
+        Write points for a data type with set-based statements, without committing.
+
+        Returns:
+            Tuple[List[Any], int]: Rows written (inserted or updated) and how many were inserted
+        """
+        # One statement can't touch the same row twice, so later duplicates in the payload win
+        rows_by_name: Dict[str, Dict[str, Any]] = {}
+        for point_data in points:
+            name = point_data.name.lower()
+            rows_by_name[name] = {
+                "id": uuid.uuid4(),
+                "data_type_id": data_type.id,
+                "name": name,
+                "description": point_data.description,
+                "sort_order": point_data.sort_order,
+                "is_active": point_data.is_active,
+                "extra_data": point_data.extra_data
+            }
+        rows = list(rows_by_name.values())
+        if not rows:
+            return [], 0
+        
+        if db.get_bind().dialect.name == "postgresql":
+            return DynamicDataService._bulk_upsert_returning(db, rows, on_conflict)
+        return DynamicDataService._bulk_upsert_executemany(db, data_type.id, rows, on_conflict)
+    
+    @staticmethod
+    def _bulk_upsert_returning(
+        db: Session,
+        rows: List[Dict[str, Any]],
+        on_conflict: str
+    ) -> Tuple[List[Any], int]:
+        """INSERT ... ON CONFLICT ... RETURNING over all rows (PostgreSQL)"""
+        stmt = pg_insert(DataPoint.__table__)
+        if on_conflict == "skip":
+            stmt = stmt.on_conflict_do_nothing(constraint="uix_data_type_name")
+        elif on_conflict == "update":
+            stmt = stmt.on_conflict_do_update(
+                constraint="uix_data_type_name",
+                set_={
+                    "description": stmt.excluded.description,
+                    "sort_order": stmt.excluded.sort_order,
+                    "is_active": stmt.excluded.is_active,
+                    "extra_data": stmt.excluded.extra_data,
+                    "updated_at": func.now()
+                }
+            )
+        # xmax is 0 only on freshly inserted row versions, which separates inserts from updates
+        stmt = stmt.returning(
+            *DataPoint.__table__.columns,
+            literal_column("xmax = 0").label("inserted")
+        )
+        
+        try:
+            # Executed with a parameter list, SQLAlchemy batches the rows into
+            # multi-row VALUES statements ("insertmanyvalues") and still returns every row
+            written = db.execute(stmt, rows).all()
+        except IntegrityError:
+            db.rollback()
+            DynamicDataService._raise_existing_names(db, rows)
+            raise
+        
+        created_count = sum(1 for row in written if row.inserted)
+        return written, created_count
+    
+    @staticmethod
+    def _bulk_upsert_executemany(
+        db: Session,
+        data_type_id,
+        rows: List[Dict[str, Any]],
+        on_conflict: str
+    ) -> Tuple[List[Any], int]:
+        """
+        Portable fallback: resolve conflicts up front, then executemany INSERT/UPDATE
+
+        Only the batch's own names and written ids are looked up, so the cost
+        of a batch doesn't grow with the number of points the type already has.
+        """
+        names = [row["name"] for row in rows]
+        existing: Dict[str, Any] = {}
+        for start in range(0, len(names), KEYS_PER_QUERY):
+            existing.update(db.query(DataPoint.name, DataPoint.id).filter(
+                DataPoint.data_type_id == data_type_id,
+                DataPoint.name.in_(names[start:start + KEYS_PER_QUERY])
+            ).all())
+        conflicts = [row for row in rows if row["name"] in existing]
+        if conflicts and on_conflict == "fail":
+            DynamicDataService._raise_existing_names(db, conflicts)
+        
+        new_rows = [row for row in rows if row["name"] not in existing]
+        if new_rows:
+            db.execute(insert(DataPoint.__table__), new_rows)
+        
+        written_ids = [row["id"] for row in new_rows]
+        if conflicts and on_conflict == "update":
+            now = datetime.utcnow()
+            db.execute(update(DataPoint), [
+                {
+                    "id": existing[row["name"]],
+                    "description": row["description"],
+                    "sort_order": row["sort_order"],
+                    "is_active": row["is_active"],
+                    "extra_data": row["extra_data"],
+                    "updated_at": now
+                }
+                for row in conflicts
+            ])
+            written_ids.extend(existing[row["name"]] for row in conflicts)
+        
+        # Plain column rows, like the RETURNING rows of the PostgreSQL path
+        written = []
+        for start in range(0, len(written_ids), KEYS_PER_QUERY):
+            written += db.query(*DataPoint.__table__.columns).filter(
+                DataPoint.id.in_(written_ids[start:start + KEYS_PER_QUERY])
+            ).all()
+        return written, len(new_rows)
+    
+    @staticmethod
+    def _raise_existing_names(db: Session, rows: List[Dict[str, Any]]):
+        """Raise a ValueError naming the submitted points that already exist, if any"""
+        data_type_id = rows[0]["data_type_id"] if rows else None
+        names = [
+            name for (name,) in db.query(DataPoint.name).filter(
+                DataPoint.data_type_id == data_type_id,
+                DataPoint.name.in_([row["name"] for row in rows])
+            ).order_by(DataPoint.name).limit(20).all()
+        ]
+        if names:
+            raise ValueError(f"Data points already exist: {', '.join(names)}")
+    
+    @staticmethod
+    def get_search_index(db: Session) -> DataPointSearchIndex:
+        """Get the in-process search index, building it from one query when missing"""
+        found, index = search_index_cache.get("index")
+        if found:
+            return index
+        
+        # One build at a time; concurrent callers wait and reuse it
+        with _search_index_lock:
+            found, index = search_index_cache.get("index")
+            if found:
+                return index
+            generation = search_index_cache.generation()
+            # Plain column rows are much cheaper to load than ORM instances and
+            # expose the same attributes
+            rows = db.query(
+                *DataPoint.__table__.columns, DataType.name.label("data_type_name")
+            ).join(
+                DataType, DataPoint.data_type_id == DataType.id
+            ).all()
+            index = DataPointSearchIndex([(row, row.data_type_name) for row in rows])
+            search_index_cache.set("index", index, generation=generation)
+            return index
+    
     @staticmethod
     def search_data_points(
         db: Session, 
         query: str, 
-        data_type_name: Optional[str] = None
+        data_type_name: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        active_only: bool = False
     ) -> List[DataPoint]:
-        """Search data points by name or description"""
+        """
+        Search data points by name or description, best matches first.
+
+        Every match is returned unless a limit is given (the /search endpoint
+        passes its page size).
+
+        PostgreSQL runs an ILIKE search backed by the pg_trgm indexes and ranks by
+        trigram similarity; other databases use the in-process index.
+        """
+        global _trigram_support
+        
+        if db.get_bind().dialect.name != "postgresql":
+            return DynamicDataService.get_search_index(db).search(
+                query, data_type_name.lower() if data_type_name else None,
+                active_only=active_only, limit=limit, offset=offset
+            )
+        
+        term = query.strip()
+        if not term:
+            return []
+        escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
         search_query = db.query(DataPoint).filter(
             or_(
-                DataPoint.name.ilike(f"%{query.lower()}%"),
-                DataPoint.description.ilike(f"%{query}%")
+                DataPoint.name.ilike(f"%{escaped}%", escape="\\"),
+                DataPoint.description.ilike(f"%{escaped}%", escape="\\")
             )
         )
         
         if data_type_name:
             data_type = DynamicDataService.get_data_type_by_name(db, data_type_name)
-            if data_type:
-                search_query = search_query.filter(DataPoint.data_type_id == data_type.id)
+            if not data_type:
+                return []
+            search_query = search_query.filter(DataPoint.data_type_id == data_type.id)
+        if active_only:
+            search_query = search_query.filter(DataPoint.is_active == True)
+        
+        ordering = [
+            case(
+                (func.lower(DataPoint.name) == term.lower(), 0),
+                (DataPoint.name.ilike(f"{escaped}%", escape="\\"), 1),
+                (DataPoint.name.ilike(f"%{escaped}%", escape="\\"), 2),
+                else_=3
+            )
+        ]
+        if _trigram_support is None:
+            _trigram_support = has_trigram_support(db)
+        if _trigram_support:
+            ordering.append(desc(func.greatest(
+                func.similarity(DataPoint.name, term),
+                func.similarity(func.coalesce(DataPoint.description, ""), term)
+            )))
         
-        return search_query.order_by(DataPoint.sort_order, DataPoint.name).all()
+        return search_query.order_by(
+            *ordering, DataPoint.sort_order, DataPoint.name
+        ).offset(offset).limit(limit).all()
+    
+    @staticmethod
+    def typeahead_data_points(
+        db: Session,
+        prefix: str,
+        data_type_name: Optional[str] = None,
+        limit: int = 10
+    ) -> List[DataPoint]:
+        """Active points completing the typed prefix, served from the in-process index"""
+        return DynamicDataService.get_search_index(db).typeahead(
+            prefix, data_type_name.lower() if data_type_name else None, limit=limit
+        )
     
     @staticmethod
     def get_data_type_with_points(db: Session, type_name: str) -> Optional[DataTypeWithPointsResponse]:
@@ -0,0 +1,274 @@
+# backend/app/services/email_outbox.py
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.rate_limit import RateLimitExceeded
+from app.models.email_log import EmailLog, EmailLogWriter, EmailStatus, EmailType
+from app.models.referral import Referral
+from app.services.email_retry import (
+    CircuitBreaker, CircuitOpenError, RetryPolicy, is_retryable, mailgun_breaker, retry_policy
+)
+from app.services.email_service import (
+    EmailService, get_email_service, notification_subject, participant_recipient
+)
+
+log = logging.getLogger(__name__)
+
+
+class EmailOutbox:
+    """
+    Transactional outbox for referral emails.
+
+    The outbox is the email_logs table itself: a pending row with
+    next_attempt_at set is an email still to be sent by the dispatcher. Rows
+    are added in the caller's transaction, so they are committed (or rolled
+    back) together with the referral they belong to.
+    """
+
+    @staticmethod
+    def enqueue_referral_notifications(db: Session, referral: Referral, provider_emails: List[str]) -> List[EmailLog]:
+        """Queue every notification for a new referral in the current transaction (not committed)"""
+        if referral.id is None:
+            db.flush()
+
+        recipients = [(EmailType.PROVIDER_NOTIFICATION.value, email) for email in dict.fromkeys(provider_emails)]
+        if participant_recipient(referral):
+            recipients.append((EmailType.PARTICIPANT_CONFIRMATION.value, participant_recipient(referral)))
+        if referral.referrer_email:
+            recipients.append((EmailType.REFERRER_NOTIFICATION.value, referral.referrer_email))
+
+        due = datetime.now(timezone.utc)
+        email_logs = [
+            EmailLog(
+                email_type=email_type,
+                recipient_email=recipient,
+                subject=notification_subject(email_type, referral),
+                referral_id=referral.id,
+                status=EmailStatus.PENDING.value,
+                retry_count=0,
+                next_attempt_at=due
+            )
+            for email_type, recipient in recipients
+        ]
+        db.add_all(email_logs)
+        return email_logs
+
+    @staticmethod
+    def claim_due(db: Session, limit: int) -> List[EmailLog]:
+        """
+        Lock up to limit due outbox emails, oldest first
+
+        FOR UPDATE SKIP LOCKED lets several dispatchers poll at once without
+        taking the same rows; the locks last until the caller commits.
+        """
+        return db.query(EmailLog).filter(
+            EmailLog.status.in_([EmailStatus.PENDING.value, EmailStatus.RETRY.value]),
+            EmailLog.next_attempt_at.isnot(None),
+            EmailLog.next_attempt_at <= datetime.now(timezone.utc)
+        ).order_by(
+            EmailLog.next_attempt_at, EmailLog.id
+        ).limit(limit).with_for_update(skip_locked=True).all()
+
+    @staticmethod
+    def pending_count(db: Session) -> int:
+        """Outbox emails not yet sent (due or not)"""
+        return db.query(EmailLog).filter(
+            EmailLog.status.in_([EmailStatus.PENDING.value, EmailStatus.RETRY.value]),
+            EmailLog.next_attempt_at.isnot(None)
+        ).count()
+
+    @staticmethod
+    def overdue_count(db: Session, seconds: float) -> int:
+        """Outbox emails that have been due for more than seconds (none while a dispatcher runs)"""
+        return db.query(EmailLog).filter(
+            EmailLog.status.in_([EmailStatus.PENDING.value, EmailStatus.RETRY.value]),
+            EmailLog.next_attempt_at.isnot(None),
+            EmailLog.next_attempt_at <= datetime.now(timezone.utc) - timedelta(seconds=seconds)
+        ).count()
+
+
+class EmailDispatcher:
+    """
+    Sends outbox emails in batches (run by dispatch_emails.py).
+
+    Each batch is claimed, sent and marked in one transaction, so a dispatcher
+    that dies mid-batch leaves its rows pending and they are sent again by the
+    next poll: delivery is at-least-once, never lost. A batch's emails are
+    grouped per referral and email type (providers get one Mailgun batch send)
+    and the groups are sent concurrently.
+
+    Failures that may go away (timeouts, 429, 5xx) are rescheduled with
+    exponential backoff and jitter on the email's retry_count, no earlier than
+    Mailgun's Retry-After; others fail for good. Emails held back by the
+    sending rate limit go back in the queue without using a retry. While the
+    Mailgun circuit breaker is open nothing is claimed. Once it closes the
+    batch size restarts at EMAIL_DRAIN_START_BATCH_SIZE and doubles with every
+    clean batch, so the backlog drains at a controlled rate instead of all at
+    once.
+    """
+
+    def __init__(
+        self,
+        email_service: Optional[EmailService] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = None,
+        concurrency: int = None,
+        poll_interval: float = None,
+        policy: RetryPolicy = retry_policy,
+        breaker: CircuitBreaker = mailgun_breaker
+    ):
+        self.email_service = email_service or get_email_service()
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.concurrency = concurrency or settings.EMAIL_OUTBOX_CONCURRENCY
+        self.poll_interval = poll_interval if poll_interval is not None else settings.EMAIL_OUTBOX_POLL_SECONDS
+        self.policy = policy
+        self.breaker = breaker
+        self.batch_limit = self.batch_size
+        self._breaker_was_closed = True
+
+    def _next_batch_limit(self) -> int:
+        """Batch size for the next claim: one probe while half open, ramping up after the breaker closes"""
+        state = self.breaker.state
+        if state == CircuitBreaker.HALF_OPEN:
+            self._breaker_was_closed = False
+            return 1
+        if state == CircuitBreaker.CLOSED and not self._breaker_was_closed:
+            self._breaker_was_closed = True
+            self.batch_limit = min(self.batch_size, settings.EMAIL_DRAIN_START_BATCH_SIZE)
+            log.info("Mailgun available again - draining the outbox from batches of %d", self.batch_limit)
+        return self.batch_limit
+
+    async def _run_send(self, send, slots: asyncio.Semaphore) -> Optional[BaseException]:
+        """Await one send within the concurrency limit and timeout; returns the error, or None if sent"""
+        async with slots:
+            try:
+                sent = await asyncio.wait_for(send, settings.EMAIL_SEND_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError as e:
+                self.breaker.record_failure()
+                return e
+            except Exception as e:
+                return e
+        return None if sent else ValueError("send failed")
+
+    def _record_error(self, writer: EmailLogWriter, group: List[EmailLog], error: BaseException):
+        """Reschedule a failed group with backoff, or fail it for good"""
+        log_ids = [email_log.id for email_log in group]
+        message = str(error) or type(error).__name__
+        now = datetime.now(timezone.utc)
+
+        if isinstance(error, (CircuitOpenError, RateLimitExceeded)):
+            # Never attempted - keep its retry count and come back once there is capacity
+            if isinstance(error, RateLimitExceeded):
+                delay = error.retry_after * random.uniform(1, 2)
+            else:
+                delay = self.breaker.retry_after() + self.policy.next_delay(0)
+            writer.set_status(log_ids, EmailStatus.PENDING.value, next_attempt_at=now + timedelta(seconds=delay))
+            return
+
+        retry_count = max(email_log.retry_count or 0 for email_log in group)
+        if is_retryable(error) and self.policy.should_retry(retry_count + 1):
+            delay = self.policy.next_delay(retry_count, getattr(error, "retry_after", None))
+            writer.set_status(
+                log_ids, EmailStatus.RETRY.value, message, next_attempt_at=now + timedelta(seconds=delay)
+            )
+        else:
+            writer.set_status(log_ids, EmailStatus.FAILED.value, message)
+
+    def _send(self, db: Session, referral: Referral, email_type: str, recipients: List[str]):
+        """Coroutine sending one group of outbox emails (without writing logs of its own)"""
+        if email_type == EmailType.PROVIDER_NOTIFICATION.value:
+            return self.email_service.send_provider_notification(
+                referral, recipients,
+                recipient_variables=EmailService._provider_recipient_variables(db, recipients),
+                raise_errors=True
+            )
+        if email_type == EmailType.PARTICIPANT_CONFIRMATION.value:
+            return self.email_service.send_participant_confirmation(referral, raise_errors=True)
+        if email_type == EmailType.REFERRER_NOTIFICATION.value:
+            return self.email_service.send_referrer_notification(referral, raise_errors=True)
+        raise ValueError(f"Unknown email type: {email_type}")
+
+    async def dispatch_once(self) -> int:
+        """Claim and send one batch; returns the number of emails processed"""
+        if self.breaker.retry_after() > 0:
+            self._breaker_was_closed = False
+            return 0
+        limit = self._next_batch_limit()
+
+        db = self.session_factory()
+        try:
+            email_logs = EmailOutbox.claim_due(db, limit)
+            if not email_logs:
+                db.rollback()
+                return 0
+
+            referral_ids = {email_log.referral_id for email_log in email_logs}
+            referrals = {
+                referral.id: referral
+                for referral in db.query(Referral).filter(Referral.id.in_(referral_ids))
+            }
+
+            groups: Dict[Tuple[int, str], List[EmailLog]] = {}
+            for email_log in email_logs:
+                groups.setdefault((email_log.referral_id, email_log.email_type), []).append(email_log)
+
+            writer = EmailLogWriter(db)
+            sends = []
+            for (referral_id, email_type), group in groups.items():
+                referral = referrals.get(referral_id)
+                try:
+                    if referral is None:
+                        raise ValueError(f"Referral {referral_id} not found")
+                    send = self._send(db, referral, email_type, [email_log.recipient_email for email_log in group])
+                except ValueError as e:
+                    writer.set_status([email_log.id for email_log in group], EmailStatus.FAILED.value, str(e))
+                    continue
+                sends.append((group, send))
+
+            slots = asyncio.Semaphore(self.concurrency)
+            errors = await asyncio.gather(*(self._run_send(send, slots) for _, send in sends))
+            for (group, _), error in zip(sends, errors):
+                if error is None:
+                    writer.set_status([email_log.id for email_log in group], EmailStatus.SENT.value)
+                else:
+                    self._record_error(writer, group, error)
+
+            # One commit records the results and releases the row locks
+            writer.flush()
+
+            if any(errors):
+                self.batch_limit = max(1, self.batch_limit // 2)
+            elif self.batch_limit < self.batch_size and len(email_logs) >= limit:
+                self.batch_limit = min(self.batch_size, self.batch_limit * 2)
+            return len(email_logs)
+        except BaseException:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def run(self, stop: Optional[asyncio.Event] = None):
+        """Poll until stop is set; full batches are followed straight away by the next"""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                processed = await self.dispatch_once()
+            except Exception as e:
+                log.exception("Email dispatch failed: %s", e)
+                processed = 0
+            if processed and processed >= self.batch_limit:
+                continue
+            try:
+                # While the breaker is open, poll again when it half-opens
+                wait = min(self.poll_interval, self.breaker.retry_after()) if self.breaker.retry_after() else self.poll_interval
+                await asyncio.wait_for(stop.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,203 @@
+# backend/app/services/email_retry.py
+import asyncio
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimitExceeded
+
+log = logging.getLogger(__name__)
+
+
+class MailgunError(Exception):
+    """Mailgun rejected a request (status_code) or couldn't be reached (status_code None)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(MailgunError):
+    """Not sent: the Mailgun circuit breaker is open after repeated failures"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Worth sending again later: timeouts, connection errors, throttling, 429 and 5xx responses"""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError, RateLimitExceeded)):
+        return True
+    if isinstance(error, MailgunError):
+        return error.status_code is None or error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    The n-th retry waits a random time up to base_delay * 2**n (capped at
+    max_delay), so emails that failed together don't all come back together.
+    A server-supplied Retry-After is a lower bound.
+    """
+
+    def __init__(self, base_delay: float = 30, max_delay: float = 3600, max_attempts: int = 8):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+
+    def should_retry(self, retry_count: int) -> bool:
+        """retry_count: failed attempts so far, including the one just made"""
+        return retry_count < self.max_attempts
+
+    def next_delay(self, retry_count: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before the next attempt, after retry_count earlier retries"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** min(retry_count, 32)))
+        delay = random.uniform(0, ceiling)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing dependency for a while.
+
+    closed: calls go through; failure_threshold consecutive failures (or one
+    with a Retry-After) open the breaker. open: calls are refused until
+    reset_timeout (or the Retry-After) has passed. half_open: one probe call
+    is let through; its success closes the breaker, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self._opened = 0
+        self.closed_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() >= self._open_until:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (in half_open, only the first caller's)"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN:
+                # A probe that never reported back (e.g. cancelled) doesn't block forever
+                if self._probe_in_flight and time.monotonic() - self._probe_started < self.reset_timeout:
+                    return False
+                self._probe_in_flight = True
+                self._probe_started = time.monotonic()
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds until calls are allowed again (0 when closed)"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.OPEN:
+                return max(0.0, self._open_until - time.monotonic())
+            if state == self.HALF_OPEN and self._probe_in_flight:
+                return 1.0
+            return 0.0
+
+    def release(self):
+        """Give back a half_open probe slot taken by allow() for a call that was never made"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self._current_state() == self.OPEN:
+                # A call that started before the breaker opened doesn't close it early
+                return
+            if self._state != self.CLOSED:
+                log.info("Circuit breaker %s closed", self.name)
+                self.closed_at = time.monotonic()
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, retry_after: Optional[float] = None):
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or self._failures >= self.failure_threshold or retry_after:
+                self._open(max(self.reset_timeout, retry_after or 0))
+
+    def _open(self, seconds: float):
+        if self._state != self.OPEN:
+            self._opened += 1
+            log.warning("Circuit breaker %s open for %.0fs after %d failures", self.name, seconds, self._failures)
+        self._state = self.OPEN
+        self._open_until = max(self._open_until, time.monotonic() + seconds)
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "times_opened": self._opened,
+                "retry_after": max(0.0, self._open_until - time.monotonic()) if self._state == self.OPEN else 0.0
+            }
+
+
+# Shared by every Mailgun send in this process (API, Celery worker or dispatcher)
+mailgun_breaker = CircuitBreaker(
+    "mailgun",
+    failure_threshold=settings.EMAIL_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.EMAIL_BREAKER_RESET_SECONDS
+)
+
+retry_policy = RetryPolicy(
+    base_delay=settings.EMAIL_RETRY_BASE_DELAY_SECONDS,
+    max_delay=settings.EMAIL_RETRY_MAX_DELAY_SECONDS,
+    max_attempts=settings.EMAIL_RETRY_MAX_ATTEMPTS
+)
@@ -1,14 +1,56 @@
 import os
-from typing import List, Optional
+import json
+from typing import Awaitable, Dict, List, Optional
 import httpx
 from pydantic import EmailStr, BaseModel
-from jinja2 import Environment, FileSystemLoader
-from pathlib import Path
 import asyncio
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
+from app.core.config import settings
+from app.core.http_client import get_http_client
+from app.core.rate_limit import RateLimiter, create_token_bucket
 from app.models.referral import Referral
-from app.models.email_log import EmailLog, EmailType, log_email_attempt, update_email_status
+from app.models.user import User
+from app.models.email_log import EmailLog, EmailLogWriter, EmailType
+from app.services.email_retry import (
+    CircuitOpenError, MailgunError, is_retryable, mailgun_breaker, parse_retry_after
+)
+from app.services.email_templates import build_email_templates, referral_cache_key, referral_tag
+
+# Mailgun accepts up to 1,000 recipients per batch send
+MAILGUN_BATCH_SIZE = 1000
+
+# Rendered into batch-sent templates; Mailgun substitutes each recipient's values
+RECIPIENT_PLACEHOLDERS = {"name": "%recipient.name%"}
+DEFAULT_RECIPIENT_VARIABLES = {"name": "there"}
+
+
+def build_email_rate_limiter() -> Optional[RateLimiter]:
+    """Per-domain Mailgun send limiter from settings (None when disabled)"""
+    if settings.EMAIL_RATE_LIMIT_PER_MINUTE <= 0:
+        return None
+    bucket = create_token_bucket(
+        settings.EMAIL_RATE_LIMIT_PER_MINUTE / 60,
+        settings.EMAIL_RATE_LIMIT_BURST,
+        settings.EMAIL_RATE_LIMIT_REDIS_URL or settings.CACHE_REDIS_URL
+    )
+    return RateLimiter("mailgun", bucket, max_wait=settings.EMAIL_RATE_LIMIT_MAX_WAIT_SECONDS)
+
+
+def notification_subject(email_type: str, referral: Referral) -> str:
+    """Subject line of a referral notification email"""
+    if email_type == EmailType.PROVIDER_NOTIFICATION.value:
+        return f"New NDIS Referral #{referral.id} - {referral.referred_for.title()}"
+    if email_type == EmailType.PARTICIPANT_CONFIRMATION.value:
+        return f"✅ NDIS Referral Confirmation - ID #{referral.id}"
+    if email_type == EmailType.REFERRER_NOTIFICATION.value:
+        return f"✅ Referral #{referral.id} Submitted Successfully"
+    raise ValueError(f"Unknown email type: {email_type}")
+
+
+def participant_recipient(referral: Referral) -> Optional[str]:
+    """Participant confirmations go to the participant, or their representative"""
+    return referral.email_address or referral.rep_email_address or None
 
 
 class EmailConfig(BaseModel):
@@ -39,148 +81,247 @@ class EmailService:
             MAILGUN_SENDER_EMAIL=sender_email or "noreply@example.com"
         )
         
-        # Mailgun API endpoint
-        self.mailgun_url = f"https://api.mailgun.net/v3/{self.config.MAILGUN_DOMAIN}/messages"
+        # Mailgun API endpoint (MAILGUN_API_BASE_URL selects the EU region or a local stand-in)
+        api_base_url = os.getenv("MAILGUN_API_BASE_URL", "https://api.mailgun.net/v3").rstrip("/")
+        self.mailgun_url = f"{api_base_url}/{self.config.MAILGUN_DOMAIN}/messages"
         self.auth = ("api", self.config.MAILGUN_API_KEY)
+        self.rate_limiter = build_email_rate_limiter()
 
     def _setup_templates(self):
-        """Setup Jinja2 template environment"""
-        template_dir = Path(__file__).parent.parent / "templates" / "email"
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(str(template_dir)),
-            autoescape=True
-        )
+        """Compile the email templates once, up front"""
+        self.templates = build_email_templates()
 
     def _render_template(self, template_name: str, context: dict) -> str:
         """Render email template with context data"""
-        template = self.jinja_env.get_template(template_name)
-        return template.render(**context)
+        return self.templates.render(template_name, context)
+
+    def _render_referral_message(self, base_name: str, referral: Referral, **context) -> Dict[str, str]:
+        """
+        Render a message's HTML/text bodies for a referral, reusing an earlier
+        render of the same referral version (context must not vary per recipient)
+        """
+        return self.templates.render_message(
+            base_name,
+            {"referral": referral, **context},
+            cache_key=referral_cache_key(referral),
+            tags=(referral_tag(referral.id),)
+        )
+
+    async def _post_message(self, data: dict) -> httpx.Response:
+        """
+        Post a message to Mailgun over the shared keep-alive client, raising MailgunError on API errors
+
+        While the Mailgun circuit breaker is open, messages fail straight away
+        with CircuitOpenError, without using rate limit tokens. Otherwise sends
+        wait for the domain's rate limit (each recipient of a batch send
+        counts), raising RateLimitExceeded if that would take longer than
+        EMAIL_RATE_LIMIT_MAX_WAIT_SECONDS. Every outcome is reported to the
+        breaker.
+        """
+        if not mailgun_breaker.allow():
+            raise CircuitOpenError(
+                f"Mailgun circuit breaker open - retry in {mailgun_breaker.retry_after():.0f}s",
+                retry_after=mailgun_breaker.retry_after()
+            )
+        if self.rate_limiter:
+            recipients = data.get("to") or []
+            try:
+                await self.rate_limiter.acquire(
+                    self.config.MAILGUN_DOMAIN, len(recipients) if isinstance(recipients, list) else 1
+                )
+            except BaseException:
+                # Nothing was sent, so there is no outcome to report
+                mailgun_breaker.release()
+                raise
+        try:
+            response = await get_http_client().post(self.mailgun_url, auth=self.auth, data=data)
+        except httpx.TransportError as e:
+            mailgun_breaker.record_failure()
+            raise MailgunError(f"Mailgun API unreachable: {e!r}") from e
+        
+        if response.status_code != 200:
+            error = MailgunError(
+                f"Mailgun API error: {response.status_code} - {response.text}",
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
+            )
+            if is_retryable(error):
+                mailgun_breaker.record_failure(error.retry_after)
+            else:
+                # The request was bad, not the service
+                mailgun_breaker.record_success()
+            raise error
+        mailgun_breaker.record_success()
+        return response
 
-    async def send_provider_notification(self, referral: Referral, provider_emails: List[str], db: Session = None) -> bool:
+    @staticmethod
+    def _provider_recipient_variables(db: Session, emails: List[str]) -> Dict[str, Dict[str, str]]:
+        """Look up provider first names for personalisation in one query"""
+        if not db or not emails:
+            return {}
+        rows = db.query(User.email, User.first_name).filter(User.email.in_(emails)).all()
+        return {email: {"name": first_name} for email, first_name in rows if first_name}
+
+    async def send_provider_notification(
+        self,
+        referral: Referral,
+        provider_emails: List[str],
+        db: Session = None,
+        recipient_variables: Optional[Dict[str, Dict[str, str]]] = None,
+        task_id: Optional[str] = None,
+        raise_errors: bool = False
+    ) -> bool:
         """
         Send notification email to healthcare providers about new referral
         
+        Uses Mailgun batch sending: one request per MAILGUN_BATCH_SIZE recipients,
+        with recipient-variables so each provider gets their own copy (no other
+        addresses in To) greeted by name.
+        
         Args:
             referral: Referral object containing all referral details
             provider_emails: List of provider email addresses to notify
             db: Database session for logging
+            recipient_variables: Template values per address (email -> {"name": ...});
+                looked up from the provider accounts when omitted
+            task_id: Celery task ID recorded on the email logs (optional)
+            raise_errors: Raise the first MailgunError instead of returning False,
+                for callers that schedule retries
         
         Returns:
-            bool: True if email sent successfully, False otherwise
+            bool: True if every batch was sent successfully, False otherwise
         """
-        subject = f"New NDIS Referral #{referral.id} - {referral.referred_for.title()}"
-        email_logs = []
+        subject = notification_subject(EmailType.PROVIDER_NOTIFICATION.value, referral)
+        provider_emails = list(dict.fromkeys(provider_emails))
+        # Logs are written in bulk: one INSERT up front, one commit of status updates at the end
+        email_logs = EmailLogWriter(db) if db else None
+        log_ids: Dict[str, int] = {}
+        pending_log_ids: List[int] = []
+        failed = 0
+        first_error: Optional[Exception] = None
         
         try:
             # Log email attempts
-            if db:
-                for email in provider_emails:
-                    email_log = log_email_attempt(
-                        db, 
-                        EmailType.PROVIDER_NOTIFICATION.value,
-                        email,
-                        subject,
-                        referral_id=referral.id
-                    )
-                    email_logs.append(email_log)
+            if email_logs:
+                log_ids = email_logs.log_attempts(
+                    EmailType.PROVIDER_NOTIFICATION.value,
+                    provider_emails,
+                    subject,
+                    referral_id=referral.id,
+                    task_id=task_id
+                )
+                pending_log_ids = list(log_ids.values())
             
-            # Render the HTML template
-            html_content = self._render_template(
-                "provider_notification.html",
-                {"referral": referral}
+            if recipient_variables is None:
+                recipient_variables = self._provider_recipient_variables(db, provider_emails)
+            
+            # Render once for every batch; Mailgun fills in %recipient.*% per recipient
+            message = self._render_referral_message(
+                "provider_notification", referral, recipient=RECIPIENT_PLACEHOLDERS
             )
             
-            # Send email via Mailgun API
-            async with httpx.AsyncClient() as client:
+            for start in range(0, len(provider_emails), MAILGUN_BATCH_SIZE):
+                batch = provider_emails[start:start + MAILGUN_BATCH_SIZE]
+                batch_log_ids = [log_ids[email] for email in batch if email in log_ids]
+                
+                # Send email via Mailgun API
                 data = {
                     "from": f"{self.config.MAILGUN_APP_NAME} <{self.config.MAILGUN_SENDER_EMAIL}>",
-                    "to": provider_emails,
+                    "to": batch,
                     "subject": subject,
-                    "html": html_content
+                    **message,
+                    # Every recipient needs an entry, or Mailgun sends the placeholder text
+                    "recipient-variables": json.dumps({
+                        email: {**DEFAULT_RECIPIENT_VARIABLES, **recipient_variables.get(email, {})}
+                        for email in batch
+                    })
                 }
+                try:
+                    await self._post_message(data)
+                    status, error = "sent", None
+                except Exception as e:
+                    failed += len(batch)
+                    first_error = first_error or e
+                    status, error = "failed", str(e)
+                    print(f"Failed to send provider notification batch for referral #{referral.id}: {error}")
                 
-                response = await client.post(
-                    self.mailgun_url,
-                    auth=self.auth,
-                    data=data
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"Mailgun API error: {response.status_code} - {response.text}")
+                if email_logs:
+                    email_logs.set_status(batch_log_ids, status, error)
+                    pending_log_ids = [log_id for log_id in pending_log_ids if log_id not in batch_log_ids]
             
-            # Update logs as sent
-            if db:
-                for email_log in email_logs:
-                    update_email_status(db, email_log.id, "sent")
+            if failed:
+                print(f"Provider notification for referral #{referral.id} failed for {failed} of {len(provider_emails)} recipients")
+                if raise_errors:
+                    raise first_error
+                return False
             
             print(f"Provider notification sent for referral #{referral.id} to {len(provider_emails)} recipients")
             return True
             
+        except asyncio.CancelledError:
+            # Timed out by send_all_notifications - don't leave the logs pending
+            if email_logs:
+                email_logs.set_status(pending_log_ids, "failed", "Send timed out")
+            raise
         except Exception as e:
             # Update logs as failed
-            if db:
-                for email_log in email_logs:
-                    update_email_status(db, email_log.id, "failed", str(e))
+            if email_logs:
+                email_logs.set_status(pending_log_ids, "failed", str(e))
             
             print(f"Failed to send provider notification for referral #{referral.id}: {str(e)}")
+            if raise_errors:
+                raise
             return False
+        finally:
+            if email_logs:
+                email_logs.flush()
 
-    async def send_participant_confirmation(self, referral: Referral, db: Session = None) -> bool:
+    async def send_participant_confirmation(self, referral: Referral, db: Session = None, raise_errors: bool = False) -> bool:
         """
         Send confirmation email to participant about their referral submission
         
         Args:
             referral: Referral object containing all referral details
+            raise_errors: Raise Mailgun errors instead of returning False
         
         Returns:
             bool: True if email sent successfully, False otherwise
         """
         try:
             # Determine recipient email
-            recipient_email = referral.email_address
-            if not recipient_email and referral.rep_email_address:
-                recipient_email = referral.rep_email_address
+            recipient_email = participant_recipient(referral)
             
             if not recipient_email:
                 print(f"No email address provided for referral #{referral.id} - skipping participant confirmation")
                 return False
             
-            # Render the HTML template
-            html_content = self._render_template(
-                "participant_confirmation.html",
-                {"referral": referral}
-            )
+            # Render the HTML and plain-text bodies
+            message = self._render_referral_message("participant_confirmation", referral)
             
             # Send email via Mailgun API
-            async with httpx.AsyncClient() as client:
-                data = {
-                    "from": f"{self.config.MAILGUN_APP_NAME} <{self.config.MAILGUN_SENDER_EMAIL}>",
-                    "to": [recipient_email],
-                    "subject": f"✅ NDIS Referral Confirmation - ID #{referral.id}",
-                    "html": html_content
-                }
-                
-                response = await client.post(
-                    self.mailgun_url,
-                    auth=self.auth,
-                    data=data
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"Mailgun API error: {response.status_code} - {response.text}")
+            data = {
+                "from": f"{self.config.MAILGUN_APP_NAME} <{self.config.MAILGUN_SENDER_EMAIL}>",
+                "to": [recipient_email],
+                "subject": notification_subject(EmailType.PARTICIPANT_CONFIRMATION.value, referral),
+                **message
+            }
+            await self._post_message(data)
             print(f"Participant confirmation sent for referral #{referral.id} to {recipient_email}")
             return True
             
         except Exception as e:
             print(f"Failed to send participant confirmation for referral #{referral.id}: {str(e)}")
+            if raise_errors:
+                raise
             return False
 
-    async def send_referrer_notification(self, referral: Referral, db: Session = None) -> bool:
+    async def send_referrer_notification(self, referral: Referral, db: Session = None, raise_errors: bool = False) -> bool:
         """
         Send notification email to the referring professional
         
         Args:
             referral: Referral object containing all referral details
+            raise_errors: Raise Mailgun errors instead of returning False
         
         Returns:
             bool: True if email sent successfully, False otherwise
@@ -190,65 +331,62 @@ class EmailService:
                 print(f"No referrer email provided for referral #{referral.id} - skipping referrer notification")
                 return False
             
-            # Create a simple text-based notification for referrer
-            subject = f"✅ Referral #{referral.id} Submitted Successfully"
-            
-            body = f"""
-            Dear {referral.referrer_first_name} {referral.referrer_last_name},
+            subject = notification_subject(EmailType.REFERRER_NOTIFICATION.value, referral)
             
-            Your NDIS referral for {referral.first_name} {referral.last_name} has been successfully submitted.
-            
-            Referral Details:
-            - Referral ID: #{referral.id}
-            - Client: {referral.first_name} {referral.last_name}
-            - Referred For: {referral.referred_for.title()}
-            - Submitted: {referral.created_at.strftime('%B %d, %Y at %I:%M %p')}
-            
-            The client will be contacted within 2 business days using their preferred contact method ({referral.preferred_contact}).
-            
-            Thank you for your referral.
-            
-            Best regards,
-            NDIS Management System
-            
-            ---
-            This is an automated notification. Please do not reply to this email.
-            """
+            # Plain-text notification for the referrer
+            message = self._render_referral_message("referrer_notification", referral)
             
             # Send email via Mailgun API
-            async with httpx.AsyncClient() as client:
-                data = {
-                    "from": f"{self.config.MAILGUN_APP_NAME} <{self.config.MAILGUN_SENDER_EMAIL}>",
-                    "to": [referral.referrer_email],
-                    "subject": subject,
-                    "text": body
-                }
-                
-                response = await client.post(
-                    self.mailgun_url,
-                    auth=self.auth,
-                    data=data
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"Mailgun API error: {response.status_code} - {response.text}")
+            data = {
+                "from": f"{self.config.MAILGUN_APP_NAME} <{self.config.MAILGUN_SENDER_EMAIL}>",
+                "to": [referral.referrer_email],
+                "subject": subject,
+                **message
+            }
+            await self._post_message(data)
             print(f"Referrer notification sent for referral #{referral.id} to {referral.referrer_email}")
             return True
             
         except Exception as e:
             print(f"Failed to send referrer notification for referral #{referral.id}: {str(e)}")
+            if raise_errors:
+                raise
             return False
 
-    async def send_all_notifications(self, referral: Referral, provider_emails: List[str] = None, db: Session = None) -> dict:
+    async def _run_notification(self, send: Awaitable[bool], slots: asyncio.Semaphore, timeout: float) -> Optional[str]:
+        """Await one notification within the concurrency limit and timeout; returns why it failed, or None if sent"""
+        async with slots:
+            try:
+                sent = await asyncio.wait_for(send, timeout)
+            except asyncio.TimeoutError:
+                return f"timed out after {timeout:g}s"
+            except Exception as e:
+                return str(e)
+        return None if sent else "send failed"
+
+    async def send_all_notifications(
+        self,
+        referral: Referral,
+        provider_emails: List[str] = None,
+        db: Session = None,
+        task_id: Optional[str] = None
+    ) -> dict:
         """
         Send all notification emails for a new referral
         
+        The notifications are sent concurrently (at most EMAIL_FANOUT_CONCURRENCY
+        at a time), each limited to EMAIL_SEND_TIMEOUT_SECONDS, so the caller waits
+        for the slowest send rather than the sum. One failing or timing out
+        doesn't affect the others.
+        
         Args:
             referral: Referral object containing all referral details
             provider_emails: List of provider email addresses (optional)
+            task_id: Celery task ID recorded on the email logs (optional)
         
         Returns:
-            dict: Status of each email type sent
+            dict: Whether each email type was sent, plus "failures" (email type ->
+            reason) and "skipped" (email types with no recipient address)
         """
         # Default provider emails if none provided
         if not provider_emails:
@@ -259,25 +397,38 @@ class EmailService:
         results = {
             "provider_notification": False,
             "participant_confirmation": False,
-            "referrer_notification": False
+            "referrer_notification": False,
+            "failures": {},
+            "skipped": []
         }
         
-        # Send all emails concurrently
-        tasks = [
-            self.send_provider_notification(referral, provider_emails, db),
-            self.send_participant_confirmation(referral, db),
-            self.send_referrer_notification(referral, db)
-        ]
+        notifications = {
+            "provider_notification": self.send_provider_notification(
+                referral, provider_emails, db, task_id=task_id
+            )
+        }
+        if participant_recipient(referral):
+            notifications["participant_confirmation"] = self.send_participant_confirmation(referral, db)
+        else:
+            results["skipped"].append("participant_confirmation")
+        if referral.referrer_email:
+            notifications["referrer_notification"] = self.send_referrer_notification(referral, db)
+        else:
+            results["skipped"].append("referrer_notification")
         
-        try:
-            task_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            results["provider_notification"] = task_results[0] if not isinstance(task_results[0], Exception) else False
-            results["participant_confirmation"] = task_results[1] if not isinstance(task_results[1], Exception) else False
-            results["referrer_notification"] = task_results[2] if not isinstance(task_results[2], Exception) else False
-            
-        except Exception as e:
-            print(f"Error sending notifications for referral #{referral.id}: {str(e)}")
+        slots = asyncio.Semaphore(settings.EMAIL_FANOUT_CONCURRENCY)
+        errors = await asyncio.gather(*(
+            self._run_notification(send, slots, settings.EMAIL_SEND_TIMEOUT_SECONDS)
+            for send in notifications.values()
+        ))
+        
+        for name, error in zip(notifications, errors):
+            results[name] = error is None
+            if error:
+                results["failures"][name] = error
+        
+        if results["failures"]:
+            print(f"Some notifications failed for referral #{referral.id}: {results['failures']}")
         
         return results
 
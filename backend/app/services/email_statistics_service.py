@@ -0,0 +1,280 @@
+# backend/app/services/email_statistics_service.py
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, insert, or_
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.models.email_log import EmailLog, EmailLogRollup, EmailLogRollupState, EmailStatus, EmailType
+
+STATUSES = [status.value for status in EmailStatus]
+EMAIL_TYPES = [email_type.value for email_type in EmailType]
+
+# Keys of the by_type section, as returned by the admin statistics endpoint
+BY_TYPE_KEYS = {
+    EmailType.PROVIDER_NOTIFICATION.value: "provider_notifications",
+    EmailType.PARTICIPANT_CONFIRMATION.value: "participant_confirmations",
+    EmailType.REFERRER_NOTIFICATION.value: "referrer_notifications"
+}
+
+GRANULARITIES = ["hour", "day"]
+STATE_ID = 1
+# Touched hours are recomputed in chunks of this many OR'ed ranges
+HOURS_PER_QUERY = 100
+
+
+def _utc(moment: datetime) -> datetime:
+    """SQLite hands back naive datetimes; everything here is UTC"""
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def _hour(moment: datetime) -> datetime:
+    return _utc(moment).replace(minute=0, second=0, microsecond=0)
+
+
+def _success_rate(sent: int, failed: int) -> Optional[float]:
+    """Share of finished emails that were sent (pending and retrying ones aren't finished)"""
+    finished = sent + failed
+    return round(sent / finished * 100, 2) if finished else None
+
+
+class EmailStatisticsService:
+    """
+    Email statistics from the email_log_rollups table.
+
+    The rollup holds counts per hour, email type and status. refresh() keeps it
+    current incrementally: only the hours containing logs created or updated
+    since the previous refresh are recomputed, so reads stay cheap however
+    large email_logs grows.
+    """
+
+    @staticmethod
+    def _hour_bucket(db: Session):
+        """SQL expression for the hour a log was created in"""
+        if db.get_bind().dialect.name == "postgresql":
+            return func.date_trunc("hour", EmailLog.created_at)
+        return func.strftime("%Y-%m-%d %H:00:00", EmailLog.created_at)
+
+    @staticmethod
+    def _as_hour(value: Any) -> datetime:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return _hour(value)
+
+    @staticmethod
+    def _lock_state(db: Session) -> EmailLogRollupState:
+        """Get the refresh state row locked, so concurrent refreshes take turns"""
+        state = db.query(EmailLogRollupState).filter(
+            EmailLogRollupState.id == STATE_ID
+        ).with_for_update().first()
+        if state is None:
+            state = EmailLogRollupState(id=STATE_ID, refreshed_at=None)
+            db.add(state)
+            db.flush()
+        return state
+
+    @staticmethod
+    def _touched_hours(db: Session, since: Optional[datetime]) -> List[datetime]:
+        """Hours holding logs created or updated since the given time (every hour when None)"""
+        bucket = EmailStatisticsService._hour_bucket(db)
+        query = db.query(bucket).distinct()
+        if since is not None:
+            query = query.filter(or_(EmailLog.updated_at >= since, EmailLog.created_at >= since))
+        return sorted({EmailStatisticsService._as_hour(value) for (value,) in query if value is not None})
+
+    @staticmethod
+    def _recompute_hours(db: Session, hours: List[datetime]) -> int:
+        """Replace the rollup rows of the given hours with fresh counts; returns rows written"""
+        bucket = EmailStatisticsService._hour_bucket(db)
+        written = 0
+        for start in range(0, len(hours), HOURS_PER_QUERY):
+            chunk = hours[start:start + HOURS_PER_QUERY]
+            ranges = [
+                and_(EmailLog.created_at >= hour, EmailLog.created_at < hour + timedelta(hours=1))
+                for hour in chunk
+            ]
+            counts = db.query(
+                bucket, EmailLog.email_type, EmailLog.status, func.count(EmailLog.id)
+            ).filter(or_(*ranges)).group_by(bucket, EmailLog.email_type, EmailLog.status).all()
+
+            db.query(EmailLogRollup).filter(
+                EmailLogRollup.bucket_start.in_(chunk)
+            ).delete(synchronize_session=False)
+            rows = [
+                {
+                    "bucket_start": EmailStatisticsService._as_hour(hour),
+                    "email_type": email_type,
+                    "status": status,
+                    "email_count": count
+                }
+                for hour, email_type, status, count in counts
+            ]
+            if rows:
+                db.execute(insert(EmailLogRollup), rows)
+            written += len(rows)
+        return written
+
+    @staticmethod
+    def refresh(db: Session, full: bool = False) -> Dict[str, Any]:
+        """
+        Bring the rollup up to date and commit
+
+        Logs changed in the EMAIL_STATS_ROLLUP_OVERLAP_SECONDS before the last
+        refresh are looked at again, to catch transactions that were still
+        open at that point.
+
+        Returns:
+            dict: Hours recomputed and rollup rows written
+        """
+        started = datetime.now(timezone.utc)
+        try:
+            state = EmailStatisticsService._lock_state(db)
+            since = None
+            if state.refreshed_at is not None and not full:
+                since = _utc(state.refreshed_at) - timedelta(seconds=settings.EMAIL_STATS_ROLLUP_OVERLAP_SECONDS)
+            if since is None:
+                db.query(EmailLogRollup).delete(synchronize_session=False)
+
+            hours = EmailStatisticsService._touched_hours(db, since)
+            written = EmailStatisticsService._recompute_hours(db, hours)
+            state.refreshed_at = started
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return {"hours_recomputed": len(hours), "rows_written": written, "full": since is None}
+
+    @staticmethod
+    def refresh_if_stale(db: Session, max_age_seconds: Optional[float] = None) -> bool:
+        """Refresh when the last refresh is older than max_age_seconds; returns whether it ran"""
+        if max_age_seconds is None:
+            max_age_seconds = settings.EMAIL_STATS_ROLLUP_MAX_AGE_SECONDS
+        refreshed_at = db.query(EmailLogRollupState.refreshed_at).filter(
+            EmailLogRollupState.id == STATE_ID
+        ).scalar()
+        if refreshed_at and datetime.now(timezone.utc) - _utc(refreshed_at) < timedelta(seconds=max_age_seconds):
+            return False
+        EmailStatisticsService.refresh(db)
+        return True
+
+    @staticmethod
+    def _summarize(counts: Iterable[Tuple[str, str, int]]) -> Dict[str, Any]:
+        """Overall and per-type figures from (email_type, status, count) rows"""
+        overall = {status: 0 for status in STATUSES}
+        by_type = {key: 0 for key in BY_TYPE_KEYS.values()}
+        by_type_status = {email_type: {status: 0 for status in STATUSES} for email_type in EMAIL_TYPES}
+        for email_type, status, count in counts:
+            count = int(count or 0)
+            overall[status] = overall.get(status, 0) + count
+            if email_type in BY_TYPE_KEYS:
+                by_type[BY_TYPE_KEYS[email_type]] += count
+            by_type_status.setdefault(email_type, {})
+            by_type_status[email_type][status] = by_type_status[email_type].get(status, 0) + count
+
+        total = sum(overall.values())
+        return {
+            "overall": {
+                "total_emails": total,
+                **overall,
+                "success_rate": round(overall["sent"] / total * 100, 2) if total else 0
+            },
+            "by_type": by_type,
+            "by_type_status": by_type_status
+        }
+
+    @staticmethod
+    def get_overview(db: Session, live: bool = False) -> Dict[str, Any]:
+        """
+        Overall and per-type email counts in one grouped query
+
+        Reads the rollup (refreshing it first if stale), or email_logs
+        directly with live=True.
+        """
+        if live:
+            counts = db.query(
+                EmailLog.email_type, EmailLog.status, func.count(EmailLog.id)
+            ).group_by(EmailLog.email_type, EmailLog.status).all()
+        else:
+            EmailStatisticsService.refresh_if_stale(db)
+            counts = db.query(
+                EmailLogRollup.email_type, EmailLogRollup.status, func.sum(EmailLogRollup.email_count)
+            ).group_by(EmailLogRollup.email_type, EmailLogRollup.status).all()
+
+        summary = EmailStatisticsService._summarize(counts)
+        summary["source"] = "live" if live else "rollup"
+        return summary
+
+    @staticmethod
+    def get_timeline(
+        db: Session,
+        granularity: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        email_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Email counts and success rate per hour or day between start and end
+
+        Buckets without emails are included (as zeros) so the series can be
+        charted directly. The trend compares the success rate of the later
+        half of the range with the earlier half.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {GRANULARITIES}")
+        step = timedelta(hours=1) if granularity == "hour" else timedelta(days=1)
+
+        end = _utc(end) if end else datetime.now(timezone.utc)
+        if start is None:
+            start = end - (timedelta(hours=24) if granularity == "hour" else timedelta(days=30))
+        start = _hour(start) if granularity == "hour" else _utc(start).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        EmailStatisticsService.refresh_if_stale(db)
+        query = db.query(
+            EmailLogRollup.bucket_start, EmailLogRollup.status, func.sum(EmailLogRollup.email_count)
+        ).filter(
+            EmailLogRollup.bucket_start >= start,
+            EmailLogRollup.bucket_start < end
+        )
+        if email_type:
+            query = query.filter(EmailLogRollup.email_type == email_type)
+        counts = query.group_by(EmailLogRollup.bucket_start, EmailLogRollup.status).all()
+
+        buckets: Dict[datetime, Dict[str, int]] = {}
+        moment = start
+        while moment < end:
+            buckets[moment] = {status: 0 for status in STATUSES}
+            moment += step
+        for bucket_start, status, count in counts:
+            bucket_start = _hour(bucket_start)
+            if granularity == "day":
+                bucket_start = bucket_start.replace(hour=0)
+            bucket = buckets.setdefault(bucket_start, {status: 0 for status in STATUSES})
+            bucket[status] = bucket.get(status, 0) + int(count or 0)
+
+        series = [
+            {
+                "bucket_start": bucket_start,
+                "total": sum(bucket.values()),
+                **bucket,
+                "success_rate": _success_rate(bucket["sent"], bucket["failed"])
+            }
+            for bucket_start, bucket in sorted(buckets.items())
+        ]
+
+        half = len(series) // 2
+        earlier, later = series[:half], series[half:]
+        earlier_rate = _success_rate(sum(b["sent"] for b in earlier), sum(b["failed"] for b in earlier))
+        later_rate = _success_rate(sum(b["sent"] for b in later), sum(b["failed"] for b in later))
+        return {
+            "granularity": granularity,
+            "start": start,
+            "end": end,
+            "email_type": email_type,
+            "buckets": series,
+            "trend": {
+                "earlier_success_rate": earlier_rate,
+                "later_success_rate": later_rate,
+                "change": round(later_rate - earlier_rate, 2)
+                if earlier_rate is not None and later_rate is not None else None
+            }
+        }
@@ -0,0 +1,159 @@
+# backend/app/services/email_templates.py
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates" / "email"
+
+# Alternative bodies of one message, by Mailgun field: "html" -> name.html, "text" -> name.txt
+MESSAGE_PARTS = {"html": ".html", "text": ".txt"}
+
+
+def default_bytecode_cache_dir() -> str:
+    return settings.EMAIL_TEMPLATE_CACHE_DIR or os.path.join(tempfile.gettempdir(), "ndis-email-templates")
+
+
+class EmailTemplates:
+    """
+    Compiled email templates with a cache of rendered messages.
+
+    Every template is compiled once by precompile() (at startup) and kept for
+    the life of the process; the compiled bytecode is also stored on disk so
+    the next process skips Jinja's parse/compile step. Files aren't re-checked
+    for changes, so template edits need a restart.
+
+    A message is a base name with an HTML and/or plain-text body
+    (provider_notification.html + provider_notification.txt). render_message()
+    caches the rendered bodies under a caller-supplied key, so a referral's
+    context is rendered once and reused for every recipient and send.
+    """
+
+    def __init__(
+        self,
+        template_dir: Path = TEMPLATE_DIR,
+        bytecode_cache_dir: Optional[str] = None,
+        max_rendered: int = 512,
+        rendered_ttl_seconds: float = 600
+    ):
+        self.template_dir = Path(template_dir)
+        self.env = Environment(
+            loader=FileSystemLoader(str(self.template_dir)),
+            # Plain-text bodies must not be HTML-escaped
+            autoescape=select_autoescape(["html"], default_for_string=False),
+            bytecode_cache=self._bytecode_cache(bytecode_cache_dir),
+            auto_reload=False,
+            cache_size=-1
+        )
+        self._templates: Dict[str, Template] = {}
+        self._precompiled = False
+        self._lock = threading.Lock()
+        self.rendered = TTLCache("email_templates", max_rendered, rendered_ttl_seconds)
+
+    @staticmethod
+    def _bytecode_cache(directory: Optional[str]) -> Optional[FileSystemBytecodeCache]:
+        if not directory:
+            return None
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            log.warning("Email template bytecode cache disabled (%s): %s", directory, e)
+            return None
+        return FileSystemBytecodeCache(directory)
+
+    def precompile(self) -> int:
+        """Compile every template in the directory; returns how many were compiled"""
+        started = time.perf_counter()
+        names = self.env.list_templates()
+        for name in names:
+            self.get(name)
+        self._precompiled = True
+        log.info("Compiled %d email templates in %.1fms", len(names), (time.perf_counter() - started) * 1000)
+        return len(names)
+
+    def get(self, name: str) -> Template:
+        """Compiled template by file name"""
+        template = self._templates.get(name)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(name)
+                if template is None:
+                    template = self.env.get_template(name)
+                    self._templates[name] = template
+        return template
+
+    def exists(self, name: str) -> bool:
+        if self._precompiled or name in self._templates:
+            return name in self._templates
+        return (self.template_dir / name).is_file()
+
+    def render(self, name: str, context: Dict[str, Any]) -> str:
+        """Render one template file"""
+        return self.get(name).render(context)
+
+    def render_message(
+        self,
+        base_name: str,
+        context: Dict[str, Any],
+        cache_key: Optional[Hashable] = None,
+        tags: tuple = ()
+    ) -> Dict[str, str]:
+        """
+        Render the bodies of a message as Mailgun fields ({"html": ..., "text": ...})
+
+        Only the parts with a template file are included. With a cache_key the
+        result is cached; the key must cover everything in context that affects
+        the output.
+        """
+        if cache_key is not None:
+            found, message = self.rendered.get((base_name, cache_key))
+            if found:
+                return message
+
+        message = {
+            field: self.render(base_name + suffix, context)
+            for field, suffix in MESSAGE_PARTS.items()
+            if self.exists(base_name + suffix)
+        }
+        if not message:
+            raise LookupError(f"No email templates found for {base_name}")
+
+        if cache_key is not None:
+            self.rendered.set((base_name, cache_key), message, tags)
+        return message
+
+    def invalidate_referral(self, referral_id: int):
+        """Drop cached messages rendered for a referral"""
+        self.rendered.invalidate_tags([referral_tag(referral_id)])
+
+
+def build_email_templates() -> EmailTemplates:
+    """Templates configured from settings, compiled and ready to render"""
+    templates = EmailTemplates(
+        bytecode_cache_dir=default_bytecode_cache_dir(),
+        max_rendered=settings.EMAIL_RENDER_CACHE_MAX_ENTRIES,
+        rendered_ttl_seconds=settings.EMAIL_RENDER_CACHE_TTL_SECONDS
+    )
+    templates.precompile()
+    return templates
+
+
+def referral_tag(referral_id: int) -> str:
+    return f"referral:{referral_id}"
+
+
+def referral_cache_key(referral) -> Optional[Hashable]:
+    """Key for messages rendered from a referral; changes whenever the referral is updated"""
+    if referral.id is None:
+        return None
+    return ("referral", referral.id, referral.updated_at or referral.created_at)
@@ -1,13 +1,17 @@
 # backend/app/services/provider_admin_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func, case
+from sqlalchemy import and_, or_, desc, func, case, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
 
+from app.core.database import run_in_session
 from app.models.user import User, UserRole, ServiceType
 from app.models.referral import Referral
 from app.schemas.provider import ProviderReferralResponse, ReferralStatus
 from app.services.provider_service import ProviderService
+from app.services.provider_metrics_service import ProviderMetricsService
+from app.utils.pagination import newest_first, paginate_newest_first
 
 class ProviderAdminService:
     
@@ -29,35 +33,21 @@ class ProviderAdminService:
         
         providers = query.all()
         
+        # One grouped query for every provider's referral statistics
+        provider_stats = ProviderAdminService._get_referral_stats_by_provider(
+            db, [provider.id for provider in providers]
+        )
+        
         result = []
         for provider in providers:
-            # Get provider statistics
-            total_referrals = db.query(Referral).filter(
-                Referral.assigned_provider_id == provider.id
-            ).count()
-            
-            active_referrals = db.query(Referral).filter(
-                and_(
-                    Referral.assigned_provider_id == provider.id,
-                    Referral.status.in_(["accepted", "in_progress"])
-                )
-            ).count()
-            
-            completed_referrals = db.query(Referral).filter(
-                and_(
-                    Referral.assigned_provider_id == provider.id,
-                    Referral.status == "completed"
-                )
-            ).count()
+            stats = provider_stats.get(provider.id, {})
+            total_referrals = stats.get("total_referrals", 0)
+            active_referrals = stats.get("active_referrals", 0)
+            completed_referrals = stats.get("completed_referrals", 0)
             
             # Calculate completion rate
             completion_rate = (completed_referrals / total_referrals * 100) if total_referrals > 0 else 0
             
-            # Get latest activity
-            latest_activity = db.query(Referral).filter(
-                Referral.assigned_provider_id == provider.id
-            ).order_by(desc(Referral.updated_at)).first()
-            
             result.append({
                 "id": provider.id,
                 "first_name": provider.first_name,
@@ -76,11 +66,41 @@ class ProviderAdminService:
                     "completed_referrals": completed_referrals,
                     "completion_rate": round(completion_rate, 2)
                 },
-                "latest_activity": latest_activity.updated_at if latest_activity else None
+                "latest_activity": stats.get("latest_activity")
             })
         
         return result
     
+    @staticmethod
+    def _get_referral_stats_by_provider(db: Session, provider_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get referral counts and latest activity for many providers in a single GROUP BY query"""
+        if not provider_ids:
+            return {}
+        
+        rows = db.query(
+            Referral.assigned_provider_id,
+            func.count(Referral.id).label("total_referrals"),
+            func.sum(
+                case((Referral.status.in_(["accepted", "in_progress"]), 1), else_=0)
+            ).label("active_referrals"),
+            func.sum(
+                case((Referral.status == "completed", 1), else_=0)
+            ).label("completed_referrals"),
+            func.max(Referral.updated_at).label("latest_activity")
+        ).filter(
+            Referral.assigned_provider_id.in_(provider_ids)
+        ).group_by(Referral.assigned_provider_id).all()
+        
+        return {
+            row.assigned_provider_id: {
+                "total_referrals": row.total_referrals,
+                "active_referrals": int(row.active_referrals or 0),
+                "completed_referrals": int(row.completed_referrals or 0),
+                "latest_activity": row.latest_activity
+            }
+            for row in rows
+        }
+    
     @staticmethod
     def get_provider_dashboard_admin(db: Session, provider_id: int) -> Optional[Dict[str, Any]]:
         """Get provider dashboard data for admin oversight"""
@@ -159,9 +179,10 @@ class ProviderAdminService:
         service_type: Optional[str] = None,
         priority: Optional[str] = None,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        cursor: Optional[str] = None
     ) -> List[ProviderReferralResponse]:
-        """Get all unassigned referrals for assignment"""
+        """Get all unassigned referrals for assignment (cursor takes precedence over skip)"""
         
         query = db.query(Referral).filter(
             or_(
@@ -176,7 +197,7 @@ class ProviderAdminService:
         if priority:
             query = query.filter(Referral.priority == priority)
         
-        referrals = query.order_by(desc(Referral.created_at)).offset(skip).limit(limit).all()
+        referrals = paginate_newest_first(query, Referral.created_at, Referral.id, skip, limit, cursor)
         
         return [ProviderService._referral_to_response(referral) for referral in referrals]
     
@@ -214,6 +235,8 @@ class ProviderAdminService:
                 return False
         
         # Assign referral
+        old_status = referral.status
+        old_provider_id = referral.assigned_provider_id
         referral.assigned_provider_id = provider_id
         referral.status = "assigned"
         referral.priority = priority
@@ -224,6 +247,7 @@ class ProviderAdminService:
         # TODO: Create notification for provider
         # TODO: Log assignment activity
         
+        ProviderMetricsService.record_transition(db, referral, old_status, old_provider_id)
         db.commit()
         return True
     
@@ -291,7 +315,10 @@ class ProviderAdminService:
             if referral.assigned_provider_id:
                 provider = db.query(User).filter(User.id == referral.assigned_provider_id).first()
             
-            days_since = (datetime.utcnow() - (referral.accepted_at or referral.created_at)).days
+            since = referral.accepted_at or referral.created_at
+            # Timestamps are timezone-aware on PostgreSQL and naive on SQLite
+            now = datetime.now(since.tzinfo) if since.tzinfo else datetime.utcnow()
+            days_since = (now - since).days
             
             result.append({
                 "referral_id": referral.id,
@@ -334,27 +361,22 @@ class ProviderAdminService:
         # Get performance metrics
         performance = ProviderService.get_performance_metrics(db, provider_id)
         
-        # Add detailed breakdown
-        referrals_in_period = db.query(Referral).filter(
-            and_(
-                Referral.assigned_provider_id == provider_id,
-                func.date(Referral.created_at) >= start_date,
-                func.date(Referral.created_at) <= end_date
-            )
-        ).all()
+        # Detailed breakdown from the precomputed daily rollup rows
+        daily_rows = ProviderMetricsService.get_daily_rows(db, [provider_id], start_date, end_date)
         
-        # Calculate detailed metrics
-        response_times = []
-        completion_times = []
+        referrals_in_period = sum(row.total_referrals_received or 0 for row in daily_rows)
         
-        for referral in referrals_in_period:
-            if referral.accepted_at:
-                response_time = (referral.accepted_at - referral.created_at).total_seconds() / 3600
-                response_times.append(response_time)
-            
-            if referral.status == "completed" and referral.accepted_at:
-                completion_time = (referral.updated_at - referral.accepted_at).days
-                completion_times.append(completion_time)
+        # (daily average, sample count) pairs
+        response_times = [
+            (row.average_response_time_hours, row.referrals_accepted or 0)
+            for row in daily_rows
+            if row.average_response_time_hours is not None and row.referrals_accepted
+        ]
+        completion_times = [
+            (row.average_completion_time_days, row.referrals_completed or 0)
+            for row in daily_rows
+            if row.average_completion_time_days is not None and row.referrals_completed
+        ]
         
         detailed_performance = {
             "provider_info": {
@@ -369,15 +391,36 @@ class ProviderAdminService:
             },
             "performance": performance,
             "detailed_metrics": {
-                "average_response_time_hours": sum(response_times) / len(response_times) if response_times else 0,
-                "median_response_time_hours": sorted(response_times)[len(response_times)//2] if response_times else 0,
-                "average_completion_time_days": sum(completion_times) / len(completion_times) if completion_times else 0,
-                "referrals_in_period": len(referrals_in_period)
+                "average_response_time_hours": ProviderAdminService._weighted_average(response_times),
+                "median_response_time_hours": ProviderAdminService._weighted_median(response_times),
+                "average_completion_time_days": ProviderAdminService._weighted_average(completion_times),
+                "referrals_in_period": referrals_in_period
             }
         }
         
         return detailed_performance
     
+    @staticmethod
+    def _weighted_average(samples: List[tuple]) -> float:
+        """Average of (value, count) pairs weighted by count"""
+        total = sum(count for _, count in samples)
+        if not total:
+            return 0
+        return sum(value * count for value, count in samples) / total
+    
+    @staticmethod
+    def _weighted_median(samples: List[tuple]) -> float:
+        """Median of (value, count) pairs, i.e. of the daily averages repeated by their sample count"""
+        total = sum(count for _, count in samples)
+        if not total:
+            return 0
+        seen = 0
+        for value, count in sorted(samples):
+            seen += count
+            if seen > total // 2:
+                return value
+        return 0
+    
     @staticmethod
     def get_workload_analytics(db: Session) -> Dict[str, Any]:
         """Get workload distribution analytics across all providers"""
@@ -386,20 +429,18 @@ class ProviderAdminService:
             and_(User.role == UserRole.PROVIDER, User.is_active == True)
         ).all()
         
+        # Current caseload snapshot for every provider in one query
+        current_stats = ProviderMetricsService.get_current_stats(
+            db, [provider.id for provider in providers]
+        )
+        
         workload_data = []
         total_active_referrals = 0
         
         for provider in providers:
-            active_referrals = db.query(Referral).filter(
-                and_(
-                    Referral.assigned_provider_id == provider.id,
-                    Referral.status.in_(["accepted", "in_progress"])
-                )
-            ).count()
-            
-            total_referrals = db.query(Referral).filter(
-                Referral.assigned_provider_id == provider.id
-            ).count()
+            stats = current_stats.get(provider.id, {})
+            active_referrals = stats.get("active_referrals", 0)
+            total_referrals = stats.get("total_referrals", 0)
             
             workload_data.append({
                 "provider_id": provider.id,
@@ -467,23 +508,27 @@ class ProviderAdminService:
             )
         ).count()
         
+        # Per-provider counts in one grouped query: referrals created in the
+        # period, and referrals completed (last updated) in it
+        period_totals = {
+            row.assigned_provider_id: {"received": int(row.received or 0), "completed": int(row.completed or 0)}
+            for row in db.query(
+                Referral.assigned_provider_id,
+                func.sum(case((Referral.created_at >= cutoff_date, 1), else_=0)).label("received"),
+                func.sum(
+                    case((and_(Referral.updated_at >= cutoff_date, Referral.status == "completed"), 1), else_=0)
+                ).label("completed")
+            ).filter(
+                Referral.assigned_provider_id.in_([provider.id for provider in providers])
+            ).group_by(Referral.assigned_provider_id)
+        }
+        
         # Provider performance rankings
         provider_performance = []
         for provider in providers:
-            provider_referrals = db.query(Referral).filter(
-                and_(
-                    Referral.assigned_provider_id == provider.id,
-                    Referral.created_at >= cutoff_date
-                )
-            ).count()
-            
-            provider_completed = db.query(Referral).filter(
-                and_(
-                    Referral.assigned_provider_id == provider.id,
-                    Referral.updated_at >= cutoff_date,
-                    Referral.status == "completed"
-                )
-            ).count()
+            totals = period_totals.get(provider.id, {"received": 0, "completed": 0})
+            provider_referrals = totals["received"]
+            provider_completed = totals["completed"]
             
             completion_rate = (provider_completed / provider_referrals * 100) if provider_referrals > 0 else 0
             
@@ -557,6 +602,7 @@ class ProviderAdminService:
         if reassign_referrals and active_referrals:
             # Find suitable providers for reassignment
             for referral in active_referrals:
+                old_status = referral.status
                 suitable_providers = db.query(User).filter(
                     and_(
                         User.role == UserRole.PROVIDER,
@@ -584,6 +630,8 @@ class ProviderAdminService:
                     referral.notes = f"Unassigned due to provider deactivation: {reason}"
                     referral.updated_at = datetime.utcnow()
                     unassigned_count += 1
+                
+                ProviderMetricsService.record_transition(db, referral, old_status, provider_id)
         
         # Deactivate provider
         provider.is_active = False
@@ -602,6 +650,21 @@ class ProviderAdminService:
             "unassigned": unassigned_count
         }
     
+    @staticmethod
+    def _created_between(start_date: Optional[date], end_date: Optional[date]) -> list:
+        """
+        Filters for referrals created on start_date through end_date (inclusive).
+
+        Compares created_at against day boundaries instead of func.date(created_at),
+        so the created_at indexes can serve the range.
+        """
+        conditions = []
+        if start_date:
+            conditions.append(Referral.created_at >= datetime.combine(start_date, time.min))
+        if end_date:
+            conditions.append(Referral.created_at < datetime.combine(end_date + timedelta(days=1), time.min))
+        return conditions
+    
     @staticmethod
     def get_provider_referrals_admin(
         db: Session,
@@ -610,22 +673,19 @@ class ProviderAdminService:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        cursor: Optional[str] = None
     ) -> List[ProviderReferralResponse]:
-        """Get all referrals for a specific provider (admin view)"""
+        """Get all referrals for a specific provider (admin view, cursor takes precedence over skip)"""
         
         query = db.query(Referral).filter(Referral.assigned_provider_id == provider_id)
         
         if status_filter:
             query = query.filter(Referral.status == status_filter)
         
-        if start_date:
-            query = query.filter(func.date(Referral.created_at) >= start_date)
-        
-        if end_date:
-            query = query.filter(func.date(Referral.created_at) <= end_date)
+        query = query.filter(*ProviderAdminService._created_between(start_date, end_date))
         
-        referrals = query.order_by(desc(Referral.created_at)).offset(skip).limit(limit).all()
+        referrals = paginate_newest_first(query, Referral.created_at, Referral.id, skip, limit, cursor)
         
         return [ProviderService._referral_to_response(referral) for referral in referrals]
     
@@ -891,8 +951,7 @@ class ProviderAdminService:
             referrals = db.query(Referral).filter(
                 and_(
                     Referral.assigned_provider_id == provider_id,
-                    func.date(Referral.created_at) >= start_date,
-                    func.date(Referral.created_at) <= end_date
+                    *ProviderAdminService._created_between(start_date, end_date)
                 )
             ).all()
             
@@ -942,8 +1001,7 @@ class ProviderAdminService:
         referrals = db.query(Referral).filter(
             and_(
                 Referral.assigned_provider_id == provider_id,
-                func.date(Referral.created_at) >= start_date,
-                func.date(Referral.created_at) <= end_date
+                *ProviderAdminService._created_between(start_date, end_date)
             )
         ).order_by(desc(Referral.updated_at)).limit(limit).all()
         
@@ -1039,4 +1097,85 @@ class ProviderAdminService:
                 } for r in recent_referrals
             ],
             "alerts": ProviderAdminService.get_provider_alerts(db, "high")[:3]  # Top 3 high priority alerts
-        }
\ No newline at end of file
+        }
+
+
+class AsyncProviderAdminService:
+    """
+    ProviderAdminService for async routes (AsyncSession).
+
+    The referral listings admins page through are ported to select()
+    statements; the analytics, reports and assignment workflows run the sync
+    implementation through run_in_session, so their queries are still awaited
+    on the async driver rather than blocking the event loop.
+    """
+
+    @staticmethod
+    async def get_unassigned_referrals(
+        db: AsyncSession,
+        service_type: Optional[str] = None,
+        priority: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> List[ProviderReferralResponse]:
+        """Get all unassigned referrals for assignment (cursor takes precedence over skip)"""
+        statement = select(Referral).where(
+            or_(
+                Referral.assigned_provider_id.is_(None),
+                Referral.status == "declined"
+            )
+        )
+        if service_type:
+            statement = statement.where(Referral.referred_for == service_type)
+        if priority:
+            statement = statement.where(Referral.priority == priority)
+
+        referrals = (await db.scalars(
+            newest_first(statement, Referral.created_at, Referral.id, skip, limit, cursor)
+        )).all()
+        return [ProviderService._referral_to_response(referral) for referral in referrals]
+
+    @staticmethod
+    async def get_provider_referrals_admin(
+        db: AsyncSession,
+        provider_id: int,
+        status_filter: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> List[ProviderReferralResponse]:
+        """Get all referrals for a specific provider (admin view, cursor takes precedence over skip)"""
+        statement = select(Referral).where(
+            Referral.assigned_provider_id == provider_id,
+            *ProviderAdminService._created_between(start_date, end_date)
+        )
+        if status_filter:
+            statement = statement.where(Referral.status == status_filter)
+
+        referrals = (await db.scalars(
+            newest_first(statement, Referral.created_at, Referral.id, skip, limit, cursor)
+        )).all()
+        return [ProviderService._referral_to_response(referral) for referral in referrals]
+
+    get_all_providers = run_in_session(ProviderAdminService.get_all_providers)
+    get_provider_dashboard_admin = run_in_session(ProviderAdminService.get_provider_dashboard_admin)
+    assign_referral_to_provider = run_in_session(ProviderAdminService.assign_referral_to_provider)
+    reassign_referral = run_in_session(ProviderAdminService.reassign_referral)
+    get_overdue_referrals = run_in_session(ProviderAdminService.get_overdue_referrals)
+    get_provider_performance_detailed = run_in_session(ProviderAdminService.get_provider_performance_detailed)
+    get_workload_analytics = run_in_session(ProviderAdminService.get_workload_analytics)
+    get_performance_summary = run_in_session(ProviderAdminService.get_performance_summary)
+    update_provider_status = run_in_session(ProviderAdminService.update_provider_status)
+    deactivate_provider = run_in_session(ProviderAdminService.deactivate_provider)
+    bulk_assign_referrals = run_in_session(ProviderAdminService.bulk_assign_referrals)
+    get_provider_capacity = run_in_session(ProviderAdminService.get_provider_capacity)
+    get_assignment_suggestions = run_in_session(ProviderAdminService.get_assignment_suggestions)
+    get_provider_alerts = run_in_session(ProviderAdminService.get_provider_alerts)
+    send_notification_to_provider = run_in_session(ProviderAdminService.send_notification_to_provider)
+    generate_provider_summary_report = run_in_session(ProviderAdminService.generate_provider_summary_report)
+    get_provider_timeline = run_in_session(ProviderAdminService.get_provider_timeline)
+    create_performance_review = run_in_session(ProviderAdminService.create_performance_review)
+    get_admin_dashboard_summary = run_in_session(ProviderAdminService.get_admin_dashboard_summary)
@@ -0,0 +1,354 @@
+# backend/app/services/provider_metrics_service.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Dict, Any
+from datetime import datetime, date, timedelta, timezone
+
+from app.models.referral import Referral
+from app.models.provider_models import ProviderPerformanceMetric
+
+# Period rows count the referrals received (created) in the period that the
+# provider now holds, and the accepted/completed/declined events that happened
+# inside the period. The "current" row is a running snapshot of the provider's
+# caseload and is moved up and down as referrals change state.
+PERIOD_TYPES = ["daily", "weekly", "monthly"]
+CURRENT_PERIOD = "current"
+CURRENT_METRIC_DATE = datetime(1970, 1, 1)
+
+ACTIVE_STATUSES = ["accepted", "in_progress"]
+
+
+def _utc(moment: datetime) -> datetime:
+    """Naive UTC datetime (the rollup's dates); naive values are already UTC"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class ProviderMetricsService:
+    """Incrementally maintained provider statistics (provider_performance_metrics)"""
+
+    @staticmethod
+    def _period_start(period_type: str, moment: datetime) -> datetime:
+        """Get the start of the daily/weekly/monthly period containing moment"""
+        day = datetime(moment.year, moment.month, moment.day)
+        if period_type == "weekly":
+            return day - timedelta(days=day.weekday())
+        if period_type == "monthly":
+            return day.replace(day=1)
+        return day
+
+    @staticmethod
+    def _get_or_create_row(
+        db: Session,
+        provider_id: int,
+        period_type: str,
+        metric_date: datetime
+    ) -> ProviderPerformanceMetric:
+        """Get the metric row for a provider period, creating it if needed"""
+        row = db.query(ProviderPerformanceMetric).filter(
+            ProviderPerformanceMetric.provider_id == provider_id,
+            ProviderPerformanceMetric.period_type == period_type,
+            ProviderPerformanceMetric.metric_date == metric_date
+        ).first()
+        if row:
+            return row
+
+        row = ProviderPerformanceMetric(
+            provider_id=provider_id,
+            period_type=period_type,
+            metric_date=metric_date,
+            total_referrals_received=0,
+            referrals_accepted=0,
+            referrals_active=0,
+            referrals_completed=0,
+            referrals_declined=0
+        )
+        try:
+            # Savepoint so a concurrent insert of the same period does not
+            # abort the caller's referral update
+            with db.begin_nested():
+                db.add(row)
+        except IntegrityError:
+            row = db.query(ProviderPerformanceMetric).filter(
+                ProviderPerformanceMetric.provider_id == provider_id,
+                ProviderPerformanceMetric.period_type == period_type,
+                ProviderPerformanceMetric.metric_date == metric_date
+            ).one()
+        return row
+
+    @staticmethod
+    def _apply_counts(row: ProviderPerformanceMetric, deltas: Dict[str, int]):
+        """
+        Apply counter deltas as SQL expressions so concurrent updates don't overwrite each other
+
+        Sessions don't autoflush, so callers flush before looking the same row
+        up again; otherwise the next delta replaces this one instead of adding.
+        """
+        for field, delta in deltas.items():
+            if delta:
+                column = getattr(ProviderPerformanceMetric, field)
+                setattr(row, field, func.coalesce(column, 0) + delta)
+
+    @staticmethod
+    def _apply_average(row: ProviderPerformanceMetric, avg_field: str, count_field: str, value: float):
+        """Fold one sample into a running average whose sample count is count_field (before increment)"""
+        avg_column = getattr(ProviderPerformanceMetric, avg_field)
+        count_column = getattr(ProviderPerformanceMetric, count_field)
+        setattr(
+            row,
+            avg_field,
+            (func.coalesce(avg_column, 0) * func.coalesce(count_column, 0) + value)
+            / (func.coalesce(count_column, 0) + 1)
+        )
+
+    @staticmethod
+    def _state_counts(status: Optional[str]) -> Dict[str, int]:
+        """Contribution of one assigned referral in the given status to the current snapshot"""
+        return {
+            "total_referrals_received": 1,
+            "referrals_accepted": 1 if status == "accepted" else 0,
+            "referrals_active": 1 if status in ACTIVE_STATUSES else 0,
+            "referrals_completed": 1 if status == "completed" else 0,
+            "referrals_declined": 1 if status == "declined" else 0
+        }
+
+    @staticmethod
+    def _move_received(db: Session, referral: Referral, provider_id: int, delta: int):
+        """Add or take away a referral in the "received" count of its creation periods"""
+        received_at = _utc(referral.created_at) if referral.created_at else datetime.utcnow()
+        for period_type in PERIOD_TYPES:
+            row = ProviderMetricsService._get_or_create_row(
+                db, provider_id, period_type,
+                ProviderMetricsService._period_start(period_type, received_at)
+            )
+            ProviderMetricsService._apply_counts(row, {"total_referrals_received": delta})
+            db.flush()
+
+    @staticmethod
+    def record_transition(
+        db: Session,
+        referral: Referral,
+        old_status: Optional[str],
+        old_provider_id: Optional[int],
+        now: Optional[datetime] = None
+    ):
+        """
+        Update provider metric rows for a referral that changed provider and/or status.
+
+        Call after the referral has been modified and before the caller commits,
+        so the referral change and its rollup land in the same transaction.
+        """
+        now = now or datetime.utcnow()
+        new_status = referral.status
+        new_provider_id = referral.assigned_provider_id
+
+        if old_status == new_status and old_provider_id == new_provider_id:
+            return
+
+        # Current snapshot: move the referral out of its old bucket and into its new one
+        snapshot_deltas: Dict[int, Dict[str, int]] = {}
+        if old_provider_id:
+            snapshot_deltas[old_provider_id] = {
+                field: -value
+                for field, value in ProviderMetricsService._state_counts(old_status).items()
+            }
+        if new_provider_id:
+            deltas = snapshot_deltas.setdefault(new_provider_id, {})
+            for field, value in ProviderMetricsService._state_counts(new_status).items():
+                deltas[field] = deltas.get(field, 0) + value
+
+        for provider_id, deltas in snapshot_deltas.items():
+            row = ProviderMetricsService._get_or_create_row(
+                db, provider_id, CURRENT_PERIOD, CURRENT_METRIC_DATE
+            )
+            ProviderMetricsService._apply_counts(row, deltas)
+            db.flush()
+
+        # "received" follows the referral to its new provider, in the periods it was created in
+        if new_provider_id != old_provider_id:
+            if old_provider_id:
+                ProviderMetricsService._move_received(db, referral, old_provider_id, -1)
+            if new_provider_id:
+                ProviderMetricsService._move_received(db, referral, new_provider_id, 1)
+
+        if not new_provider_id:
+            return
+
+        # Period events, attributed to the provider now holding the referral
+        events = {
+            "referrals_accepted": 1 if new_status == "accepted" and old_status != "accepted" else 0,
+            "referrals_completed": 1 if new_status == "completed" and old_status != "completed" else 0,
+            "referrals_declined": 1 if new_status == "declined" and old_status != "declined" else 0
+        }
+        if not any(events.values()):
+            return
+
+        response_hours = None
+        if events["referrals_accepted"] and referral.created_at:
+            response_hours = (now - _utc(referral.created_at)).total_seconds() / 3600
+
+        completion_days = None
+        if events["referrals_completed"] and referral.accepted_at:
+            completion_days = (now - _utc(referral.accepted_at)).days
+
+        for period_type in PERIOD_TYPES:
+            row = ProviderMetricsService._get_or_create_row(
+                db, new_provider_id, period_type,
+                ProviderMetricsService._period_start(period_type, now)
+            )
+            # Averages read the pre-increment counts, so set them first
+            if response_hours is not None:
+                ProviderMetricsService._apply_average(
+                    row, "average_response_time_hours", "referrals_accepted", response_hours
+                )
+            if completion_days is not None:
+                ProviderMetricsService._apply_average(
+                    row, "average_completion_time_days", "referrals_completed", completion_days
+                )
+            ProviderMetricsService._apply_counts(row, events)
+            db.flush()
+
+    @staticmethod
+    def record_removal(db: Session, referral: Referral):
+        """
+        Take a referral that is being deleted out of its provider's current
+        snapshot and "received" counts
+
+        Call before deleting it, in the same transaction. The accepted,
+        completed and declined events that already happened are kept.
+        """
+        if not referral.assigned_provider_id:
+            return
+        row = ProviderMetricsService._get_or_create_row(
+            db, referral.assigned_provider_id, CURRENT_PERIOD, CURRENT_METRIC_DATE
+        )
+        ProviderMetricsService._apply_counts(row, {
+            field: -value
+            for field, value in ProviderMetricsService._state_counts(referral.status).items()
+        })
+        db.flush()
+        ProviderMetricsService._move_received(db, referral, referral.assigned_provider_id, -1)
+
+    @staticmethod
+    def rebuild(db: Session, provider_ids: Optional[List[int]] = None) -> int:
+        """
+        Recompute all metric rows from the referrals table.
+
+        Used to backfill the rollup for existing data, with the same rules as
+        record_transition.
+
+        Returns:
+            int: Number of referrals scanned
+        """
+        query = db.query(Referral).filter(Referral.assigned_provider_id.isnot(None))
+        metric_query = db.query(ProviderPerformanceMetric)
+        if provider_ids:
+            query = query.filter(Referral.assigned_provider_id.in_(provider_ids))
+            metric_query = metric_query.filter(ProviderPerformanceMetric.provider_id.in_(provider_ids))
+        metric_query.delete(synchronize_session=False)
+
+        rows: Dict[tuple, Dict[str, Any]] = {}
+
+        def bucket(provider_id: int, period_type: str, metric_date: datetime) -> Dict[str, Any]:
+            key = (provider_id, period_type, metric_date)
+            if key not in rows:
+                rows[key] = {
+                    "total_referrals_received": 0,
+                    "referrals_accepted": 0,
+                    "referrals_active": 0,
+                    "referrals_completed": 0,
+                    "referrals_declined": 0,
+                    "response_hours": [],
+                    "completion_days": []
+                }
+            return rows[key]
+
+        referrals = query.all()
+        for referral in referrals:
+            provider_id = referral.assigned_provider_id
+
+            current = bucket(provider_id, CURRENT_PERIOD, CURRENT_METRIC_DATE)
+            for field, value in ProviderMetricsService._state_counts(referral.status).items():
+                current[field] += value
+
+            created_at = _utc(referral.created_at) if referral.created_at else None
+            accepted_at = _utc(referral.accepted_at) if referral.accepted_at else None
+            updated_at = _utc(referral.updated_at) if referral.updated_at else created_at
+
+            for period_type in PERIOD_TYPES:
+                if created_at:
+                    bucket(provider_id, period_type, ProviderMetricsService._period_start(period_type, created_at))[
+                        "total_referrals_received"] += 1
+                if accepted_at:
+                    row = bucket(provider_id, period_type, ProviderMetricsService._period_start(period_type, accepted_at))
+                    row["referrals_accepted"] += 1
+                    if created_at:
+                        row["response_hours"].append((accepted_at - created_at).total_seconds() / 3600)
+                if referral.status in ("completed", "declined") and updated_at:
+                    row = bucket(provider_id, period_type, ProviderMetricsService._period_start(period_type, updated_at))
+                    if referral.status == "completed":
+                        row["referrals_completed"] += 1
+                        if accepted_at:
+                            row["completion_days"].append((updated_at - accepted_at).days)
+                    else:
+                        row["referrals_declined"] += 1
+
+        for (provider_id, period_type, metric_date), values in rows.items():
+            response_hours = values.pop("response_hours")
+            completion_days = values.pop("completion_days")
+            db.add(ProviderPerformanceMetric(
+                provider_id=provider_id,
+                period_type=period_type,
+                metric_date=metric_date,
+                average_response_time_hours=sum(response_hours) / len(response_hours) if response_hours else None,
+                average_completion_time_days=sum(completion_days) / len(completion_days) if completion_days else None,
+                **values
+            ))
+
+        db.commit()
+        return len(referrals)
+
+    @staticmethod
+    def get_current_stats(db: Session, provider_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """Get the current caseload snapshot for many providers in one query"""
+        if not provider_ids:
+            return {}
+
+        rows = db.query(ProviderPerformanceMetric).filter(
+            ProviderPerformanceMetric.provider_id.in_(provider_ids),
+            ProviderPerformanceMetric.period_type == CURRENT_PERIOD
+        ).all()
+
+        return {
+            row.provider_id: {
+                "total_referrals": row.total_referrals_received or 0,
+                "accepted_referrals": row.referrals_accepted or 0,
+                "active_referrals": row.referrals_active or 0,
+                "completed_referrals": row.referrals_completed or 0,
+                "declined_referrals": row.referrals_declined or 0
+            }
+            for row in rows
+        }
+
+    @staticmethod
+    def get_daily_rows(
+        db: Session,
+        provider_ids: Optional[List[int]],
+        start_date: date,
+        end_date: Optional[date] = None
+    ) -> List[ProviderPerformanceMetric]:
+        """Get daily metric rows between two dates (inclusive)"""
+        query = db.query(ProviderPerformanceMetric).filter(
+            ProviderPerformanceMetric.period_type == "daily",
+            ProviderPerformanceMetric.metric_date >= datetime.combine(start_date, datetime.min.time())
+        )
+        if end_date:
+            query = query.filter(
+                ProviderPerformanceMetric.metric_date < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+            )
+        if provider_ids is not None:
+            query = query.filter(ProviderPerformanceMetric.provider_id.in_(provider_ids))
+
+        return query.all()
@@ -1,11 +1,15 @@
 # backend/app/services/provider_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
+from sqlalchemy import and_, desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta, date, time
 
+from app.core.database import run_in_session
 from app.models.user import User, UserRole
 from app.models.referral import Referral
+from app.services.provider_metrics_service import ProviderMetricsService
+from app.utils.pagination import newest_first, paginate_newest_first
 from app.schemas.provider import (
     ProviderDashboardResponse, 
     ProviderReferralResponse, 
@@ -90,9 +94,10 @@ class ProviderService:
         status_filter: Optional[str] = None,
         service_type: Optional[str] = None,
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[ProviderReferralResponse]:
-        """Get referrals assigned to provider with filtering"""
+        """Get referrals assigned to provider with filtering (cursor takes precedence over skip)"""
         
         query = db.query(Referral).filter(
             Referral.assigned_provider_id == provider_id
@@ -104,7 +109,7 @@ class ProviderService:
         if service_type:
             query = query.filter(Referral.referred_for == service_type)
         
-        referrals = query.order_by(desc(Referral.created_at)).offset(skip).limit(limit).all()
+        referrals = paginate_newest_first(query, Referral.created_at, Referral.id, skip, limit, cursor)
         
         return [ProviderService._referral_to_response(referral) for referral in referrals]
     
@@ -158,6 +163,7 @@ class ProviderService:
         if not referral:
             return False
         
+        old_status = referral.status
         referral.status = status_update.status.value
         if status_update.notes:
             referral.notes = status_update.notes
@@ -166,6 +172,7 @@ class ProviderService:
         if status_update.status.value == "accepted":
             referral.accepted_at = datetime.utcnow()
         
+        ProviderMetricsService.record_transition(db, referral, old_status, provider_id)
         db.commit()
         return True
     
@@ -196,11 +203,13 @@ class ProviderService:
         
         if not referral:
             return False
-            
+        
+        old_status = referral.status
         referral.status = "accepted"
         referral.accepted_at = datetime.utcnow()
         referral.updated_at = datetime.utcnow()
         
+        ProviderMetricsService.record_transition(db, referral, old_status, provider_id)
         db.commit()
         return True
     
@@ -217,10 +226,12 @@ class ProviderService:
         if not referral:
             return False
         
+        old_status = referral.status
         referral.status = "declined"
         referral.notes = f"Declined: {reason}"
         referral.updated_at = datetime.utcnow()
         
+        ProviderMetricsService.record_transition(db, referral, old_status, provider_id)
         db.commit()
         return True
     
@@ -354,4 +365,124 @@ class ProviderService:
         # This is a placeholder implementation
         # In a real system, you would query notification records
         
-        return []
\ No newline at end of file
+        return []
+
+
+class AsyncProviderService:
+    """
+    ProviderService for async routes (AsyncSession).
+
+    Reads are ported to select() statements; updates, which share the metrics
+    bookkeeping with the sync service, run it through run_in_session.
+    """
+
+    @staticmethod
+    async def _status_counts(db: AsyncSession, provider_id: int) -> Dict[str, int]:
+        """Referral counts of a provider by status, in one query"""
+        result = await db.execute(
+            select(Referral.status, func.count(Referral.id))
+            .where(Referral.assigned_provider_id == provider_id)
+            .group_by(Referral.status)
+        )
+        return {status: count for status, count in result.all()}
+
+    @staticmethod
+    async def get_dashboard_data(db: AsyncSession, provider_id: int) -> ProviderDashboardResponse:
+        """Get provider dashboard statistics"""
+        counts = await AsyncProviderService._status_counts(db, provider_id)
+        accepted_referrals = counts.get("accepted", 0) + counts.get("in_progress", 0)
+
+        recent_referrals = (await db.scalars(
+            select(Referral)
+            .where(Referral.assigned_provider_id == provider_id)
+            .order_by(desc(Referral.updated_at))
+            .limit(5)
+        )).all()
+        recent_activity = [
+            {
+                "id": referral.id,
+                "type": "referral_update",
+                "title": f"Referral #{referral.id} - {referral.first_name} {referral.last_name}",
+                "description": f"Status: {referral.status.title()}",
+                "timestamp": referral.updated_at or referral.created_at,
+                "referral_id": referral.id
+            }
+            for referral in recent_referrals
+        ]
+
+        return ProviderDashboardResponse(
+            total_referrals=sum(counts.values()),
+            new_referrals=counts.get("new", 0),
+            accepted_referrals=accepted_referrals,
+            completed_referrals=counts.get("completed", 0),
+            active_participants=accepted_referrals,
+            performance_rating=4.8,
+            recent_activity=recent_activity
+        )
+
+    @staticmethod
+    async def get_provider_referrals(
+        db: AsyncSession,
+        provider_id: int,
+        status_filter: Optional[str] = None,
+        service_type: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[ProviderReferralResponse]:
+        """Get referrals assigned to provider with filtering (cursor takes precedence over skip)"""
+        statement = select(Referral).where(Referral.assigned_provider_id == provider_id)
+        if status_filter:
+            statement = statement.where(Referral.status == status_filter)
+        if service_type:
+            statement = statement.where(Referral.referred_for == service_type)
+
+        referrals = (await db.scalars(
+            newest_first(statement, Referral.created_at, Referral.id, skip, limit, cursor)
+        )).all()
+        return [ProviderService._referral_to_response(referral) for referral in referrals]
+
+    @staticmethod
+    async def get_referral_details(db: AsyncSession, referral_id: int, provider_id: int) -> Optional[ProviderReferralResponse]:
+        """Get detailed referral information"""
+        referral = await db.scalar(
+            select(Referral).where(
+                Referral.id == referral_id,
+                Referral.assigned_provider_id == provider_id
+            )
+        )
+        return ProviderService._referral_to_response(referral) if referral else None
+
+    @staticmethod
+    async def get_performance_metrics(db: AsyncSession, provider_id: int) -> ProviderPerformanceResponse:
+        """Get provider performance metrics and statistics"""
+        counts = await AsyncProviderService._status_counts(db, provider_id)
+        total_referrals = sum(counts.values())
+        accepted_referrals = sum(counts.get(status, 0) for status in ["accepted", "in_progress", "completed"])
+        completed_referrals = counts.get("completed", 0)
+
+        acceptance_rate = (accepted_referrals / total_referrals * 100) if total_referrals > 0 else 0
+        completion_rate = (completed_referrals / accepted_referrals * 100) if accepted_referrals > 0 else 0
+
+        return ProviderPerformanceResponse(
+            total_referrals=total_referrals,
+            accepted_referrals=accepted_referrals,
+            completed_referrals=completed_referrals,
+            declined_referrals=counts.get("declined", 0),
+            acceptance_rate=round(acceptance_rate, 2),
+            completion_rate=round(completion_rate, 2),
+            average_response_time_hours=None,
+            average_completion_time_days=None,
+            participant_satisfaction_avg=None,
+            recent_performance_trend="stable"
+        )
+
+    update_referral_status = run_in_session(ProviderService.update_referral_status)
+    accept_referral = run_in_session(ProviderService.accept_referral)
+    decline_referral = run_in_session(ProviderService.decline_referral)
+    get_provider_schedule = run_in_session(ProviderService.get_provider_schedule)
+    set_availability = run_in_session(ProviderService.set_availability)
+    get_availability = run_in_session(ProviderService.get_availability)
+    get_provider_participants = run_in_session(ProviderService.get_provider_participants)
+    update_profile = run_in_session(ProviderService.update_profile)
+    get_notifications = run_in_session(ProviderService.get_notifications)
@@ -1,15 +1,73 @@
 # backend/app/services/referral_service.py - COMPLETE VERSION
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.referral import Referral
 from app.schemas.referral import ReferralCreate, ReferralUpdate, ReferralResponse
+from app.services.provider_metrics_service import ProviderMetricsService
+from app.utils.pagination import newest_first, paginate_newest_first
 from typing import List, Optional
 import json
 from datetime import datetime
 
+# Frontend (camelCase) field names of ReferralUpdate mapped to Referral columns
+REFERRAL_FIELD_MAPPING = {
+    'firstName': 'first_name',
+    'lastName': 'last_name',
+    'dateOfBirth': 'date_of_birth',
+    'phoneNumber': 'phone_number',
+    'emailAddress': 'email_address',
+    'streetAddress': 'street_address',
+    'preferredContact': 'preferred_contact',
+    'repFirstName': 'rep_first_name',
+    'repLastName': 'rep_last_name',
+    'repPhoneNumber': 'rep_phone_number',
+    'repEmailAddress': 'rep_email_address',
+    'repStreetAddress': 'rep_street_address',
+    'repCity': 'rep_city',
+    'repState': 'rep_state',
+    'repPostcode': 'rep_postcode',
+    'planType': 'plan_type',
+    'planManagerName': 'plan_manager_name',
+    'planManagerAgency': 'plan_manager_agency',
+    'ndisNumber': 'ndis_number',
+    'availableFunding': 'available_funding',
+    'planStartDate': 'plan_start_date',
+    'planReviewDate': 'plan_review_date',
+    'clientGoals': 'client_goals',
+    'referrerFirstName': 'referrer_first_name',
+    'referrerLastName': 'referrer_last_name',
+    'referrerAgency': 'referrer_agency',
+    'referrerRole': 'referrer_role',
+    'referrerEmail': 'referrer_email',
+    'referrerPhone': 'referrer_phone',
+    'referredFor': 'referred_for',
+    'reasonForReferral': 'reason_for_referral',
+    'consentCheckbox': 'consent_checkbox'
+}
+
+
 class ReferralService:
     @staticmethod
-    def create_referral(db: Session, referral_data: ReferralCreate) -> Referral:
-        """Create a new referral from form submission"""
+    def create_referral(db: Session, referral_data: ReferralCreate, commit: bool = True) -> Referral:
+        """
+        Create a new referral from form submission
+
+        With commit=False the referral is only flushed (so it has an id) and the
+        caller commits it together with related rows, e.g. its outbox emails.
+        """
+        db_referral = ReferralService._build_referral(referral_data)
+        db.add(db_referral)
+        if not commit:
+            db.flush()
+            return db_referral
+        db.commit()
+        db.refresh(db_referral)
+        return db_referral
+    
+    @staticmethod
+    def _build_referral(referral_data: ReferralCreate) -> Referral:
+        """Referral model for a form submission (not added to a session)"""
         # Store raw submission for traceability
         raw_submission = referral_data.model_dump()
         
@@ -77,9 +135,6 @@ class ReferralService:
             form_metadata=metadata
         )
         
-        db.add(db_referral)
-        db.commit()
-        db.refresh(db_referral)
         return db_referral
     
     @staticmethod
@@ -88,14 +143,20 @@ class ReferralService:
         return db.query(Referral).filter(Referral.id == referral_id).first()
     
     @staticmethod
-    def get_referrals(db: Session, skip: int = 0, limit: int = 100, status: Optional[str] = None) -> List[Referral]:
-        """Get all referrals with optional filtering"""
+    def get_referrals(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> List[Referral]:
+        """Get all referrals with optional filtering, newest first (cursor takes precedence over skip)"""
         query = db.query(Referral)
         
         if status:
             query = query.filter(Referral.status == status)
             
-        return query.order_by(Referral.created_at.desc()).offset(skip).limit(limit).all()
+        return paginate_newest_first(query, Referral.created_at, Referral.id, skip, limit, cursor)
     
     @staticmethod
     def update_referral(db: Session, referral_id: int, referral_update: ReferralUpdate) -> Optional[Referral]:
@@ -104,48 +165,15 @@ class ReferralService:
         
         if db_referral:
             update_data = referral_update.model_dump(exclude_unset=True)
-            
-            # Map frontend field names to database field names
-            field_mapping = {
-                'firstName': 'first_name',
-                'lastName': 'last_name',
-                'dateOfBirth': 'date_of_birth',
-                'phoneNumber': 'phone_number',
-                'emailAddress': 'email_address',
-                'streetAddress': 'street_address',
-                'preferredContact': 'preferred_contact',
-                'repFirstName': 'rep_first_name',
-                'repLastName': 'rep_last_name',
-                'repPhoneNumber': 'rep_phone_number',
-                'repEmailAddress': 'rep_email_address',
-                'repStreetAddress': 'rep_street_address',
-                'repCity': 'rep_city',
-                'repState': 'rep_state',
-                'repPostcode': 'rep_postcode',
-                'planType': 'plan_type',
-                'planManagerName': 'plan_manager_name',
-                'planManagerAgency': 'plan_manager_agency',
-                'ndisNumber': 'ndis_number',
-                'availableFunding': 'available_funding',
-                'planStartDate': 'plan_start_date',
-                'planReviewDate': 'plan_review_date',
-                'clientGoals': 'client_goals',
-                'referrerFirstName': 'referrer_first_name',
-                'referrerLastName': 'referrer_last_name',
-                'referrerAgency': 'referrer_agency',
-                'referrerRole': 'referrer_role',
-                'referrerEmail': 'referrer_email',
-                'referrerPhone': 'referrer_phone',
-                'referredFor': 'referred_for',
-                'reasonForReferral': 'reason_for_referral',
-                'consentCheckbox': 'consent_checkbox'
-            }
+            old_status = db_referral.status
+            old_provider_id = db_referral.assigned_provider_id
             
             for api_field, value in update_data.items():
-                db_field = field_mapping.get(api_field, api_field)
+                db_field = REFERRAL_FIELD_MAPPING.get(api_field, api_field)
                 setattr(db_referral, db_field, value)
             
             db_referral.updated_at = datetime.utcnow()
+            ProviderMetricsService.record_transition(db, db_referral, old_status, old_provider_id)
             db.commit()
             db.refresh(db_referral)
             
@@ -157,8 +185,73 @@ class ReferralService:
         db_referral = db.query(Referral).filter(Referral.id == referral_id).first()
         
         if db_referral:
+            ProviderMetricsService.record_removal(db, db_referral)
             db.delete(db_referral)
             db.commit()
             return True
             
-        return False
\ No newline at end of file
+        return False
+
+
+class AsyncReferralService:
+    """ReferralService for async routes: same behaviour, queries awaited on an AsyncSession"""
+
+    @staticmethod
+    async def create_referral(db: AsyncSession, referral_data: ReferralCreate, commit: bool = True) -> Referral:
+        """Create a new referral from form submission (with commit=False it is only flushed)"""
+        db_referral = ReferralService._build_referral(referral_data)
+        db.add(db_referral)
+        if not commit:
+            await db.flush()
+            return db_referral
+        await db.commit()
+        await db.refresh(db_referral)
+        return db_referral
+
+    @staticmethod
+    async def get_referral(db: AsyncSession, referral_id: int) -> Optional[Referral]:
+        """Get a referral by ID"""
+        return await db.get(Referral, referral_id)
+
+    @staticmethod
+    async def get_referrals(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> List[Referral]:
+        """Get all referrals with optional filtering, newest first (cursor takes precedence over skip)"""
+        statement = select(Referral)
+        if status:
+            statement = statement.where(Referral.status == status)
+        result = await db.scalars(newest_first(statement, Referral.created_at, Referral.id, skip, limit, cursor))
+        return result.all()
+
+    @staticmethod
+    async def update_referral(db: AsyncSession, referral_id: int, referral_update: ReferralUpdate) -> Optional[Referral]:
+        """Update a referral (for admin use)"""
+        db_referral = await db.get(Referral, referral_id)
+        if db_referral:
+            old_status = db_referral.status
+            old_provider_id = db_referral.assigned_provider_id
+            for api_field, value in referral_update.model_dump(exclude_unset=True).items():
+                setattr(db_referral, REFERRAL_FIELD_MAPPING.get(api_field, api_field), value)
+            db_referral.updated_at = datetime.utcnow()
+            await db.run_sync(
+                ProviderMetricsService.record_transition, db_referral, old_status, old_provider_id
+            )
+            await db.commit()
+            await db.refresh(db_referral)
+        return db_referral
+
+    @staticmethod
+    async def delete_referral(db: AsyncSession, referral_id: int) -> bool:
+        """Delete a referral"""
+        db_referral = await db.get(Referral, referral_id)
+        if not db_referral:
+            return False
+        await db.run_sync(ProviderMetricsService.record_removal, db_referral)
+        await db.delete(db_referral)
+        await db.commit()
+        return True
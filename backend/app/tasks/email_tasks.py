@@ -1,13 +1,38 @@
-import asyncio
 from typing import List, Optional, Dict, Any
 from celery import current_task
 from sqlalchemy.orm import Session
 from app.core.celery_app import celery_app
 from app.core.database import get_db
-from app.services.email_service import EmailService
+from app.core.worker_loop import run_async
+from app.services.email_service import get_email_service
+from app.services.email_retry import CircuitOpenError, MailgunError, is_retryable, mailgun_breaker, retry_policy
 from app.models.referral import Referral
 
 
+def retry_with_backoff(task, error: Exception):
+    """
+    Retry a task with exponential backoff and jitter instead of a fixed countdown
+
+    Honours Mailgun's Retry-After and waits out an open circuit breaker;
+    Mailgun errors that won't go away by retrying (4xx other than 429) are
+    raised straight away. Raises celery.exceptions.Retry, or the error once
+    retries are exhausted.
+    """
+    if isinstance(error, MailgunError) and not is_retryable(error):
+        raise error
+    countdown = retry_policy.next_delay(task.request.retries, getattr(error, "retry_after", None))
+    countdown = max(countdown, mailgun_breaker.retry_after())
+    print(f"Retrying {task.name} in {countdown:.0f}s (attempt {task.request.retries + 1}): {error}")
+    raise task.retry(exc=error, countdown=countdown)
+
+
+def check_mailgun_available():
+    """Don't start sending while the Mailgun circuit breaker is open"""
+    retry_after = mailgun_breaker.retry_after()
+    if retry_after > 0:
+        raise CircuitOpenError(f"Mailgun circuit breaker open - retry in {retry_after:.0f}s", retry_after=retry_after)
+
+
 def get_database_session():
     """Get database session for tasks"""
     try:
@@ -18,7 +43,7 @@ def get_database_session():
         return None
 
 
-@celery_app.task(bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60})
+@celery_app.task(bind=True, max_retries=3)
 def send_referral_notifications(self, referral_id: int, provider_emails: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Celery task to send all email notifications for a new referral
@@ -49,12 +74,14 @@ def send_referral_notifications(self, referral_id: int, provider_emails: Optiona
         if not referral:
             raise ValueError(f"Referral with ID {referral_id} not found")
         
-        # Initialize email service
-        email_service = EmailService()
+        # Shared per worker process (config and templates are loaded once)
+        email_service = get_email_service()
         
         if not email_service.is_configured():
             raise ValueError("Email service is not properly configured")
         
+        check_mailgun_available()
+        
         # Update task state
         if current_task:
             current_task.update_state(
@@ -62,16 +89,10 @@ def send_referral_notifications(self, referral_id: int, provider_emails: Optiona
                 meta={'current': 1, 'total': 3, 'status': 'Sending notifications...'}
             )
         
-        # Run async email sending in event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            results = loop.run_until_complete(
-                email_service.send_all_notifications(referral, provider_emails, db)
-            )
-        finally:
-            loop.close()
+        # Run on the worker's long-lived event loop so pooled connections are reused
+        results = run_async(
+            email_service.send_all_notifications(referral, provider_emails, db, task_id=self.request.id)
+        )
         
         # Update task state
         if current_task:
@@ -98,14 +119,14 @@ def send_referral_notifications(self, referral_id: int, provider_emails: Optiona
                 meta={'error': str(e), 'referral_id': referral_id}
             )
             
-        # Re-raise for Celery retry mechanism
-        raise
+        # Retry later with backoff
+        retry_with_backoff(self, e)
     finally:
         if db:
             db.close()
 
 
-@celery_app.task(bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60})
+@celery_app.task(bind=True, max_retries=3)
 def send_provider_notification(self, referral_id: int, provider_emails: List[str]) -> Dict[str, Any]:
     """
     Celery task to send provider notification email
@@ -129,19 +150,17 @@ def send_provider_notification(self, referral_id: int, provider_emails: List[str
         if not referral:
             raise ValueError(f"Referral with ID {referral_id} not found")
         
-        # Initialize email service
-        email_service = EmailService()
+        # Shared per worker process (config and templates are loaded once)
+        email_service = get_email_service()
         
-        # Run async email sending
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        check_mailgun_available()
         
-        try:
-            success = loop.run_until_complete(
-                email_service.send_provider_notification(referral, provider_emails)
+        # Run on the worker's long-lived event loop so pooled connections are reused
+        success = run_async(
+            email_service.send_provider_notification(
+                referral, provider_emails, db, task_id=self.request.id, raise_errors=True
             )
-        finally:
-            loop.close()
+        )
         
         return {
             'referral_id': referral_id,
@@ -151,13 +170,13 @@ def send_provider_notification(self, referral_id: int, provider_emails: List[str
         
     except Exception as e:
         print(f"Error in send_provider_notification task: {str(e)}")
-        raise
+        retry_with_backoff(self, e)
     finally:
         if db:
             db.close()
 
 
-@celery_app.task(bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60})
+@celery_app.task(bind=True, max_retries=3)
 def send_participant_confirmation(self, referral_id: int) -> Dict[str, Any]:
     """
     Celery task to send participant confirmation email
@@ -180,19 +199,15 @@ def send_participant_confirmation(self, referral_id: int) -> Dict[str, Any]:
         if not referral:
             raise ValueError(f"Referral with ID {referral_id} not found")
         
-        # Initialize email service
-        email_service = EmailService()
+        # Shared per worker process (config and templates are loaded once)
+        email_service = get_email_service()
         
-        # Run async email sending
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        check_mailgun_available()
         
-        try:
-            success = loop.run_until_complete(
-                email_service.send_participant_confirmation(referral)
-            )
-        finally:
-            loop.close()
+        # Run on the worker's long-lived event loop so pooled connections are reused
+        success = run_async(
+            email_service.send_participant_confirmation(referral, raise_errors=True)
+        )
         
         return {
             'referral_id': referral_id,
@@ -202,7 +217,7 @@ def send_participant_confirmation(self, referral_id: int) -> Dict[str, Any]:
         
     except Exception as e:
         print(f"Error in send_participant_confirmation task: {str(e)}")
-        raise
+        retry_with_backoff(self, e)
     finally:
         if db:
             db.close()
@@ -217,7 +232,7 @@ def test_email_configuration(self) -> Dict[str, Any]:
         Dict containing test results
     """
     try:
-        email_service = EmailService()
+        email_service = get_email_service()
         
         is_configured = email_service.is_configured()
         
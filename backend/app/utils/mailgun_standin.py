@@ -0,0 +1,127 @@
+# backend/app/utils/mailgun_standin.py
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+
+class MailgunStandIn:
+    """
+    Local stand-in for the Mailgun messages API, for tests and benchmarks.
+
+    Speaks plain HTTP/1.1 with keep-alive and counts the TCP connections it
+    accepts, so callers can check that sends reuse pooled connections. Point
+    EmailService at it with MAILGUN_API_BASE_URL=<base_url>.
+
+    handshake_latency is added once per new connection (standing in for the
+    TCP+TLS setup to the real API), latency once per request.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        handshake_latency: float = 0.0
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.handshake_latency = handshake_latency
+        self.connections = 0
+        self.requests = 0
+        self.messages: List[Dict[str, Any]] = []
+        self._failures: List[Tuple[int, Optional[float]]] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v3"
+
+    def queue_failures(self, status_code: int, count: int = 1, retry_after: Optional[float] = None):
+        """Answer the next count requests with status_code (and a Retry-After header) instead of accepting them"""
+        self._failures.extend([(status_code, retry_after)] * count)
+
+    def reset_counters(self):
+        self.connections = 0
+        self.requests = 0
+        self.messages.clear()
+
+    async def start(self) -> "MailgunStandIn":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise keep their handlers waiting
+            handlers = list(self._handlers.items())
+            for _, writer in handlers:
+                writer.close()
+            await asyncio.gather(*(task for task, _ in handlers), return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "MailgunStandIn":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._handlers[asyncio.current_task()] = writer
+        try:
+            if self.handshake_latency:
+                await asyncio.sleep(self.handshake_latency)
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                status, payload, retry_after = self._respond(request_line.decode("latin-1"), body)
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                content = json.dumps(payload).encode()
+                extra_headers = f"Retry-After: {retry_after:g}\r\n" if retry_after is not None else ""
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"{extra_headers}"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._handlers.pop(asyncio.current_task(), None)
+            writer.close()
+
+    def _respond(self, request_line: str, body: bytes):
+        method, path, _ = request_line.split(" ", 2)
+        if method != "POST" or not path.endswith("/messages"):
+            return 404, {"message": "Not found"}, None
+        if self._failures:
+            status, retry_after = self._failures.pop(0)
+            return status, {"message": "Stand-in failure"}, retry_after
+
+        fields = {key: values if len(values) > 1 else values[0]
+                  for key, values in parse_qs(body.decode()).items()}
+        self.messages.append(fields)
+        return 200, {"id": f"<{len(self.messages)}@mailgun-standin>", "message": "Queued. Thank you."}, None
@@ -0,0 +1,81 @@
+# backend/app/utils/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: Optional[datetime], id: int) -> str:
+    """Encode the (created_at, id) of the last row on a page as an opaque cursor (created_at may be None)"""
+    payload = json.dumps([created_at.isoformat() if created_at else None, id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(created_at) if created_at is not None else None), int(id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def newest_first(
+    statement: Any,
+    created_at_column: Any,
+    id_column: Any,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Any:
+    """
+    Order newest first and limit to one page (a Query or a select()).
+
+    With a cursor, rows strictly after the cursor position are returned (keyset
+    pagination: constant cost per page, no duplicates or gaps while new rows
+    arrive). Without one, skip/limit offset paging is kept for existing callers.
+    The id tie-break makes the order total so both modes agree. Rows without
+    a created_at come first on every database (PostgreSQL's own order for
+    DESC, so its (created_at, id) indexes still serve it backwards).
+    """
+    statement = statement.order_by(created_at_column.desc().nulls_first(), id_column.desc())
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        if created_at is None:
+            # Still among the undated rows: the rest of them, then every dated row
+            statement = statement.filter(or_(
+                and_(created_at_column.is_(None), id_column < id),
+                created_at_column.isnot(None)
+            ))
+        else:
+            # Row-value comparison, which PostgreSQL answers with one range scan of a (created_at, id) index
+            statement = statement.filter(tuple_(created_at_column, id_column) < (created_at, id))
+    elif skip:
+        statement = statement.offset(skip)
+    return statement.limit(limit)
+
+
+def paginate_newest_first(
+    query: Query,
+    created_at_column: Any,
+    id_column: Any,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> list:
+    """Newest-first page of a Query (see newest_first)"""
+    return newest_first(query, created_at_column, id_column, skip, limit, cursor).all()
+
+
+def next_cursor(items: list, limit: int) -> Optional[str]:
+    """Cursor for the page after items, or None when this was the last page"""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
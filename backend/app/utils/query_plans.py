@@ -0,0 +1,82 @@
+# backend/app/utils/query_plans.py
+import json
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+
+
+@dataclass
+class CapturedStatement:
+    """A SELECT executed while capturing, with its DB-API parameters"""
+    statement: str
+    parameters: Any
+
+
+@dataclass
+class PlanCheck:
+    """The plan of one captured statement and the sequential scans found in it"""
+    statement: str
+    plan: Dict[str, Any]
+    seq_scans: List[str] = field(default_factory=list)
+
+
+@contextmanager
+def capture_selects(connection: Connection) -> Iterator[List[CapturedStatement]]:
+    """Collect every SELECT run on the connection inside the block"""
+    captured: List[CapturedStatement] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            captured.append(CapturedStatement(statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(connection, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(connection: Connection, statement: str, parameters: Any = None) -> Dict[str, Any]:
+    """EXPLAIN a captured statement on PostgreSQL and return the root plan node"""
+    result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters or {})
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def iter_plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Walk a plan tree depth first"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+
+def find_seq_scans(plan: Dict[str, Any], tables: Optional[Iterable[str]] = None) -> List[str]:
+    """Relations read with a sequential scan (limited to tables when given)"""
+    tables = set(tables) if tables is not None else None
+    return [
+        node["Relation Name"]
+        for node in iter_plan_nodes(plan)
+        if node.get("Node Type") == "Seq Scan"
+        and (tables is None or node.get("Relation Name") in tables)
+    ]
+
+
+def check_plans(
+    connection: Connection,
+    statements: Iterable[CapturedStatement],
+    tables: Iterable[str]
+) -> List[PlanCheck]:
+    """EXPLAIN the statements that read any of the tables and record their sequential scans"""
+    tables = list(tables)
+    checks = []
+    for captured in statements:
+        if not any(table in captured.statement for table in tables):
+            continue
+        plan = explain(connection, captured.statement, captured.parameters)
+        checks.append(PlanCheck(captured.statement, plan, find_seq_scans(plan, tables)))
+    return checks
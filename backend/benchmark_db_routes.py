@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Load test the referral list route under a single uvicorn worker
+
+Serves GET /referrals three ways from one uvicorn worker and fires
+concurrent requests at each:
+
+  sync session, async route   the old behaviour: an async def route querying
+                              the sync Session, blocking the event loop
+  sync session, def route     the same query in FastAPI's threadpool
+  AsyncSession                referrals_simple.get_referrals on asyncpg/aiosqlite
+
+--db-latency puts a TCP proxy that delays every packet in front of a
+PostgreSQL DATABASE_URL, standing in for the round trip to a hosted
+database; with it the blocking route serialises every request.
+
+Reports requests per second and p50/p95 latency of the successful requests,
+and the number that failed. The blocking route can fail outright: a request
+waiting for a pooled connection blocks the loop that would run the session
+cleanup returning one, until the pool timeout.
+
+Example:
+    python benchmark_db_routes.py --requests 500 --concurrency 50 --db-latency 0.01
+    python benchmark_db_routes.py --seed 200
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import contextlib
+import socket
+import statistics
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test sync vs async database routes")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20, help="Referrals per page")
+    parser.add_argument("--db-latency", type=float, default=0.0,
+                        help="Delay added each way between the app and PostgreSQL (seconds)")
+    parser.add_argument("--seed", type=int, default=0, help="Insert this many sample referrals first")
+    return parser.parse_args()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class LatencyProxy:
+    """TCP proxy on its own loop thread that delays every chunk it forwards"""
+
+    def __init__(self, connect, latency):
+        self.connect = connect
+        self.latency = latency
+        self.port = free_port()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    async def _pipe(self, reader, writer):
+        try:
+            while data := await reader.read(65536):
+                await asyncio.sleep(self.latency)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, client_reader, client_writer):
+        server_reader, server_writer = await self.connect()
+        await asyncio.gather(
+            self._pipe(client_reader, server_writer),
+            self._pipe(server_reader, client_writer)
+        )
+
+    def start(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, "127.0.0.1", self.port), self.loop
+        ).result()
+        return self
+
+def proxied_database_url(url, latency):
+    """Start a LatencyProxy in front of a PostgreSQL URL; returns the URL through it"""
+    from sqlalchemy.engine import make_url
+
+    url = make_url(url)
+    if not url.drivername.startswith("postgres"):
+        raise SystemExit("--db-latency needs a PostgreSQL DATABASE_URL")
+    socket_dir = url.query.get("host")
+    if socket_dir and socket_dir.startswith("/"):
+        path = os.path.join(socket_dir, f".s.PGSQL.{url.port or 5432}")
+        connect = lambda: asyncio.open_unix_connection(path)
+    else:
+        host, port = url.host or "localhost", url.port or 5432
+        connect = lambda: asyncio.open_connection(host, port)
+    proxy = LatencyProxy(connect, latency).start()
+    query = {key: value for key, value in url.query.items() if key != "host"}
+    return url.set(host="127.0.0.1", port=proxy.port, query=query).render_as_string(hide_password=False)
+
+def seed_referrals(count):
+    from app.core.database import SessionLocal
+    from app.models.referral import Referral
+
+    db = SessionLocal()
+    try:
+        db.add_all(
+            Referral(
+                first_name="Load", last_name=f"Test {i}", date_of_birth="1990-01-01",
+                phone_number="0400000000", street_address="1 Test St", city="Sydney", state="NSW",
+                postcode="2000", preferred_contact="phone", plan_type="plan-managed",
+                plan_start_date="2025-01-01", plan_review_date="2026-01-01", client_goals="Load test",
+                referrer_first_name="Sam", referrer_last_name="Referrer", referrer_email="sam@example.com",
+                referrer_phone="0400000001", referred_for="physiotherapy", reason_for_referral="Load test",
+                consent_checkbox=True, status="new"
+            )
+            for i in range(count)
+        )
+        db.commit()
+    finally:
+        db.close()
+    print(f"Seeded {count} referrals")
+
+def build_app():
+    from fastapi import Depends, FastAPI
+    from sqlalchemy.orm import Session
+    from typing import List
+
+    from app.api.v1 import referrals_simple
+    from app.core.database import get_db
+    from app.schemas.referral import ReferralResponse
+    from app.services.referral_service import ReferralService
+
+    app = FastAPI()
+
+    @app.get("/sync-async/referrals", response_model=List[ReferralResponse])
+    async def sync_session_async_route(limit: int = 100, db: Session = Depends(get_db)):
+        return ReferralService.get_referrals(db, limit=limit)
+
+    @app.get("/sync-def/referrals", response_model=List[ReferralResponse])
+    def sync_session_def_route(limit: int = 100, db: Session = Depends(get_db)):
+        return ReferralService.get_referrals(db, limit=limit)
+
+    app.include_router(referrals_simple.router, prefix="/async")
+    return app
+
+@contextlib.contextmanager
+def serve(app):
+    """Run app on one uvicorn worker in a background thread"""
+    import uvicorn
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="critical", workers=1))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+async def load(url, count, concurrency):
+    """count GETs, at most concurrency at a time; returns elapsed seconds, latencies of successes and errors"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    errors.append(e)
+                    return
+                latencies.append(time.perf_counter() - started)
+
+        await one()
+        latencies.clear()
+        errors.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(count)))
+        return time.perf_counter() - started, latencies, errors
+
+def main(args):
+    if args.db_latency:
+        from app.core.config import settings
+        os.environ["DATABASE_URL"] = proxied_database_url(settings.DATABASE_URL, args.db_latency)
+        settings.DATABASE_URL = os.environ["DATABASE_URL"]
+    if args.seed:
+        seed_referrals(args.seed)
+
+    app = build_app()
+    results = []
+    # The routes print a line per request
+    with serve(app) as base_url, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, path in [("sync session, async route", "/sync-async/referrals"),
+                           ("sync session, def route", "/sync-def/referrals"),
+                           ("AsyncSession", "/async/referrals")]:
+            url = f"{base_url}{path}?limit={args.limit}"
+            elapsed, latencies, errors = asyncio.run(load(url, args.requests, args.concurrency))
+            latencies = sorted(latencies) or [0.0]
+            p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+            results.append((name, elapsed, len(latencies), statistics.median(latencies), p95, len(errors)))
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {args.limit} referrals per page, "
+          f"database latency {args.db_latency * 1000:.0f}ms each way")
+    for name, elapsed, succeeded, p50, p95, errors in results:
+        print(f"  {name:<26} {succeeded / elapsed:8.1f} req/s  p50 {p50 * 1000:7.1f} ms  "
+              f"p95 {p95 * 1000:7.1f} ms  {errors:4d} errors")
+
+if __name__ == "__main__":
+    print("NDIS Database Route Load Test")
+    print("=" * 30)
+    main(parse_args())
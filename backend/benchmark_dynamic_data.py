@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark data point writes against the configured PostgreSQL database
+
+upserts: writes --points catalogue points into a throwaway data type four
+ways and reports rows per second for each:
+
+  per-row ORM        the old bulk_create_data_points: one DataPoint per row,
+                     then a refresh per row after the commit
+  bulk insert        upsert_data_points into an empty type
+  bulk update        upsert_data_points again with on_conflict="update"
+  portable insert    the same two on the executemany fallback used off
+  portable update    PostgreSQL
+
+The throwaway data types are deleted afterwards.
+
+Example:
+    python benchmark_dynamic_data.py upserts --points 10000
+"""
+
+import sys
+import os
+import argparse
+import time
+import uuid
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal, engine
+from app.models.dynamic_data import DataPoint, DataType
+from app.schemas.dynamic_data import DataPointBase
+from app.services.dynamic_data_service import DynamicDataService
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark data point writes")
+    parser.add_argument("mode", nargs="?", choices=["upserts"], default="upserts")
+    parser.add_argument("--points", type=int, default=10000)
+    return parser.parse_args()
+
+def sample_points(count):
+    return [
+        DataPointBase(
+            name=f"item_{number:06d}",
+            description=f"Support item {number}",
+            sort_order=number,
+            extra_data={"price": f"{number % 500}.00", "unit": "hour"}
+        )
+        for number in range(count)
+    ]
+
+def new_data_type(db, label):
+    data_type = DataType(name=f"benchmark_{label}_{uuid.uuid4().hex[:8]}", display_name=f"Benchmark {label}")
+    db.add(data_type)
+    db.commit()
+    return data_type
+
+def report(label, count, seconds):
+    print(f"  {label:<18} {count:>7} rows in {seconds:6.2f}s  {count / seconds:>9.0f} rows/s")
+
+def per_row_orm(db, data_type, points):
+    """The old bulk_create_data_points"""
+    created = []
+    for point in points:
+        db_point = DataPoint(
+            data_type_id=data_type.id, name=point.name.lower(), description=point.description,
+            sort_order=point.sort_order, is_active=point.is_active, extra_data=point.extra_data
+        )
+        db.add(db_point)
+        created.append(db_point)
+    db.commit()
+    for db_point in created:
+        db.refresh(db_point)
+
+def upsert(db, data_type, points, on_conflict, portable=False):
+    if portable:
+        rows = [
+            {
+                "id": uuid.uuid4(), "data_type_id": data_type.id, "name": point.name.lower(),
+                "description": point.description, "sort_order": point.sort_order,
+                "is_active": point.is_active, "extra_data": point.extra_data
+            }
+            for point in points
+        ]
+        written, _ = DynamicDataService._bulk_upsert_executemany(db, data_type.id, rows, on_conflict)
+    else:
+        written, _ = DynamicDataService.upsert_data_points(db, data_type, points, on_conflict)
+    db.commit()
+    assert len(written) == len(points)
+
+def timed(label, count, run):
+    started = time.perf_counter()
+    run()
+    report(label, count, time.perf_counter() - started)
+
+def benchmark_upserts(points_count):
+    points = sample_points(points_count)
+    db = SessionLocal()
+    data_types = []
+    try:
+        print(f"Writing {points_count} points ({engine.dialect.name})")
+        orm_type, bulk_type, portable_type = (
+            new_data_type(db, label) for label in ("orm", "bulk", "portable")
+        )
+        data_types = [orm_type, bulk_type, portable_type]
+
+        timed("per-row ORM", points_count, lambda: per_row_orm(db, orm_type, points))
+        timed("bulk insert", points_count, lambda: upsert(db, bulk_type, points, "fail"))
+        timed("bulk update", points_count, lambda: upsert(db, bulk_type, points, "update"))
+        timed("portable insert", points_count, lambda: upsert(db, portable_type, points, "fail", portable=True))
+        timed("portable update", points_count, lambda: upsert(db, portable_type, points, "update", portable=True))
+    finally:
+        db.rollback()
+        for data_type in data_types:
+            db.query(DataPoint).filter(DataPoint.data_type_id == data_type.id).delete(synchronize_session=False)
+            db.delete(data_type)
+        db.commit()
+        db.close()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if engine.dialect.name != "postgresql":
+        # The dynamic data models use PostgreSQL UUID columns
+        print("benchmark_dynamic_data.py needs a PostgreSQL DATABASE_URL")
+        sys.exit(1)
+
+    if args.mode == "upserts":
+        benchmark_upserts(args.points)
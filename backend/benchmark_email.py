@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Benchmark email sending against a local Mailgun stand-in
+
+sends: participant confirmations through EmailService on the shared pooled
+client, then the same number with a fresh httpx.AsyncClient per send (the old
+behaviour).
+
+tasks: the body of the send_referral_notifications Celery task run back to
+back, first with a new event loop per task (the old behaviour), then on the
+worker's long-lived loop.
+
+Both report throughput and the TCP connections opened.
+
+renders: email template rendering without the network - get_template on
+every render (the old behaviour), the precompiled templates, and the cached
+per-referral messages - plus startup compile time with and without the
+on-disk bytecode cache. Reports renders per second.
+
+Example:
+    python benchmark_email.py sends --emails 200 --handshake-latency 0.03
+    python benchmark_email.py tasks --tasks 200
+    python benchmark_email.py renders --renders 5000
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import contextlib
+import tempfile
+import time
+from datetime import datetime, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from app.utils.mailgun_standin import MailgunStandIn
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark email sends against a local Mailgun stand-in")
+    parser.add_argument("mode", nargs="?", choices=["sends", "tasks", "renders"], default="sends")
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--renders", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stand-in delay per request (seconds)")
+    parser.add_argument("--handshake-latency", type=float, default=0.03,
+                        help="Stand-in delay per new connection, standing in for TCP+TLS setup (seconds)")
+    return parser.parse_args()
+
+def sample_referral():
+    """An unsaved referral with every field the templates use"""
+    from app.models.referral import Referral
+
+    return Referral(
+        id=1, first_name="Alex", last_name="Sample", date_of_birth="1990-01-01",
+        phone_number="0400000000", email_address="alex@example.com",
+        street_address="1 Test St", city="Sydney", state="NSW", postcode="2000",
+        preferred_contact="email", plan_type="plan-managed",
+        plan_start_date="2025-01-01", plan_review_date="2026-01-01", client_goals="Walk further",
+        referrer_first_name="Sam", referrer_last_name="Referrer",
+        referrer_email="sam@example.com", referrer_phone="0400000001",
+        referred_for="physiotherapy", reason_for_referral="Benchmark", consent_checkbox=True,
+        status="new", created_at=datetime.now(timezone.utc)
+    )
+
+async def run_batches(count, concurrency, send):
+    """Run count sends, at most concurrency at a time; returns elapsed seconds"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            if not await send():
+                raise RuntimeError("send failed")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(count)))
+    return time.perf_counter() - started
+
+def configure_standin(standin):
+    """Point EmailService at the stand-in (before it is imported)"""
+    os.environ.update(
+        MAILGUN_API_BASE_URL=standin.base_url,
+        MAILGUN_API_KEY="key-benchmark",
+        MAILGUN_DOMAIN="benchmark.example.com"
+    )
+
+async def benchmark_sends(args):
+    async with MailgunStandIn(latency=args.latency, handshake_latency=args.handshake_latency) as standin:
+        configure_standin(standin)
+        from app.core.http_client import close_http_client
+        from app.services.email_service import EmailService
+
+        email_service = EmailService()
+        referral = sample_referral()
+        data = {
+            "from": f"Benchmark <{email_service.config.MAILGUN_SENDER_EMAIL}>",
+            "to": ["alex@example.com"],
+            "subject": "Benchmark",
+            "html": email_service._render_template("participant_confirmation.html", {"referral": referral})
+        }
+
+        async def fresh_client_send():
+            async with httpx.AsyncClient() as client:
+                response = await client.post(email_service.mailgun_url, auth=email_service.auth, data=data)
+                return response.status_code == 200
+
+        async def pooled_send():
+            return await email_service.send_participant_confirmation(referral)
+
+        results = []
+        for name, send in [("client per send", fresh_client_send), ("pooled client", pooled_send)]:
+            standin.reset_counters()
+            # EmailService prints a line per email
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                elapsed = await run_batches(args.emails, args.concurrency, send)
+            results.append((name, elapsed, standin.connections))
+        await close_http_client()
+
+    print(f"{args.emails} emails, concurrency {args.concurrency}, "
+          f"handshake {args.handshake_latency * 1000:.0f}ms, request {args.latency * 1000:.0f}ms")
+    for name, elapsed, connections in results:
+        print(f"  {name:<16} {args.emails / elapsed:8.1f} emails/s  {connections:5d} connections")
+
+def benchmark_tasks(args):
+    """Run the notification task body back to back, per-task loop vs worker loop"""
+    from app.core.worker_loop import WorkerEventLoop
+
+    # The stand-in gets its own loop thread, as the tasks run synchronously
+    server = WorkerEventLoop("mailgun-standin").start()
+    standin = server.run(
+        MailgunStandIn(latency=args.latency, handshake_latency=args.handshake_latency).start()
+    )
+    configure_standin(standin)
+    from app.core.http_client import close_http_client
+    from app.core.worker_loop import run_async, stop_worker_loop
+    from app.services.email_service import EmailService
+
+    email_service = EmailService()
+    referral = sample_referral()
+    provider_emails = ["provider@example.com"]
+
+    def loop_per_task():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(email_service.send_all_notifications(referral, provider_emails))
+        finally:
+            loop.run_until_complete(close_http_client(loop))
+            loop.close()
+
+    def worker_loop_task():
+        return run_async(email_service.send_all_notifications(referral, provider_emails))
+
+    results = []
+    try:
+        for name, task in [("loop per task", loop_per_task), ("worker loop", worker_loop_task)]:
+            standin.reset_counters()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                started = time.perf_counter()
+                for _ in range(args.tasks):
+                    if task()["failures"]:
+                        raise RuntimeError("notification failed")
+                elapsed = time.perf_counter() - started
+            results.append((name, elapsed, standin.connections))
+    finally:
+        stop_worker_loop()
+        server.run(standin.stop())
+        server.stop()
+
+    print(f"{args.tasks} tasks (3 emails each), "
+          f"handshake {args.handshake_latency * 1000:.0f}ms, request {args.latency * 1000:.0f}ms")
+    for name, elapsed, connections in results:
+        print(f"  {name:<16} {args.tasks / elapsed:8.1f} tasks/s  {connections:5d} connections")
+
+def benchmark_renders(args):
+    """Render the provider notification repeatedly, old per-call lookup vs precompiled and cached"""
+    from jinja2 import Environment, FileSystemLoader
+    from app.services.email_service import RECIPIENT_PLACEHOLDERS
+    from app.services.email_templates import TEMPLATE_DIR, EmailTemplates, referral_cache_key
+
+    referral = sample_referral()
+    context = {"referral": referral, "recipient": RECIPIENT_PLACEHOLDERS}
+
+    with tempfile.TemporaryDirectory() as bytecode_dir:
+        startup = []
+        for name in ["cold bytecode cache", "warm bytecode cache"]:
+            started = time.perf_counter()
+            templates = EmailTemplates(bytecode_cache_dir=bytecode_dir)
+            count = templates.precompile()
+            startup.append((name, time.perf_counter() - started))
+
+    # The old EmailService setup: templates looked up (and re-checked on disk) per render
+    old_env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)), autoescape=True)
+
+    def per_call_lookup():
+        old_env.get_template("provider_notification.html").render(**context)
+
+    def precompiled():
+        templates.render("provider_notification.html", context)
+
+    def cached_per_referral():
+        templates.render_message("provider_notification", context, cache_key=referral_cache_key(referral))
+
+    results = []
+    for name, render in [("get_template per render", per_call_lookup),
+                         ("precompiled", precompiled),
+                         ("cached html+text", cached_per_referral)]:
+        render()
+        started = time.perf_counter()
+        for _ in range(args.renders):
+            render()
+        results.append((name, time.perf_counter() - started))
+
+    print(f"Compiled {count} templates at startup")
+    for name, elapsed in startup:
+        print(f"  {name:<24} {elapsed * 1000:8.1f} ms")
+    print(f"{args.renders} renders of provider_notification")
+    for name, elapsed in results:
+        print(f"  {name:<24} {args.renders / elapsed:10.1f} renders/s")
+
+if __name__ == "__main__":
+    print("NDIS Email Benchmark")
+    print("=" * 30)
+    args = parse_args()
+    if args.mode == "tasks":
+        benchmark_tasks(args)
+    elif args.mode == "renders":
+        benchmark_renders(args)
+    else:
+        asyncio.run(benchmark_sends(args))
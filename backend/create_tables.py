@@ -82,6 +82,11 @@ def create_tables():
             else:
                 print("[INFO] Referrals table already has NDIS columns")
         
+        # Indexes declared on the model after the table was first created
+        for index in Referral.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+        print("[SUCCESS] Referral listing indexes created/verified")
+        
         print("[SUCCESS] All tables created/updated successfully!")
         print("[INFO] Tables available:")
         print("  - referrals (with NDIS fields)")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Email dispatcher for the NDIS System
+
+Sends the referral emails queued in the email_logs outbox (EMAIL_DELIVERY=outbox).
+Run one or more alongside the API; they share the work through
+SELECT ... FOR UPDATE SKIP LOCKED, and stop cleanly on SIGINT/SIGTERM.
+
+Example:
+    python dispatch_emails.py
+    python dispatch_emails.py --once
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import logging
+import signal
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.core.http_client import close_http_client
+from app.services.email_outbox import EmailDispatcher
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Send queued referral emails from the email_logs outbox")
+    parser.add_argument("--once", action="store_true", help="Send everything currently due, then exit")
+    parser.add_argument("--batch-size", type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=settings.EMAIL_OUTBOX_CONCURRENCY)
+    parser.add_argument("--poll-interval", type=float, default=settings.EMAIL_OUTBOX_POLL_SECONDS)
+    return parser.parse_args()
+
+async def dispatch_emails(args):
+    dispatcher = EmailDispatcher(
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        poll_interval=args.poll_interval
+    )
+    if not dispatcher.email_service.is_configured():
+        print("Email service is not configured - set MAILGUN_API_KEY and MAILGUN_DOMAIN")
+        return False
+
+    try:
+        if args.once:
+            total = 0
+            while True:
+                processed = await dispatcher.dispatch_once()
+                total += processed
+                if processed < dispatcher.batch_size:
+                    break
+            print(f"Processed {total} queued emails")
+            return True
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+
+        print(f"Dispatching emails (batch {dispatcher.batch_size}, concurrency {dispatcher.concurrency}, "
+              f"poll every {dispatcher.poll_interval:g}s)")
+        await dispatcher.run(stop)
+        print("Email dispatcher stopped")
+        return True
+    finally:
+        await close_http_client()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print("NDIS Email Dispatcher")
+    print("=" * 30)
+
+    if not asyncio.run(dispatch_emails(parse_args())):
+        sys.exit(1)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Stream a CSV/NDJSON catalogue (e.g. the NDIS support catalogue) into a dynamic data type
+
+Example:
+    python import_dynamic_data.py support_items catalogue.csv \\
+        --name-column "Support Item Number" --description-column "Support Item Name" \\
+        --create-type "Support Items"
+
+Progress is checkpointed after every batch; re-run with --resume to continue
+an interrupted import.
+"""
+
+import sys
+import os
+import argparse
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal
+from app.schemas.dynamic_data import DataTypeCreate
+from app.services.dynamic_data_service import DynamicDataService
+from app.services.dynamic_data_import_service import DynamicDataImportService, IMPORT_FORMATS
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import data points from a CSV or NDJSON file")
+    parser.add_argument("data_type", help="Data type name to import into")
+    parser.add_argument("path", help="CSV or NDJSON file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="File format (default: from extension)")
+    parser.add_argument("--name-column", default="name")
+    parser.add_argument("--description-column", default="description")
+    parser.add_argument("--on-conflict", choices=["fail", "skip", "update"], default="update")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--create-type", metavar="DISPLAY_NAME", help="Create the data type if it does not exist")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.import-state.json)")
+    parser.add_argument("--resume", action="store_true", help="Skip records already committed by a previous run")
+    return parser.parse_args()
+
+def read_checkpoint(checkpoint_path, data_type, path):
+    """Get the committed record count from a previous run of the same import"""
+    if not os.path.exists(checkpoint_path):
+        return 0
+    with open(checkpoint_path) as f:
+        state = json.load(f)
+    if state.get("data_type") != data_type or state.get("path") != os.path.abspath(path):
+        print(f"Checkpoint {checkpoint_path} is for a different import, ignoring it")
+        return 0
+    return state.get("committed_records", 0)
+
+def write_checkpoint(checkpoint_path, data_type, path, committed_records):
+    """Atomically record how many records have been committed"""
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "data_type": data_type,
+            "path": os.path.abspath(path),
+            "committed_records": committed_records
+        }, f)
+    os.replace(tmp_path, checkpoint_path)
+
+def import_dynamic_data(args):
+    """Import the file, checkpointing after each batch"""
+    checkpoint_path = args.checkpoint or f"{args.path}.import-state.json"
+    resume_from = read_checkpoint(checkpoint_path, args.data_type, args.path) if args.resume else 0
+    if resume_from:
+        print(f"Resuming after record {resume_from}")
+
+    db = SessionLocal()
+    try:
+        data_type = DynamicDataService.get_data_type_by_name(db, args.data_type)
+        if not data_type:
+            if not args.create_type:
+                print(f"Data type '{args.data_type}' not found (use --create-type to create it)")
+                return False
+            data_type = DynamicDataService.create_data_type(
+                db, DataTypeCreate(name=args.data_type, display_name=args.create_type)
+            )
+            print(f"Created data type {data_type.name}")
+
+        def report(result):
+            write_checkpoint(checkpoint_path, data_type.name, args.path, result.committed_records)
+            print(
+                f"  {result.committed_records} records committed "
+                f"({result.created_count} created, {result.updated_count} updated, "
+                f"{result.skipped_count} skipped, {result.invalid_count} invalid)"
+            )
+
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            records = DynamicDataImportService.iter_records(
+                f,
+                args.format or DynamicDataImportService.detect_format(args.path),
+                name_column=args.name_column,
+                description_column=args.description_column
+            )
+            result = DynamicDataImportService.import_records(
+                db, data_type, records,
+                on_conflict=args.on_conflict,
+                batch_size=args.batch_size,
+                resume_from=resume_from,
+                progress=report
+            )
+
+        for error in result.errors:
+            print(f"  Record {error.record}: {error.error}")
+        if not result.completed:
+            print(f"Import stopped after record {result.committed_records}; fix the data and re-run with --resume")
+            return False
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        print(f"Imported {result.records_read} records into {data_type.name}")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"Error importing data points: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("NDIS Dynamic Data Import")
+    print("=" * 30)
+
+    if not import_dynamic_data(parse_args()):
+        sys.exit(1)
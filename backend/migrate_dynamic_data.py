@@ -69,6 +69,8 @@ def migrate_database():
             if not create_dynamic_data_tables():
                 return False
         
+        # The search indexes (pg_trgm) are an Alembic revision: alembic upgrade head
+        
         # Initialize default data
         db = SessionLocal()
         try:
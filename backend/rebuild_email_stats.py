@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Rebuild the email_log_rollups statistics rollup from the email_logs table
+Run this once after deploying the rollup, or whenever the counts drift
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import build_engine
+from app.models.email_log import EmailLogRollup, EmailLogRollupState
+from app.services.email_statistics_service import EmailStatisticsService
+
+def rebuild_email_stats():
+    """Create the rollup tables if needed and recompute every hour"""
+
+    # A full rebuild scans the whole table: no DB_STATEMENT_TIMEOUT_MS here
+    engine = build_engine(name="rebuild", statement_timeout_ms=None)
+
+    print("Rebuilding email statistics rollup...")
+
+    EmailLogRollup.__table__.create(bind=engine, checkfirst=True)
+    EmailLogRollupState.__table__.create(bind=engine, checkfirst=True)
+
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        result = EmailStatisticsService.refresh(db, full=True)
+        print(f"Recomputed {result['hours_recomputed']} hours, wrote {result['rows_written']} rollup rows")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding email statistics: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        db.close()
+        engine.dispose()
+
+if __name__ == "__main__":
+    print("NDIS Email Statistics Rebuild")
+    print("=" * 30)
+
+    if not rebuild_email_stats():
+        sys.exit(1)
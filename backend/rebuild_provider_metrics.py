@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Rebuild the provider_performance_metrics rollup from the referrals table
+Run this once after deploying the rollup, or whenever the rows drift
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import build_engine
+from app.models.provider_models import ProviderPerformanceMetric
+from app.services.provider_metrics_service import ProviderMetricsService
+
+def rebuild_provider_metrics():
+    """Create the metrics table if needed and recompute every row"""
+
+    # A full rebuild scans the whole table: no DB_STATEMENT_TIMEOUT_MS here
+    engine = build_engine(name="rebuild", statement_timeout_ms=None)
+
+    print("Rebuilding provider performance metrics...")
+
+    ProviderPerformanceMetric.__table__.create(bind=engine, checkfirst=True)
+
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        scanned = ProviderMetricsService.rebuild(db)
+        rows = db.query(ProviderPerformanceMetric).count()
+        print(f"Scanned {scanned} assigned referrals, wrote {rows} metric rows")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding provider metrics: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        db.close()
+        engine.dispose()
+
+if __name__ == "__main__":
+    print("NDIS Provider Metrics Rebuild")
+    print("=" * 30)
+
+    if not rebuild_provider_metrics():
+        sys.exit(1)
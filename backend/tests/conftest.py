@@ -0,0 +1,97 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+# Settings are read at import; default to a throwaway in-memory database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("DB_PASSWORD", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import app.models  # noqa: F401 - registers the models with Base.metadata
+from app.core import query_stats
+from app.core.database import Base, SessionLocal, engine
+from app.models.user import User, UserRole, ServiceType
+from app.models.referral import Referral
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_budget(max_statements, max_repeats=None): fail the test when it runs more SQL statements"
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """
+    Fail query_budget-marked tests that run more SQL than declared
+
+    Only the test body is counted, not fixture setup:
+
+        @pytest.mark.query_budget(10, max_repeats=2)
+        def test_provider_list(db): ...
+    """
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+    with query_stats.query_budget(*marker.args, **marker.kwargs):
+        return (yield)
+
+
+@pytest.fixture
+def query_budget():
+    """query_stats.query_budget, for budgeting part of a test: with query_budget(10): ..."""
+    return query_stats.query_budget
+
+
+def _tables():
+    """Every table, less the PostgreSQL-only dynamic data ones on SQLite"""
+    if engine.dialect.name == "postgresql":
+        return list(Base.metadata.sorted_tables)
+    return [table for table in Base.metadata.sorted_tables if table.name not in ("data_types", "data_points")]
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables"""
+    Base.metadata.drop_all(bind=engine, tables=_tables())
+    Base.metadata.create_all(bind=engine, tables=_tables())
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_provider(db):
+    def make(number: int, service_type: ServiceType = ServiceType.ALL) -> User:
+        provider = User(
+            email=f"provider{number}@example.com", hashed_password="x", first_name="Provider",
+            last_name=str(number), role=UserRole.PROVIDER, service_type=service_type, is_active=True
+        )
+        db.add(provider)
+        db.flush()
+        return provider
+    return make
+
+
+@pytest.fixture
+def make_referral(db):
+    def make(**fields) -> Referral:
+        values = dict(
+            first_name="Test", last_name="Participant", date_of_birth="1990-01-01", phone_number="0400000000",
+            street_address="1 Test St", city="Sydney", state="NSW", postcode="2000", preferred_contact="phone",
+            plan_type="plan-managed", plan_start_date="2025-01-01", plan_review_date="2026-01-01",
+            client_goals="Test", referrer_first_name="Sam", referrer_last_name="Referrer",
+            referrer_email="sam@example.com", referrer_phone="0400000001", referred_for="physiotherapy",
+            reason_for_referral="Test referral", consent_checkbox=True, status="new"
+        )
+        values.update(fields)
+        referral = Referral(**values)
+        db.add(referral)
+        db.flush()
+        return referral
+    return make
@@ -0,0 +1,74 @@
+# backend/tests/test_cache.py
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.database import SessionLocal, engine
+from app.models.dynamic_data import DataType
+from app.schemas.dynamic_data import DataPointCreate
+from app.services import dynamic_data_service
+from app.services.dynamic_data_service import DynamicDataService
+
+needs_postgres = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="needs PostgreSQL")
+
+
+def test_set_skips_value_read_before_an_invalidation():
+    cache = TTLCache("test")
+    generation = cache.generation(["colours"])
+    # A write lands between the reader's query and its set
+    cache.invalidate_tags(["colours"])
+
+    assert cache.set("colours", ["red"], tags=["colours"], generation=generation) is False
+    assert cache.get("colours") == (False, None)
+    assert cache.stats()["stale_sets"] == 1
+
+    generation = cache.generation(["colours"])
+    assert cache.set("colours", ["red", "blue"], tags=["colours"], generation=generation) is True
+    assert cache.get("colours") == (True, ["red", "blue"])
+
+
+def test_set_ignores_invalidations_of_other_tags():
+    cache = TTLCache("test")
+    generation = cache.generation(["colours"])
+    cache.invalidate_tags(["sizes"])
+
+    assert cache.set("colours", ["red"], tags=["colours"], generation=generation) is True
+
+
+def test_clear_and_remote_invalidations_move_the_generation():
+    cache = TTLCache("test")
+    generation = cache.generation(["colours"])
+    cache.clear()
+    assert cache.set("colours", ["red"], tags=["colours"], generation=generation) is False
+
+    generation = cache.generation(["colours"])
+    cache._on_remote_invalidation("test", ["colours"], "another-process")
+    assert cache.set("colours", ["red"], tags=["colours"], generation=generation) is False
+
+
+@needs_postgres
+def test_points_written_during_a_read_are_not_hidden_by_the_cache(db, monkeypatch):
+    data_type = DataType(name="colours", display_name="Colours")
+    db.add(data_type)
+    db.commit()
+    DynamicDataService.create_data_point(db, DataPointCreate(data_type_id=str(data_type.id), name="red"))
+    DynamicDataService.invalidate_cache()
+
+    detached_copy = dynamic_data_service._detached_copy
+    written = []
+
+    def copy_then_write(point):
+        # Another request adds a point after this read's query ran, before it caches the result
+        if not written:
+            with SessionLocal() as other:
+                written.append(DynamicDataService.create_data_point(
+                    other, DataPointCreate(data_type_id=str(data_type.id), name="blue")
+                ))
+        return detached_copy(point)
+
+    monkeypatch.setattr(dynamic_data_service, "_detached_copy", copy_then_write)
+    assert [point.name for point in DynamicDataService.get_data_points_by_type_name(db, "colours")] == ["red"]
+
+    monkeypatch.setattr(dynamic_data_service, "_detached_copy", detached_copy)
+    db.expire_all()
+    names = [point.name for point in DynamicDataService.get_data_points_by_type_name(db, "colours")]
+    assert names == ["blue", "red"]
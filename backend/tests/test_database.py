@@ -0,0 +1,17 @@
+# backend/tests/test_database.py
+from app.core.config import settings
+from app.core.database import engine_options
+
+URL = "postgresql+psycopg2://app@db/ndis"
+
+
+def test_statement_timeout_defaults_to_the_setting(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", False)
+    options = engine_options(URL)
+    assert options["connect_args"]["options"] == f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+
+def test_statement_timeout_opt_out(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", False)
+    assert "connect_args" not in engine_options(URL, statement_timeout_ms=None)
+    assert "connect_args" not in engine_options(URL, is_async=True, statement_timeout_ms=None)
@@ -0,0 +1,73 @@
+# backend/tests/test_dynamic_data_import.py
+import statistics
+import time
+
+import pytest
+
+from app.core.database import engine
+from app.core.query_stats import query_budget
+from app.models.dynamic_data import DataType
+from app.services.dynamic_data_import_service import DynamicDataImportService
+from app.services.dynamic_data_service import DynamicDataService
+
+# The dynamic data models use PostgreSQL UUID columns
+pytestmark = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="needs PostgreSQL")
+
+RECORDS = 20000
+BATCH_SIZE = 1000
+# Statements per batch: the upsert (2 on PostgreSQL, 6 portable: name and id
+# lookups in chunks of 500, the insert) plus headroom; a per-row query would blow it
+STATEMENTS_PER_BATCH = 8
+
+
+def records(count, prefix="item"):
+    for number in range(1, count + 1):
+        yield number, {"name": f"{prefix}_{number:05d}", "description": f"Support item {number}"}
+
+
+@pytest.fixture(params=["returning", "executemany"])
+def upsert_path(request, monkeypatch):
+    """Run the import through each bulk upsert: PostgreSQL's RETURNING one and the portable one"""
+    if request.param == "executemany":
+        monkeypatch.setattr(
+            DynamicDataService, "_bulk_upsert_returning",
+            staticmethod(lambda db, rows, on_conflict: DynamicDataService._bulk_upsert_executemany(
+                db, rows[0]["data_type_id"], rows, on_conflict
+            ))
+        )
+    return request.param
+
+
+def import_timed(db, data_type, count, **kwargs):
+    """Import count records; returns the result and each batch's duration"""
+    durations = []
+    started = [time.perf_counter()]
+
+    def progress(result):
+        now = time.perf_counter()
+        durations.append(now - started[0])
+        started[0] = now
+
+    result = DynamicDataImportService.import_records(
+        db, data_type, records(count, **kwargs), batch_size=BATCH_SIZE, progress=progress
+    )
+    return result, durations
+
+
+def test_import_stays_linear(db, upsert_path):
+    data_type = DataType(name="support_items", display_name="Support Items")
+    db.add(data_type)
+    db.commit()
+
+    batches = RECORDS // BATCH_SIZE
+    with query_budget(batches * STATEMENTS_PER_BATCH):
+        result, durations = import_timed(db, data_type, RECORDS)
+    assert result.completed and result.created_count == RECORDS
+
+    # A batch must cost the same with 19k points already in the type as with none
+    first, last = statistics.median(durations[1:6]), statistics.median(durations[-5:])
+    assert last < first * 2, f"batches slowed from {first:.3f}s to {last:.3f}s"
+
+    # Re-importing updates in place, at the same per-batch cost
+    result, durations = import_timed(db, data_type, RECORDS)
+    assert result.updated_count == RECORDS and result.created_count == 0
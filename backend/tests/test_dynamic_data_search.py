@@ -0,0 +1,70 @@
+# backend/tests/test_dynamic_data_search.py
+import statistics
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.dynamic_data_search import DataPointSearchIndex
+
+CATALOGUE_POINTS = 50000
+# The typeahead target: a keystroke's lookup in a 50k point catalogue
+TYPEAHEAD_TARGET_SECONDS = 0.010
+
+WORDS = ["therapy", "support", "assistance", "community", "coordination", "personal", "transport", "capacity"]
+
+
+def point(number, name, description=None, is_active=True):
+    return SimpleNamespace(
+        id=number, name=name, description=description, sort_order=number, is_active=is_active
+    )
+
+
+@pytest.fixture(scope="module")
+def catalogue():
+    """50k support-catalogue-like points across five types"""
+    entries = []
+    for number in range(CATALOGUE_POINTS):
+        first, second = WORDS[number % len(WORDS)], WORDS[(number // len(WORDS)) % len(WORDS)]
+        entries.append((
+            point(number, f"{first}_{second}_{number:05d}", f"{second.title()} {first} item {number}"),
+            f"type_{number % 5}"
+        ))
+    return DataPointSearchIndex(entries)
+
+
+def test_typeahead_meets_its_latency_target(catalogue):
+    queries = ["t", "th", "ther", "therapy_sup", "coord", "personal tra", "cap", "item 4", "zzz"]
+    durations = []
+    for _ in range(20):
+        for query in queries:
+            for type_name in (None, "type_2"):
+                started = time.perf_counter()
+                results = catalogue.typeahead(query, type_name, limit=10)
+                durations.append(time.perf_counter() - started)
+                assert len(results) <= 10
+
+    assert catalogue.typeahead("therapy_sup", limit=3)[0].name.startswith("therapy_support")
+    p95 = statistics.quantiles(durations, n=20)[-1]
+    assert p95 < TYPEAHEAD_TARGET_SECONDS, f"typeahead p95 {p95 * 1000:.2f}ms over 50k points"
+
+
+def test_search_does_not_match_across_name_and_description():
+    index = DataPointSearchIndex([(point(1, "alpha", "beta"), "things")])
+
+    assert [match.name for match in index.search("alpha")] == ["alpha"]
+    assert [match.name for match in index.search("bet")] == ["alpha"]
+    assert index.search("alpha\nbeta") == []
+    assert index.search("ha\nbe") == []
+
+
+def test_search_returns_every_match_without_a_limit():
+    index = DataPointSearchIndex([
+        (point(number, f"item_{number:03d}", "shared description" if number % 2 else None), "things")
+        for number in range(120)
+    ])
+
+    assert len(index.search("item")) == 120
+    assert len(index.search("shared")) == 60
+    assert len(index.search("item", limit=50)) == 50
+    assert [match.id for match in index.search("item", limit=5, offset=115)] == list(range(115, 120))
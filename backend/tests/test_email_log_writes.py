@@ -0,0 +1,40 @@
+# backend/tests/test_email_log_writes.py
+import asyncio
+
+from app.models.email_log import EmailLog
+from app.services import email_service
+from app.services.email_retry import MailgunError
+
+
+def statements(stats, verb: str) -> int:
+    return sum(count for statement, count in stats.by_statement.items() if statement.lstrip().upper().startswith(verb))
+
+
+def test_provider_notification_logs_are_written_in_bulk(db, make_provider, make_referral, monkeypatch, query_budget):
+    monkeypatch.setattr(email_service, "MAILGUN_BATCH_SIZE", 10)
+    service = email_service.EmailService()
+    service.rate_limiter = None
+    batches = []
+
+    async def post_message(data):
+        batches.append(data["to"])
+        # The second of three batches fails, so two distinct transitions are applied
+        if len(batches) == 2:
+            raise MailgunError("Mailgun API error: 500", status_code=500)
+
+    monkeypatch.setattr(service, "_post_message", post_message)
+    emails = [make_provider(number).email for number in range(25)]
+    referral = make_referral()
+    db.commit()
+
+    with query_budget(10) as stats:
+        sent = asyncio.run(service.send_provider_notification(referral, emails, db=db))
+
+    assert sent is False
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert statements(stats, "INSERT") == 1
+    assert statements(stats, "UPDATE") == 2
+
+    statuses = dict(db.query(EmailLog.recipient_email, EmailLog.status).all())
+    assert sorted(statuses.values()).count("sent") == 15
+    assert [statuses[email] for email in batches[1]] == ["failed"] * 10
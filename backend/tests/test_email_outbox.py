@@ -0,0 +1,43 @@
+# backend/tests/test_email_outbox.py
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.main import check_email_outbox
+from app.models.email_log import EmailLog, EmailStatus
+from app.services.email_outbox import EmailOutbox
+
+
+def queue_email(db, due_seconds_ago):
+    db.add(EmailLog(
+        email_type="provider_notification",
+        recipient_email="provider@example.com",
+        subject="New referral",
+        status=EmailStatus.PENDING.value,
+        retry_count=0,
+        next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=due_seconds_ago)
+    ))
+    db.commit()
+
+
+def test_direct_delivery_is_the_default():
+    assert type(settings).model_fields["EMAIL_DELIVERY"].default == "direct"
+
+
+def test_overdue_count_only_counts_emails_left_unsent(db):
+    queue_email(db, due_seconds_ago=10)
+    assert EmailOutbox.overdue_count(db, 300) == 0
+
+    queue_email(db, due_seconds_ago=600)
+    assert EmailOutbox.pending_count(db) == 2
+    assert EmailOutbox.overdue_count(db, 300) == 1
+
+
+def test_startup_check_reports_a_missing_dispatcher(db, caplog):
+    queue_email(db, due_seconds_ago=settings.EMAIL_OUTBOX_STALE_SECONDS + 60)
+
+    with caplog.at_level(logging.WARNING):
+        check_email_outbox()
+
+    errors = [record.getMessage() for record in caplog.records if record.levelno == logging.ERROR]
+    assert errors and "dispatch_emails.py" in errors[0]
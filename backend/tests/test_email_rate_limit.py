@@ -0,0 +1,65 @@
+# backend/tests/test_email_rate_limit.py
+import asyncio
+
+import pytest
+
+from app.core.rate_limit import InMemoryTokenBucket, RateLimiter, RateLimitExceeded
+from app.services import email_service
+from app.services.email_retry import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker("mailgun-test", failure_threshold=1, reset_timeout=60)
+    monkeypatch.setattr(email_service, "mailgun_breaker", breaker)
+    return breaker
+
+
+@pytest.fixture
+def service():
+    service = email_service.EmailService()
+    service.rate_limiter = RateLimiter("mailgun-test", InMemoryTokenBucket(rate=1, burst=5), max_wait=0)
+    return service
+
+
+def test_open_breaker_fails_without_taking_rate_limit_tokens(service, breaker):
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(service._post_message({"to": ["a@example.com", "b@example.com"]}))
+
+    assert service.rate_limiter.bucket.try_acquire(service.config.MAILGUN_DOMAIN, 5) == 0
+
+
+def test_throttled_probe_is_given_back_to_the_breaker(service, breaker):
+    breaker.record_failure()
+    breaker._open_until = 0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    service.rate_limiter.bucket.try_acquire(service.config.MAILGUN_DOMAIN, 5)
+
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(service._post_message({"to": ["a@example.com"]}))
+
+    assert breaker.allow()
+
+
+def test_batch_larger_than_burst_waits_for_all_its_tokens():
+    bucket = InMemoryTokenBucket(rate=100, burst=10)
+    limiter = RateLimiter("batch-test", bucket, max_wait=5)
+
+    asyncio.run(limiter.acquire("example.com", 25))
+
+    # 25 tokens at 100/s from a full bucket of 10 take at least 0.15s, and leave none
+    assert limiter.stats()["throttle_seconds"] >= 0.15
+    assert bucket.try_acquire("example.com", 1) > 0
+
+
+def test_batch_that_cannot_fit_in_max_wait_takes_nothing():
+    bucket = InMemoryTokenBucket(rate=1, burst=10)
+    limiter = RateLimiter("batch-test", bucket, max_wait=5)
+
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(limiter.acquire("example.com", 100))
+
+    assert bucket.try_acquire("example.com", 10) == 0
+    assert limiter.stats()["rejected"] == 1
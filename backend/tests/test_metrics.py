@@ -0,0 +1,52 @@
+# backend/tests/test_metrics.py
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import OutboxDepth
+from app.models.email_log import EmailLog, EmailStatus
+
+
+def queue_emails(db, count):
+    for number in range(count):
+        db.add(EmailLog(
+            email_type="provider_notification",
+            recipient_email=f"provider{number}@example.com",
+            subject="New referral",
+            status=EmailStatus.PENDING.value,
+            retry_count=0,
+            next_attempt_at=datetime.now(timezone.utc)
+        ))
+    db.commit()
+
+
+def test_outbox_depth_is_counted_once_per_interval(db, query_budget, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_OUTBOX_CACHE_SECONDS", 60.0)
+    queue_emails(db, 3)
+    depth = OutboxDepth()
+
+    assert depth.get() == 3
+    queue_emails(db, 2)
+    with query_budget(0):
+        # Scrapes within the interval don't touch the database
+        assert depth.get() == 3
+
+    monkeypatch.setattr(settings, "METRICS_OUTBOX_CACHE_SECONDS", 0.0)
+    assert depth.get() == 5
+
+
+def test_failed_outbox_count_is_not_retried_every_scrape(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_OUTBOX_CACHE_SECONDS", 60.0)
+    calls = []
+
+    def failing_count(timeout_ms):
+        calls.append(timeout_ms)
+        raise TimeoutError("canceling statement due to statement timeout")
+
+    depth = OutboxDepth()
+    monkeypatch.setattr(depth, "_count", failing_count)
+    with pytest.raises(TimeoutError):
+        depth.get()
+    assert depth.get() is None
+    assert calls == [settings.METRICS_OUTBOX_TIMEOUT_MS]
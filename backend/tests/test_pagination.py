@@ -0,0 +1,54 @@
+# backend/tests/test_pagination.py
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models.referral import Referral
+from app.utils.pagination import decode_cursor, encode_cursor, newest_first, next_cursor, paginate_newest_first
+
+
+def make_referrals(db, make_referral):
+    """Ten referrals, three of them (legacy rows) without a created_at"""
+    start = datetime(2026, 1, 1)
+    for number in range(10):
+        referral = make_referral()
+        referral.created_at = None if number in (2, 5, 8) else start + timedelta(hours=number // 2)
+    db.commit()
+
+
+def page_through(db, limit):
+    pages, cursor = [], None
+    while True:
+        page = paginate_newest_first(db.query(Referral), Referral.created_at, Referral.id, limit=limit, cursor=cursor)
+        pages.append([referral.id for referral in page])
+        cursor = next_cursor(page, limit)
+        if not cursor:
+            return pages
+
+
+def test_cursor_round_trips_a_missing_timestamp():
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+    assert decode_cursor(encode_cursor(datetime(2026, 1, 1, 9, 30), 7)) == (datetime(2026, 1, 1, 9, 30), 7)
+
+
+def test_cursor_pages_cover_rows_without_timestamps_once(db, make_referral):
+    make_referrals(db, make_referral)
+    everything = [referral.id for referral in paginate_newest_first(
+        db.query(Referral), Referral.created_at, Referral.id, limit=100
+    )]
+    undated = {referral.id for referral in db.query(Referral).filter(Referral.created_at.is_(None))}
+
+    # Undated rows first, then newest first with the id tie-break
+    assert set(everything[:3]) == undated
+    for limit in (1, 2, 3, 4):
+        pages = page_through(db, limit)
+        assert [id for page in pages for id in page] == everything
+
+
+def test_select_statements_use_the_same_order(db, make_referral):
+    make_referrals(db, make_referral)
+    first = db.scalars(newest_first(select(Referral), Referral.created_at, Referral.id, limit=4)).all()
+    cursor = next_cursor(first, 4)
+    rest = db.scalars(newest_first(select(Referral), Referral.created_at, Referral.id, limit=100, cursor=cursor)).all()
+
+    assert len({referral.id for referral in first + rest}) == 10
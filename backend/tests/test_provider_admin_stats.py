@@ -0,0 +1,53 @@
+# backend/tests/test_provider_admin_stats.py
+import pytest
+
+from app.core.query_stats import query_budget
+from app.services.provider_admin_service import ProviderAdminService
+
+
+def add_providers(make_provider, make_referral, first: int, count: int):
+    for number in range(first, first + count):
+        provider = make_provider(number)
+        make_referral(assigned_provider_id=provider.id, status="accepted")
+        make_referral(assigned_provider_id=provider.id, status="completed")
+
+
+def statements_for_all_providers(db):
+    db.expire_all()
+    with query_budget(10) as stats:
+        providers = ProviderAdminService.get_all_providers(db)
+    assert all(provider["stats"]["total_referrals"] == 2 for provider in providers)
+    return len(providers), stats.statements
+
+
+def test_statement_count_does_not_grow_with_providers(db, make_provider, make_referral):
+    add_providers(make_provider, make_referral, 1, 3)
+    db.commit()
+    few_providers, few_statements = statements_for_all_providers(db)
+
+    add_providers(make_provider, make_referral, 4, 30)
+    db.commit()
+    many_providers, many_statements = statements_for_all_providers(db)
+
+    assert (few_providers, many_providers) == (3, 33)
+    assert many_statements == few_statements
+
+
+@pytest.fixture
+def busy_and_idle(db, make_provider, make_referral):
+    busy, idle = make_provider(1), make_provider(2)
+    for status in ("accepted", "in_progress", "completed", "completed"):
+        make_referral(assigned_provider_id=busy.id, status=status)
+    db.commit()
+    return busy, idle
+
+
+@pytest.mark.query_budget(2)
+def test_stats_are_counted_per_provider(db, busy_and_idle):
+    busy, idle = busy_and_idle
+    stats = {provider["id"]: provider["stats"] for provider in ProviderAdminService.get_all_providers(db)}
+
+    assert stats[busy.id] == {
+        "total_referrals": 4, "active_referrals": 2, "completed_referrals": 2, "completion_rate": 50.0
+    }
+    assert stats[idle.id]["total_referrals"] == 0
@@ -0,0 +1,119 @@
+# backend/tests/test_provider_metrics.py
+from datetime import datetime, timedelta, timezone
+
+from app.models.provider_models import ProviderPerformanceMetric
+from app.schemas.referral import ReferralUpdate
+from app.services.provider_admin_service import ProviderAdminService
+from app.services.provider_metrics_service import ProviderMetricsService, _utc
+from app.services.referral_service import ReferralService
+
+
+def current(db, *providers):
+    stats = ProviderMetricsService.get_current_stats(db, [provider.id for provider in providers])
+    return [
+        (stats.get(provider.id, {}).get("total_referrals", 0), stats.get(provider.id, {}).get("active_referrals", 0))
+        for provider in providers
+    ]
+
+
+def rebuilt(db, *providers):
+    db.commit()
+    ProviderMetricsService.rebuild(db)
+    return current(db, *providers)
+
+
+def assign(db, referral, provider, status):
+    old_status, old_provider_id = referral.status, referral.assigned_provider_id
+    referral.assigned_provider_id = provider.id
+    referral.status = status
+    ProviderMetricsService.record_transition(db, referral, old_status, old_provider_id)
+
+
+def test_several_transitions_for_one_provider_in_one_session(db, make_provider, make_referral):
+    p1, p2 = make_provider(1), make_provider(2)
+    referrals = [make_referral() for _ in range(3)]
+    for referral in referrals:
+        assign(db, referral, p1, "accepted")
+    db.commit()
+    assert current(db, p1, p2) == [(3, 3), (0, 0)]
+
+    result = ProviderAdminService.deactivate_provider(db, p1.id, "Leaving")
+
+    assert result["reassigned"] == 3
+    assert current(db, p1, p2) == [(0, 0), (3, 0)]
+    assert rebuilt(db, p1, p2) == [(0, 0), (3, 0)]
+
+
+def test_status_update_and_delete_keep_rollup_in_step(db, make_provider, make_referral):
+    provider = make_provider(1)
+    first, second = make_referral(), make_referral()
+    assign(db, first, provider, "assigned")
+    assign(db, second, provider, "assigned")
+    db.commit()
+
+    ReferralService.update_referral(db, first.id, ReferralUpdate(status="accepted"))
+    assert current(db, provider) == [(2, 1)]
+
+    ReferralService.delete_referral(db, first.id)
+    ReferralService.delete_referral(db, second.id)
+    assert current(db, provider) == [(0, 0)]
+    assert rebuilt(db, provider) == [(0, 0)]
+
+
+def period_rows(db, period_type="daily"):
+    return sorted(
+        (row.provider_id, row.metric_date.replace(tzinfo=None), row.total_referrals_received or 0)
+        for row in db.query(ProviderPerformanceMetric).filter(ProviderPerformanceMetric.period_type == period_type)
+        if row.total_referrals_received
+    )
+
+
+def test_received_counts_match_a_rebuild_after_reassignment(db, make_provider, make_referral):
+    p1, p2 = make_provider(1), make_provider(2)
+    referral = make_referral(created_at=datetime(2026, 10, 17, 19, 0))
+    db.commit()
+    assign(db, referral, p1, "assigned")
+    db.commit()
+    assign(db, referral, p2, "accepted")
+    db.commit()
+
+    live = period_rows(db)
+    assert live == [(p2.id, datetime(2026, 10, 17), 1)]
+
+    db.commit()
+    ProviderMetricsService.rebuild(db)
+    assert period_rows(db) == live
+
+
+def test_dates_are_converted_to_utc_not_stripped():
+    # Early on the 18th in Sydney is the evening of the 17th in UTC
+    sydney = datetime(2026, 10, 18, 5, 0, tzinfo=timezone(timedelta(hours=10)))
+    assert _utc(sydney) == datetime(2026, 10, 17, 19, 0)
+    assert _utc(datetime(2026, 10, 17, 19, 0)) == datetime(2026, 10, 17, 19, 0)
+
+
+def test_current_row_keeps_accepted_and_active_apart(db, make_provider, make_referral):
+    provider = make_provider(1)
+    for status in ("accepted", "in_progress", "completed"):
+        assign(db, make_referral(), provider, status)
+    db.commit()
+
+    stats = ProviderMetricsService.get_current_stats(db, [provider.id])[provider.id]
+    assert (stats["accepted_referrals"], stats["active_referrals"], stats["completed_referrals"]) == (1, 2, 1)
+
+    ProviderMetricsService.rebuild(db)
+    assert ProviderMetricsService.get_current_stats(db, [provider.id])[provider.id] == stats
+
+
+def test_performance_summary_counts_referrals_created_in_the_period(db, make_provider, make_referral):
+    provider = make_provider(1)
+    old = make_referral(created_at=datetime.utcnow() - timedelta(days=90))
+    new = make_referral()
+    assign(db, old, provider, "completed")
+    assign(db, new, provider, "accepted")
+    db.commit()
+
+    summary = ProviderAdminService.get_performance_summary(db, period_days=30)
+
+    ranking = summary["all_providers"][0]
+    assert (ranking["referrals_handled"], ranking["referrals_completed"]) == (1, 1)
@@ -0,0 +1,147 @@
+# backend/tests/test_query_plans.py
+import random
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.core.database import engine
+from app.models.user import User, UserRole, ServiceType
+from app.models.referral import Referral
+from app.services.provider_service import ProviderService
+from app.services.provider_admin_service import ProviderAdminService
+from app.services.referral_service import ReferralService
+from app.utils.pagination import next_cursor
+from app.utils.query_plans import capture_selects, check_plans
+
+# EXPLAIN output and enable_seqscan are PostgreSQL's
+pytestmark = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="needs PostgreSQL")
+
+CHECKED_TABLES = ["referrals"]
+PROVIDERS = 20
+REFERRALS = 2000
+
+SERVICE_TYPES = ["physiotherapy", "chiro", "psychologist", "other"]
+# Most referrals end up processed; only recent ones are still new
+STATUS_WEIGHTS = {
+    "completed": 50, "in_progress": 15, "accepted": 10, "declined": 10,
+    "assigned": 5, "new": 10
+}
+
+# The service methods behind the referral hot paths, called as (db, seeded)
+HOT_PATHS = {
+    "ReferralService.get_referrals": lambda db, seeded: ReferralService.get_referrals(db, limit=20, status="new"),
+    "ReferralService.get_referrals (cursor)": lambda db, seeded: ReferralService.get_referrals(
+        db, limit=20, cursor=seeded.cursor),
+    "ProviderService.get_dashboard_data": lambda db, seeded: ProviderService.get_dashboard_data(
+        db, seeded.provider_id),
+    "ProviderService.get_provider_referrals": lambda db, seeded: ProviderService.get_provider_referrals(
+        db, seeded.provider_id, status_filter="in_progress", service_type="physiotherapy", limit=20),
+    "ProviderService.get_performance_metrics": lambda db, seeded: ProviderService.get_performance_metrics(
+        db, seeded.provider_id),
+    "ProviderAdminService._get_provider_alerts_specific":
+        lambda db, seeded: ProviderAdminService._get_provider_alerts_specific(db, seeded.provider_id),
+    "ProviderAdminService.get_unassigned_referrals": lambda db, seeded: ProviderAdminService.get_unassigned_referrals(
+        db, service_type="chiro", priority="urgent", limit=20),
+    "ProviderAdminService.get_overdue_referrals": lambda db, seeded: ProviderAdminService.get_overdue_referrals(db),
+    "ProviderAdminService.get_overdue_referrals (provider)":
+        lambda db, seeded: ProviderAdminService.get_overdue_referrals(db, provider_id=seeded.provider_id),
+    "ProviderAdminService.get_provider_referrals_admin":
+        lambda db, seeded: ProviderAdminService.get_provider_referrals_admin(
+            db, seeded.provider_id, start_date=date.today() - timedelta(days=90), end_date=date.today(), limit=20),
+    "ProviderAdminService.get_provider_capacity": lambda db, seeded: ProviderAdminService.get_provider_capacity(
+        db, seeded.provider_id),
+    "ProviderAdminService.get_provider_timeline": lambda db, seeded: ProviderAdminService.get_provider_timeline(
+        db, seeded.provider_id),
+    "ProviderAdminService.get_assignment_suggestions":
+        lambda db, seeded: ProviderAdminService.get_assignment_suggestions(db, seeded.unassigned_id),
+}
+
+
+def seed(db, provider_count, referral_count):
+    """Insert providers and referrals spread over the last year"""
+    random.seed(0)
+    provider_ids = db.execute(
+        insert(User).returning(User.id),
+        [
+            {
+                "email": f"plan-check-{i}@example.com",
+                "hashed_password": "-",
+                "first_name": "Plan",
+                "last_name": f"Check {i}",
+                "role": UserRole.PROVIDER,
+                "service_type": ServiceType.ALL,
+                "is_active": True
+            }
+            for i in range(provider_count)
+        ]
+    ).scalars().all()
+
+    now = datetime.now(timezone.utc)
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    rows = []
+    for i in range(referral_count):
+        status = random.choices(statuses, weights)[0]
+        created_at = now - timedelta(days=random.uniform(0, 365))
+        if status == "new":
+            created_at = now - timedelta(days=random.uniform(0, 7))
+        unassigned = status == "new" and random.random() < 0.5
+        rows.append({
+            "first_name": "Plan", "last_name": f"Check {i}",
+            "date_of_birth": "1990-01-01", "phone_number": "0400000000",
+            "street_address": "1 Test St", "city": "Sydney", "state": "NSW", "postcode": "2000",
+            "preferred_contact": "phone", "plan_type": "plan-managed",
+            "plan_start_date": "2025-01-01", "plan_review_date": "2026-01-01",
+            "client_goals": "-", "referrer_first_name": "Plan", "referrer_last_name": "Check",
+            "referrer_email": "referrer@example.com", "referrer_phone": "0400000000",
+            "referred_for": random.choice(SERVICE_TYPES), "reason_for_referral": "Query plan check",
+            "consent_checkbox": True,
+            "status": status,
+            "priority": random.choice(["low", "medium", "high", "urgent"]),
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(days=random.uniform(0, 10)),
+            "accepted_at": created_at + timedelta(days=1) if status in ("accepted", "in_progress", "completed") else None,
+            "assigned_provider_id": None if unassigned else random.choice(provider_ids)
+        })
+    db.execute(insert(Referral), rows)
+    db.commit()
+    db.execute(text("ANALYZE users"))
+    db.execute(text("ANALYZE referrals"))
+    return provider_ids
+
+
+@pytest.fixture
+def seeded(db):
+    """Seeded providers and referrals, plus the arguments the hot paths need"""
+    provider_ids = seed(db, PROVIDERS, REFERRALS)
+    unassigned = db.query(Referral).filter(
+        Referral.assigned_provider_id.is_(None),
+        Referral.referred_for == "physiotherapy"
+    ).first()
+    return SimpleNamespace(
+        provider_id=provider_ids[0],
+        cursor=next_cursor(ReferralService.get_referrals(db, limit=20), 20),
+        unassigned_id=unassigned.id
+    )
+
+
+@pytest.mark.parametrize("name", list(HOT_PATHS))
+def test_hot_path_queries_use_indexes(db, seeded, name):
+    """
+    Every SELECT on referrals behind the hot path can be served by an index
+
+    Plans are taken with enable_seqscan off, so a sequential scan means no
+    index can serve the query at all, whatever the amount of seeded data.
+    The tables come from the models; alembic/versions must keep the same indexes.
+    """
+    connection = db.connection()
+    with capture_selects(connection) as statements:
+        HOT_PATHS[name](db, seeded)
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    checks = check_plans(connection, statements, CHECKED_TABLES)
+
+    assert checks, f"{name} ran no queries on {', '.join(CHECKED_TABLES)}"
+    seq_scans = [" ".join(check.statement.split()) for check in checks if check.seq_scans]
+    assert not seq_scans, f"{name}: sequential scan on referrals in\n" + "\n".join(seq_scans)
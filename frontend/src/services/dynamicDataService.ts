@@ -27,6 +27,17 @@ export interface DataTypeWithPoints extends DataType {
   data_points: DataPoint[];
 }
 
+// Compact form of /dynamic-data/snapshot: points are arrays ordered as `fields`
+export interface DataSnapshot {
+  version: string;
+  fields: string[];
+  types: Record<string, {
+    id: string;
+    display_name: string;
+    points: any[][];
+  }>;
+}
+
 class DynamicDataService {
   private baseUrl: string = `${API_BASE_URL}/dynamic-data`;
 
@@ -42,6 +53,19 @@ class DynamicDataService {
     return response.json();
   }
 
+  async getSnapshot(): Promise<Record<string, Pick<DataPoint, 'id' | 'name' | 'description' | 'sort_order' | 'extra_data'>[]>> {
+    const response = await fetch(`${this.baseUrl}/snapshot`);
+    if (!response.ok) throw new Error('Failed to fetch reference data');
+    const snapshot: DataSnapshot = await response.json();
+    const result: Record<string, any[]> = {};
+    for (const [typeName, type] of Object.entries(snapshot.types)) {
+      result[typeName] = type.points.map(row =>
+        Object.fromEntries(snapshot.fields.map((field, i) => [field, row[i]]))
+      );
+    }
+    return result;
+  }
+
   async createDataPoint(payload: {
     data_type_id: string;
     name: string;